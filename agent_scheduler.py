@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Dependency-Graph Scheduler for Agent Stages
+
+The blog pipeline is a small DAG rather than a straight line:
+- Strategy and Research do not depend on each other
+- SEO only needs Strategy, Analysis only needs Research
+- Writing needs everything, Editing needs the draft
+
+This module runs such a graph, starting every stage as soon as all of
+its inputs are ready so independent agents overlap in time. Graphs of
+async stage functions can be run on an event loop with run_async().
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# ============================================================================
+# STAGE DEFINITION
+# ============================================================================
+class PipelineStage:
+    """
+    One node in the pipeline graph.
+
+    The stage function receives the dictionary of results produced so far
+    (keyed by stage name) and returns its own output. Returning None marks
+    the stage as failed, which stops every stage that depends on it.
+    """
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any],
+                 depends_on: Iterable[str] = (), config_keys: Iterable[str] = ()):
+        """
+        Args:
+            name: Unique stage name, also the key of its result
+            func: Callable taking the results dictionary
+            depends_on: Names of stages whose output this stage needs
+            config_keys: Dotted config sections the stage reads (e.g. 'agents.editor')
+        """
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.config_keys = list(config_keys)
+
+    def __repr__(self):
+        return f"PipelineStage({self.name!r}, depends_on={self.depends_on})"
+
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+class StageScheduler:
+    """
+    Runs pipeline stages in dependency order, in parallel where possible.
+
+    With parallel=False the stages run one at a time in the order they
+    were declared, which reproduces the original sequential pipeline.
+    """
+
+    def __init__(self, stages: List[PipelineStage], max_workers: int = 4,
+                 parallel: bool = True, verbose: bool = False):
+        """
+        Args:
+            stages: Stages to run, in their preferred sequential order
+            max_workers: Maximum number of stages running at the same time
+            parallel: Start independent stages concurrently
+            verbose: Print scheduling decisions
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        self.max_workers = max(1, max_workers)
+        self.parallel = parallel
+        self.verbose = verbose
+
+        # Filled in by run()
+        self.results: Dict[str, Any] = {}
+        self.failed: List[str] = []
+        self.errors: Dict[str, Exception] = {}
+
+        self._validate()
+
+    def _validate(self):
+        """Reject unknown dependencies and cycles before anything runs."""
+        if len(self.stages) != len(self.order):
+            raise ValueError("Pipeline stage names must be unique")
+
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+        # Kahn's algorithm: if we cannot place every stage, there is a cycle
+        remaining = {name: set(stage.depends_on) for name, stage in self.stages.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle between: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def topological_order(self) -> List[str]:
+        """Stage names ordered so every stage comes after its dependencies."""
+        ordered: List[str] = []
+        while len(ordered) < len(self.order):
+            for name in self.order:
+                if name not in ordered and all(dep in ordered for dep in self.stages[name].depends_on):
+                    ordered.append(name)
+        return ordered
+
+    def _ready_stages(self, started: set) -> List[str]:
+        """Stages not yet started whose dependencies have all succeeded."""
+        return [
+            name for name in self.order
+            if name not in started
+            and all(dep in self.results for dep in self.stages[name].depends_on)
+        ]
+
+    def _run_stage(self, name: str) -> Any:
+        """Execute one stage against a snapshot of the current results."""
+        return self.stages[name].func(dict(self.results))
+
+    def _record(self, name: str, output: Any = None, error: Optional[Exception] = None):
+        """Store a stage outcome and report failures."""
+        if error is not None:
+            self.errors[name] = error
+            self.failed.append(name)
+            print(f"❌ Stage '{name}' raised an error: {error}")
+        elif output is None:
+            self.failed.append(name)
+        else:
+            self.results[name] = output
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the graph until every stage has finished or one has failed.
+
+        Returns:
+            Dictionary of stage outputs keyed by stage name. Stages that
+            failed, or never ran because an input failed, are absent and
+            the failing stage names are listed in `self.failed`.
+        """
+        self.results = {}
+        self.failed = []
+        self.errors = {}
+
+        if not self.parallel:
+            for name in self.order:
+                try:
+                    self._record(name, self._run_stage(name))
+                except Exception as e:
+                    self._record(name, error=e)
+                if self.failed:
+                    break
+            return self.results
+
+        started = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                # Start everything whose inputs are ready (unless a stage failed)
+                if not self.failed:
+                    for name in self._ready_stages(started):
+                        if self.verbose:
+                            print(f"▶️ Starting stage: {name}")
+                        started.add(name)
+                        # Snapshot results here, on the only thread that mutates them.
+                        # Stages run in a copy of our context so context variables
+                        # (e.g. the active run's metrics) follow them into the pool.
+                        context = contextvars.copy_context()
+                        future = executor.submit(context.run, self.stages[name].func, dict(self.results))
+                        running[future] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self._record(name, future.result())
+                    except Exception as e:
+                        self._record(name, error=e)
+
+        return self.results
+
+    async def run_async(self) -> Dict[str, Any]:
+        """
+        Event-loop counterpart of run() for stages whose functions are async.
+
+        Ready stages are started as tasks (each task gets a copy of the
+        current context), with at most `max_workers` running at once.
+
+        Returns:
+            Dictionary of stage outputs keyed by stage name (see run())
+        """
+        self.results = {}
+        self.failed = []
+        self.errors = {}
+
+        if not self.parallel:
+            for name in self.order:
+                try:
+                    self._record(name, await self.stages[name].func(dict(self.results)))
+                except Exception as e:
+                    self._record(name, error=e)
+                if self.failed:
+                    break
+            return self.results
+
+        started = set()
+        running = {}
+
+        while True:
+            if not self.failed:
+                for name in self._ready_stages(started):
+                    if len(running) >= self.max_workers:
+                        break
+                    if self.verbose:
+                        print(f"▶️ Starting stage: {name}")
+                    started.add(name)
+                    task = asyncio.ensure_future(self.stages[name].func(dict(self.results)))
+                    running[task] = name
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                try:
+                    self._record(name, task.result())
+                except Exception as e:
+                    self._record(name, error=e)
+
+        return self.results
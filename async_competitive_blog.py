@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""
+Async Competitive Blog Generator
+
+An asyncio counterpart of CompetitiveBlogFixed for services that already
+run an event loop. Every blocking call is replaced by an awaitable one:
+- Groq calls use the chat model's `ainvoke` / `astream`
+- Serper requests use a pooled httpx.AsyncClient
+- Retries (RetryPolicy.call_async) and rate-limit waits use `asyncio.sleep`
+- SQLite caches, the topic index, checkpoints and output files are read
+  and written in worker threads (`asyncio.to_thread`)
+
+Prompts, parsers, research planning and checkpointing are inherited from
+the sync class, so both generators produce the same content. One event
+loop can drive dozens of generations at once:
+
+    generator = AsyncCompetitiveBlog()
+    posts = await asyncio.gather(*(generator.generate_competitive_blog(t) for t in topics))
+    await generator.aclose()
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple, TextIO
+
+from agent_scheduler import PipelineStage
+from competitive_blog_fixed_commented import CompetitiveBlogFixed
+from http_client import AsyncSerperHttpClient, httpx
+from instrumentation import (RunMetrics, track_run, stage_scope, annotate_stage, record_llm_call, record_search,
+                             current_stage)
+from retry_policy import RetryExhausted
+from structured_output import STRATEGY_SCHEMA, STRATEGY_REQUIRED, SEO_SCHEMA, SEO_REQUIRED
+
+
+def _write_text(path: str, text: str):
+    """Replace a file's contents (run in a worker thread)."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _append_chunk(f: TextIO, text: str):
+    """Append a streamed chunk and flush it so the file can be tailed (run in a worker thread)."""
+    f.write(text)
+    f.flush()
+
+
+# ============================================================================
+# MAIN CLASS: AsyncCompetitiveBlog
+# ============================================================================
+class AsyncCompetitiveBlog(CompetitiveBlogFixed):
+    """
+    Async-native blog generator sharing prompt building with CompetitiveBlogFixed.
+
+    `generate_competitive_blog` is a coroutine here; the sync pipeline
+    methods (strategy_analysis, conduct_research, ...) have `_async`
+    counterparts that should be used instead.
+    """
+
+    def __init__(self, config_path="blog_config.yaml"):
+        """
+        Args:
+            config_path: Path to YAML configuration file
+        """
+        super().__init__(config_path)
+
+        # httpx.AsyncClient is bound to an event loop, so it is created lazily
+        self._async_http: Optional[AsyncSerperHttpClient] = None
+        self._async_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_async_http(self) -> Optional[AsyncSerperHttpClient]:
+        """The async Serper client for the running loop (None without httpx)."""
+        if httpx is None:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_http_loop is not loop:
+            http_config = self.config.get('http', {})
+            self._async_http = AsyncSerperHttpClient(
+                self.serper_api_key, self.serper_base_url,
+                pool_size=http_config.get('pool_size', 20),
+                timeout=http_config.get('timeout_seconds', 10),
+                http2=http_config.get('http2', True)
+            )
+            self._async_http_loop = loop
+        return self._async_http
+
+    async def aclose(self):
+        """Close the async connection pool (call before the event loop ends)."""
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+            self._async_http_loop = None
+
+    def _http_client_stats(self) -> Optional[Dict[str, Any]]:
+        """Connection reuse metrics of the async client (or the pooled sync fallback)."""
+        if self._async_http is not None:
+            return self._async_http.stats()
+        return super()._http_client_stats()
+
+    # ========================================================================
+    # ASYNC AI CALLS
+    # ========================================================================
+    async def safe_llm_call_async(self, prompt: str, max_retries: int = None, stage: str = None,
+                                  model: str = None) -> Optional[str]:
+        """
+        Async version of safe_llm_call: same cache, limiter and retry policy.
+
+        Args:
+            prompt: The question/instruction for the AI
+            max_retries: Maximum attempts, including the first (uses config if None)
+            stage: Pipeline stage, for `llm.stage_models` routing (current stage if None)
+            model: Explicit model (overrides stage routing)
+
+        Returns:
+            AI response as string, or None if all retries failed
+        """
+        model = self.llm_pool.resolve_model(stage or current_stage(), model)
+        cache_settings = self._llm_cache_settings(model)
+        if self.llm_cache:
+            cached = await asyncio.to_thread(self.llm_cache.get, *cache_settings, prompt)
+            if cached is not None:
+                record_llm_call(cached=True, success=True, wall_seconds=0.0, retries=0, model=model,
+                                prompt_tokens=0, completion_tokens=0, rate_limit_wait_seconds=0.0)
+                return cached
+
+        call_stats = {'cached': False, 'success': False, 'rate_limit_wait_seconds': 0.0, 'model': model,
+                      'failovers': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                      **self.llm_retry.new_telemetry()}
+        started = time.perf_counter()
+
+        try:
+            response, backend = await self.llm_retry.call_async(
+                lambda: self.llm_pool.ainvoke(prompt, model, call_stats),
+                telemetry=call_stats, max_attempts=max_retries
+            )
+            content = self._response_text(response)
+
+            completion_tokens = self._completion_tokens(response, content)
+            backend.limiter.record_tokens(completion_tokens)
+            call_stats.update(success=True, completion_tokens=completion_tokens,
+                              prompt_tokens=self._prompt_tokens(response, prompt))
+
+            if self.llm_cache and content:
+                await asyncio.to_thread(self.llm_cache.set, *cache_settings, prompt, content)
+            return content
+        except RetryExhausted as e:
+            print(f"❌ LLM call failed: {e}")
+            return None
+        finally:
+            call_stats['wall_seconds'] = round(time.perf_counter() - started, 3)
+            record_llm_call(**call_stats)
+
+    async def stream_llm_call_async(self, prompt: str, topic: str, label: str) -> Optional[str]:
+        """
+        Async version of stream_llm_call, reading the response with `astream`.
+
+        Returns:
+            Full response text, or None if every attempt failed
+        """
+        echo = self.config.get('streaming', {}).get('echo_stdout', True)
+        stream_path = await asyncio.to_thread(self._stream_path, topic, label)
+
+        model = self.llm_pool.resolve_model(label)
+        cache_settings = self._llm_cache_settings(model)
+        if self.llm_cache:
+            cached = await asyncio.to_thread(self.llm_cache.get, *cache_settings, prompt)
+            if cached is not None:
+                await asyncio.to_thread(_write_text, stream_path, cached)
+                record_llm_call(cached=True, success=True, streaming=True, wall_seconds=0.0, retries=0, model=model,
+                                prompt_tokens=0, completion_tokens=0, rate_limit_wait_seconds=0.0)
+                return cached
+
+        if self.verbose_progress:
+            print(f"📡 Streaming {label} to {stream_path}")
+
+        stream = {'pieces': [], 'aggregate': None, 'first_token_at': None, 'file': None}
+
+        async def start(backend):
+            # A retry or failover starts the stream (and the file) over
+            if stream['pieces']:
+                if echo:
+                    print()
+                print(f"↩️ Restarting {label} stream on backend '{backend.name}'")
+            if stream['file']:
+                await asyncio.to_thread(stream['file'].close)
+            stream.update(pieces=[], aggregate=None, first_token_at=None,
+                          file=await asyncio.to_thread(open, stream_path, 'w', encoding='utf-8'))
+
+        async def add_chunk(chunk):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            stream['aggregate'] = chunk if stream['aggregate'] is None else stream['aggregate'] + chunk
+            if not text:
+                return
+            if stream['first_token_at'] is None:
+                stream['first_token_at'] = time.time()
+            stream['pieces'].append(text)
+            await asyncio.to_thread(_append_chunk, stream['file'], text)
+            if echo:
+                print(text, end='', flush=True)
+
+        call_stats = self._new_stream_stats(model)
+        started = time.time()
+        try:
+            backend = await self.llm_retry.call_async(
+                lambda: self.llm_pool.astream(prompt, model, call_stats, start, add_chunk),
+                telemetry=call_stats
+            )
+        except RetryExhausted as e:
+            if echo and stream['pieces']:
+                print()
+            print(f"❌ Streaming {label} failed: {e}")
+            call_stats['wall_seconds'] = round(time.time() - started, 3)
+            record_llm_call(**call_stats)
+            return None
+        finally:
+            if stream['file']:
+                await asyncio.to_thread(stream['file'].close)
+
+        if echo:
+            print()
+        content = "".join(stream['pieces'])
+        self._record_stream_metrics(label, prompt, content, stream['aggregate'], stream_path,
+                                    started, stream['first_token_at'], call_stats, backend)
+
+        if self.llm_cache and content:
+            await asyncio.to_thread(self.llm_cache.set, *cache_settings, prompt, content)
+        return content or None
+
+    # ========================================================================
+    # ASYNC WEB SEARCH
+    # ========================================================================
+    async def _serper_request_async(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async version of _serper_request (same cache, limiter, retry policy and telemetry).
+
+        Without httpx the pooled sync client is run in a worker thread.
+        """
+        if self.search_cache:
+            cached = await asyncio.to_thread(self.search_cache.get, endpoint, payload)
+            if cached is not None:
+                record_search(endpoint=endpoint, cached=True, success=True, bytes=0,
+                              wall_seconds=0.0, rate_limit_wait_seconds=0.0)
+                return cached
+
+        search_stats = {'endpoint': endpoint, 'cached': False, 'success': False, 'bytes': 0,
+                        'rate_limit_wait_seconds': 0.0, **self.search_retry.new_telemetry()}
+        started = time.perf_counter()
+        client = self._get_async_http()
+
+        async def attempt():
+            search_stats['rate_limit_wait_seconds'] += await self.search_limiter.acquire_async()
+            if client is not None:
+                response = await client.post(endpoint, payload)
+            else:
+                response = await asyncio.to_thread(self.http_client.post, endpoint, payload)
+            search_stats['bytes'] += len(response.content or b'')
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            data = await self.search_retry.call_async(attempt, telemetry=search_stats)
+            search_stats['success'] = True
+        finally:
+            search_stats['wall_seconds'] = round(time.perf_counter() - started, 3)
+            record_search(**search_stats)
+
+        if self.search_cache:
+            await asyncio.to_thread(self.search_cache.set, endpoint, payload, data)
+        return data
+
+    async def search_web_async(self, query: str, num_results: int = None) -> List[Dict]:
+        """Async version of search_web."""
+        results = await self._search_web_or_none_async(query, num_results)
+        return results if results is not None else []
+
+    async def _search_web_or_none_async(self, query: str, num_results: int = None) -> Optional[List[Dict]]:
+        """Async version of _search_web_or_none (None when the search failed)."""
+        if not self.serper_api_key:
+            return []
+        if num_results is None:
+            num_results = self._default_num_results()
+
+        try:
+            data = await self._serper_request_async('search', self._search_payload(query, num_results))
+            return self._parse_organic_results(data, num_results)
+        except Exception as e:
+            print(f"Search error: {e}")
+            return None
+
+    async def search_news_async(self, query: str, num_results: int = 3) -> List[Dict]:
+        """Async version of search_news."""
+        if not self.serper_api_key:
+            return []
+
+        try:
+            data = await self._serper_request_async('news', self._search_payload(query, num_results))
+            return self._parse_news_results(data, num_results)
+        except Exception as e:
+            print(f"News search error: {e}")
+            return []
+
+    async def conduct_research_async(self, topic: str) -> Dict[str, Any]:
+        """
+        Async Research Agent: run every query on the event loop at once.
+
+        Uses the same query plan, bucketing and adaptive waves as
+        conduct_research. At most `search.max_concurrent_searches` requests
+        are in flight per blog.
+
+        Args:
+            topic: The main topic to research
+
+        Returns:
+            Dictionary organized by research category
+        """
+        print(f"🔍 Researching: {topic}")
+        adaptive = self.plan_adaptive_research(topic)
+
+        search_config = self.config.get('search', {})
+        limit = max(1, search_config.get('max_concurrent_searches', 5))
+        if not search_config.get('concurrent_research', True):
+            limit = 1
+        semaphore = asyncio.Semaphore(limit)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        if adaptive:
+            plan, news_query, news_count = adaptive
+            news_task = asyncio.ensure_future(bounded(self.search_news_async(news_query, news_count)))
+            wave = plan.next_wave()
+            while wave:
+                results = await asyncio.gather(*(bounded(self._search_web_or_none_async(query)) for _, query in wave))
+                plan.record([(index, result) for (index, _), result in zip(wave, results)])
+                wave = plan.next_wave()
+            return self.assemble_research(topic, self.finish_adaptive_research(plan), await news_task)
+
+        queries, news_query, news_count = self.build_research_plan(topic)
+        if self.verbose_progress:
+            print(f"⚡ Running {len(queries) + 1} searches concurrently (max {limit} at once)")
+
+        # gather keeps query order, so buckets match the sync generator
+        *search_results, news_results = await asyncio.gather(
+            *(bounded(self.search_web_async(query)) for query in queries),
+            bounded(self.search_news_async(news_query, news_count))
+        )
+        return self.assemble_research(topic, search_results, news_results)
+
+    # ========================================================================
+    # ASYNC AGENTS (prompts and parsing shared with the sync class)
+    # ========================================================================
+    async def strategy_analysis_async(self, topic: str) -> Dict[str, Any]:
+        """Async Strategy Agent (see strategy_analysis)."""
+        print("🎯 Strategy Agent: Analyzing topic and market positioning...")
+        reused = await asyncio.to_thread(self.reuse_topic_result, topic, 'strategy')
+        if reused is not None:
+            return reused
+        response = await self.safe_llm_call_async(self.build_strategy_prompt(topic), stage='strategy')
+        result, reask_prompt = self.plan_agent_json('Strategy', topic, response, STRATEGY_SCHEMA, STRATEGY_REQUIRED)
+        reask_reply = await self.safe_llm_call_async(reask_prompt, stage='strategy') if reask_prompt else None
+        strategy_data = self.parse_strategy_response(topic, response, result, reask_reply)
+        await asyncio.to_thread(self.remember_topic_result, topic, 'strategy', result, strategy_data)
+        return strategy_data
+
+    async def seo_analysis_async(self, topic: str, strategy_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async SEO Agent (see seo_analysis)."""
+        print("🔍 SEO Agent: Conducting keyword research and optimization analysis...")
+        reused = await asyncio.to_thread(self.reuse_topic_result, topic, 'seo')
+        if reused is not None:
+            return reused
+        response = await self.safe_llm_call_async(self.build_seo_prompt(topic, strategy_data), stage='seo')
+        result, reask_prompt = self.plan_agent_json('SEO', topic, response, SEO_SCHEMA, SEO_REQUIRED)
+        reask_reply = await self.safe_llm_call_async(reask_prompt, stage='seo') if reask_prompt else None
+        seo_data = self.parse_seo_response(topic, strategy_data, response, result, reask_reply)
+        await asyncio.to_thread(self.remember_topic_result, topic, 'seo', result, seo_data)
+        return seo_data
+
+    async def analyze_research_async(self, topic: str, research_summary: str) -> Optional[str]:
+        """Async Analysis Agent (see analyze_research)."""
+        print("🔬 Analyzing competitive intelligence...")
+        analysis = await self.safe_llm_call_async(self.build_analysis_prompt(topic, research_summary),
+                                                  stage='analysis')
+        if not analysis:
+            print("❌ Analysis failed")
+            return None
+        return analysis
+
+    async def write_blog_async(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any],
+                               analysis: str, research_summary: str) -> Optional[str]:
+        """Async Writer Agent (see write_blog)."""
+        print("✍️ Writing SEO-optimized competitive blog post...")
+        sections = self.plan_sections(seo_data)
+        if sections:
+            blog_content = await self.write_blog_sectioned_async(topic, strategy_data, seo_data, analysis,
+                                                                 research_summary, sections)
+            if blog_content:
+                return blog_content
+            print("⚠️ Sectioned writing failed, writing the post in one pass")
+        blog_prompt = self.build_blog_prompt(topic, strategy_data, seo_data, analysis, research_summary)
+        if self.streaming_enabled:
+            blog_content = await self.stream_llm_call_async(blog_prompt, topic, self._stream_label('write', strategy_data))
+        else:
+            blog_content = await self.safe_llm_call_async(blog_prompt, stage='write')
+        if not blog_content:
+            print("❌ Blog writing failed")
+            return None
+        return blog_content
+
+    async def write_blog_sectioned_async(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any],
+                                         analysis: str, research_summary: str, sections: List[str]) -> Optional[str]:
+        """Async sectioned writing (see write_blog_sectioned)."""
+        limit = max(1, self.config.get('agents', {}).get('writer', {}).get('max_parallel_sections', 4))
+        if self.verbose_progress:
+            print(f"⚡ Writing {len(sections)} sections in parallel (max {limit} at once)")
+        annotate_stage(write_mode='sectioned', sections=len(sections))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def write_section(index: int) -> Optional[str]:
+            prompt = self.build_section_prompt(topic, strategy_data, seo_data, analysis, research_summary,
+                                               sections, index)
+            async with semaphore:
+                return await self.safe_llm_call_async(prompt, stage='write')
+
+        results = await asyncio.gather(*(write_section(index) for index in range(len(sections))))
+        if not all(results):
+            return None
+        contents = [self.clean_section(section, result) for section, result in zip(sections, results)]
+
+        title, stitch_prompt = self._stitch_plan(topic, seo_data, sections, contents)
+        intro, transitions = self.parse_stitch_response(
+            await self.safe_llm_call_async(stitch_prompt, stage='write') if stitch_prompt else None
+        )
+        return self.assemble_sections(title, contents, intro, transitions)
+
+    async def polish_blog_async(self, topic: str, blog_content: str, strategy_data: Dict[str, Any],
+                                seo_data: Dict[str, Any]) -> Optional[str]:
+        """Async Editor Agent (see polish_blog)."""
+        print("📝 Final editing, SEO optimization, and strategy alignment...")
+        plan = self.plan_polish(blog_content, seo_data)
+        if plan['mode'] == 'document':
+            draft = self._with_meta_description(plan['body'], plan['description'])
+            polish_prompt = self.build_polish_prompt(topic, draft, strategy_data, seo_data, plan['failures'])
+            if self.streaming_enabled:
+                polished = await self.stream_llm_call_async(polish_prompt, topic,
+                                                             self._stream_label('polish', strategy_data))
+            else:
+                polished = await self.safe_llm_call_async(polish_prompt, stage='polish')
+            return self.finish_polish(self.accept_document_polish(draft, polished), seo_data)
+
+        body = self.fix_structure(topic, plan, seo_data)
+
+        async def fix_meta() -> Optional[str]:
+            if not plan['fix_meta']:
+                return plan['description']
+            prompt = self.build_meta_description_prompt(topic, body, seo_data, plan['description'])
+            return self.clean_meta_description(await self.safe_llm_call_async(prompt, stage='polish'),
+                                               plan['description'])
+
+        async def extend() -> Optional[str]:
+            if not plan['extension']:
+                return None
+            prompt = self.build_extension_prompt(topic, body, plan['extension'], strategy_data, seo_data)
+            return await self.safe_llm_call_async(prompt, stage='polish')
+
+        async def edit_sections() -> str:
+            if not plan['edit_sections']:
+                return body
+            return await self.polish_blog_sections_async(topic, body, strategy_data, seo_data)
+
+        # The meta description, the new sections and the section edits are independent
+        description, added, edited = await asyncio.gather(fix_meta(), extend(), edit_sections())
+        return self.finish_polish(self._with_meta_description(self.insert_sections(edited, added), description),
+                                  seo_data)
+
+    async def polish_blog_sections_async(self, topic: str, blog_content: str, strategy_data: Dict[str, Any],
+                                         seo_data: Dict[str, Any]) -> Optional[str]:
+        """Async section editing (see polish_blog_sections)."""
+        sections, issues = self.plan_section_edits(blog_content, seo_data)
+        annotate_stage(edit_mode='sections', sections=len(sections), sections_edited=len(issues))
+        passing = sum(1 for index in range(len(sections)) if not issues.get(index))
+        print(f"🔎 {passing}/{len(sections)} sections pass local checks; editing {len(issues)}")
+        limit = max(1, self.config.get('agents', {}).get('editor', {}).get('max_parallel_sections', 4))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def edit_section(index: int) -> str:
+            prompt = self.build_section_polish_prompt(topic, sections[index], issues[index], index + 1,
+                                                      len(sections), strategy_data, seo_data)
+            async with semaphore:
+                revised = await self.safe_llm_call_async(prompt, stage='polish')
+            return self.merge_section_edit(sections[index], revised)
+
+        indexes = list(issues)
+        edited = dict(zip(indexes, await asyncio.gather(*(edit_section(index) for index in indexes))))
+        return self._finish_section_edits(sections, edited)
+
+    # ========================================================================
+    # ASYNC PIPELINE
+    # ========================================================================
+    def build_pipeline_stages(self, topic: str) -> List[PipelineStage]:
+        """
+        Same graph as CompetitiveBlogFixed.build_pipeline_stages, with async
+        stage functions (run by StageScheduler.run_async).
+        """
+        stages = super().build_pipeline_stages(topic)
+        async_funcs = {
+            'strategy': lambda r: self.strategy_analysis_async(topic),
+            'research': lambda r: self.conduct_research_async(topic),
+            'seo': lambda r: self.seo_analysis_async(topic, r['strategy']),
+            'analysis': lambda r: self.analyze_research_async(topic, self.format_research(r['research'])),
+            'write': lambda r: self.write_blog_async(topic, r['strategy'], r['seo'], r['analysis'],
+                                                     self.format_research(r['research'],
+                                                                          r['strategy'].get('content_angles'))),
+            'polish': lambda r: self.polish_blog_async(topic, r['write'], r['strategy'], r['seo']),
+        }
+        for stage in stages:
+            stage.func = async_funcs[stage.name]
+        return stages
+
+    def _skipped_variant_output(self):
+        """Async stage functions return awaitables, so the empty post is one too."""
+        async def empty_post():
+            return ''
+        return empty_post()
+
+    def _checkpointed_stage(self, name, func, store, fingerprint, resume):
+        """Async version of the checkpoint wrapper."""
+        async def run(results):
+            if resume:
+                saved = await asyncio.to_thread(store.load, name, fingerprint)
+                if saved is not None:
+                    print(f"♻️ Resumed '{name}' from checkpoint")
+                    annotate_stage(status='resumed')
+                    return saved
+            output = await func(results)
+            if output is not None:
+                await asyncio.to_thread(store.save, name, fingerprint, output)
+            return output
+        return run
+
+    @staticmethod
+    def _timed_stage(name, func):
+        """Async version of the stage timer."""
+        async def run(results):
+            with stage_scope(name) as record:
+                output = await func(results)
+                if output is None:
+                    record['status'] = 'failed'
+                return output
+        return run
+
+    @asynccontextmanager
+    async def checkpoint_lock_async(self, topic: str):
+        """checkpoint_lock with the directory setup and lock wait kept off the event loop."""
+        store = await asyncio.to_thread(self.open_checkpoints, topic)
+        try:
+            yield store
+        finally:
+            if store:
+                await asyncio.to_thread(store.release)
+
+    async def generate_competitive_blog(self, topic: str, resume: Optional[bool] = None,
+                                        run_metrics: Optional[RunMetrics] = None) -> Optional[str]:
+        """
+        Generate a blog post on the running event loop.
+
+        Same 5-agent pipeline, checkpoints and run report as
+        CompetitiveBlogFixed.generate_competitive_blog.
+
+        Args:
+            topic: The blog topic to write about
+            resume: Reuse saved stage outputs (uses `checkpoints.resume` if None)
+            run_metrics: Collector for timings and token usage (a new one is
+                created if None)
+
+        Returns:
+            Complete blog post as string, or None if generation failed
+        """
+        if run_metrics is None:
+            run_metrics = RunMetrics(topic)
+
+        async with self.checkpoint_lock_async(topic) as store:
+            with track_run(run_metrics):
+                scheduler = self._build_scheduler(topic, resume, store)
+                results = await scheduler.run_async()
+                final_content = self._pipeline_result(scheduler, results)
+        await asyncio.to_thread(self._finish_run, run_metrics, final_content)
+        return final_content
+
+    async def generate_blog_variants(self, topic: str, count: Optional[int] = None, vary: Optional[str] = None,
+                                     resume: Optional[bool] = None,
+                                     run_metrics: Optional[RunMetrics] = None) -> List[Dict[str, Any]]:
+        """
+        Several posts on one topic from one upstream run, on the running event loop.
+
+        Same variant graph as CompetitiveBlogFixed.generate_blog_variants:
+        strategy, research, SEO and analysis once, then every variant's
+        write + polish concurrently.
+        """
+        variants = self.plan_variants(count, vary)
+        if run_metrics is None:
+            run_metrics = RunMetrics(topic)
+
+        async with self.checkpoint_lock_async(topic) as store:
+            with track_run(run_metrics):
+                scheduler = self._build_scheduler(topic, resume, store, self.build_variant_stages(topic, variants),
+                                                  min_workers=len(variants))
+                results = await scheduler.run_async()
+                outputs = self._variant_outputs(scheduler, results, variants)
+        await asyncio.to_thread(self._finish_run, run_metrics,
+                                next((output['content'] for output in outputs if output['content']), None))
+        return outputs
+
+    async def generate_many(self, topics: List[str], max_concurrent: int = 10) -> List[Tuple[str, Optional[str]]]:
+        """
+        Generate several blogs on one event loop.
+
+        Args:
+            topics: Blog topics
+            max_concurrent: Generations in flight at the same time
+
+        Returns:
+            (topic, content or None) pairs in input order
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+
+        async def generate(topic):
+            async with semaphore:
+                try:
+                    return topic, await self.generate_competitive_blog(topic)
+                except Exception as e:
+                    print(f"❌ {topic}: {e}")
+                    return topic, None
+
+        return await asyncio.gather(*(generate(topic) for topic in topics))
+
+
+# ============================================================================
+# COMMAND LINE INTERFACE
+# ============================================================================
+async def _main_async(topics: List[str], config_path: str, max_concurrent: int,
+                      variant_count: Optional[int] = None, vary: Optional[str] = None):
+    generator = AsyncCompetitiveBlog(config_path)
+    try:
+        if variant_count or vary:
+            for topic in topics:
+                for variant in await generator.generate_blog_variants(topic, variant_count, vary):
+                    if variant['content']:
+                        path = generator.save_blog_post(variant['content'], topic, variant['name'])
+                        print(f"💾 Saved: {path}")
+                    else:
+                        print(f"❌ Failed: {topic} ({variant['name']})")
+            return
+        outcomes = await generator.generate_many(topics, max_concurrent)
+    finally:
+        await generator.aclose()
+
+    for topic, content in outcomes:
+        if content:
+            print(f"💾 Saved: {generator.save_blog_post(content, topic)}")
+        else:
+            print(f"❌ Failed: {topic}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate blogs concurrently on one asyncio event loop")
+    parser.add_argument('topics', nargs='+', help="Blog topics")
+    parser.add_argument('--config', default="blog_config.yaml", help="Configuration file")
+    parser.add_argument('--concurrency', type=int, default=10, help="Blogs generated at the same time")
+    parser.add_argument('--variants', type=int, default=None,
+                        help="Write N posts per topic from one strategy/research/SEO run")
+    parser.add_argument('--vary', choices=['angle', 'style', 'audience'], default=None,
+                        help="What differs between variants (default: variants.vary)")
+    args = parser.parse_args()
+    asyncio.run(_main_async(args.topics, args.config, args.concurrency, args.variants, args.vary))
+
+
+if __name__ == "__main__":
+    main()
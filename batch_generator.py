@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Batch Blog Generation
+
+Generates many blog posts in one process instead of one topic per run:
+- Reads topics from a JSONL file (one JSON object per line)
+- Runs jobs concurrently through a bounded worker pool
+- All workers share one generator, so one LLM client and one set of
+  rate limiters are built once and respected by every job
+- Writes every job's result or failure to a JSONL manifest as it finishes
+
+Topics file format (one job per line, blank lines ignored):
+    {"topic": "How to prevent bartholin cyst"}
+    {"id": "diet-01", "topic": "Diet for bartholin cyst"}
+
+Usage:
+    python batch_generator.py topics.jsonl
+    python batch_generator.py topics.jsonl --workers 4 --config blog_config.yaml
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List
+
+from competitive_blog_fixed_commented import CompetitiveBlogFixed
+from instrumentation import RunMetrics
+
+
+# ============================================================================
+# TOPICS FILE
+# ============================================================================
+def load_jobs(topics_path: str) -> List[Dict[str, Any]]:
+    """
+    Read batch jobs from a JSONL topics file.
+
+    Each line must be a JSON object with a "topic" key. An optional "id"
+    is kept in the manifest; otherwise the line number is used.
+
+    Args:
+        topics_path: Path to the JSONL file
+
+    Returns:
+        List of job dictionaries with 'id' and 'topic'
+    """
+    jobs = []
+    with open(topics_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{topics_path}:{line_number}: invalid JSON ({e})")
+            topic = entry.get('topic') if isinstance(entry, dict) else None
+            if not topic:
+                raise ValueError(f"{topics_path}:{line_number}: missing \"topic\"")
+            jobs.append({'id': str(entry.get('id', line_number)), 'topic': topic})
+    return jobs
+
+
+# ============================================================================
+# BATCH RUNNER
+# ============================================================================
+class BatchRunner:
+    """
+    Runs blog generation jobs through a bounded worker pool.
+
+    A single CompetitiveBlogFixed instance is shared by all workers; it
+    holds no per-topic state, so jobs only share its LLM client, HTTP
+    settings and the process-wide rate limiters.
+    """
+
+    def __init__(self, generator: CompetitiveBlogFixed, max_workers: int = 3,
+                 manifest_dir: str = "output/batches"):
+        """
+        Args:
+            generator: Shared blog generator
+            max_workers: Maximum number of blogs generated at the same time
+            manifest_dir: Directory where the batch manifest is written
+        """
+        self.generator = generator
+        self.max_workers = max(1, max_workers)
+        self.manifest_dir = manifest_dir
+        self._manifest_lock = threading.Lock()
+
+    def _run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate and save one blog post, capturing failures as data."""
+        started = time.time()
+        record = {'id': job['id'], 'topic': job['topic'], 'status': 'failed',
+                  'output_path': None, 'error': None}
+        run_metrics = RunMetrics(job['topic'])
+        try:
+            content = self.generator.generate_competitive_blog(job['topic'], run_metrics=run_metrics)
+            if content:
+                record['output_path'] = self.generator.save_blog_post(content, job['topic'])
+                record['status'] = 'succeeded'
+                record['word_count'] = len(content.split())
+            else:
+                record['error'] = 'Generation returned no content'
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+        record['duration_seconds'] = round(time.time() - started, 2)
+        if 'refinement' in run_metrics.extra:
+            record['refinement'] = run_metrics.extra['refinement']
+        return record
+
+    def _append_manifest(self, manifest_path: str, record: Dict[str, Any]):
+        """Append one job record; the manifest stays valid if the batch is killed."""
+        with self._manifest_lock:
+            with open(manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def run(self, jobs: List[Dict[str, Any]]) -> str:
+        """
+        Run every job and write the manifest.
+
+        Args:
+            jobs: Jobs from load_jobs()
+
+        Returns:
+            Path to the JSONL manifest
+        """
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        manifest_path = os.path.join(self.manifest_dir, f"{timestamp}_manifest.jsonl")
+
+        print(f"📦 Batch: {len(jobs)} topics, {self.max_workers} workers")
+        print(f"🗂️ Manifest: {manifest_path}")
+
+        started = time.time()
+        succeeded = 0
+        refinements = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._run_job, job): job for job in jobs}
+            for done_count, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                self._append_manifest(manifest_path, record)
+                if record.get('refinement'):
+                    refinements.append(record['refinement'])
+                if record['status'] == 'succeeded':
+                    succeeded += 1
+                    print(f"✅ [{done_count}/{len(jobs)}] {record['topic']} → {record['output_path']}")
+                else:
+                    print(f"❌ [{done_count}/{len(jobs)}] {record['topic']}: {record['error']}")
+
+        elapsed = time.time() - started
+        print(f"\n📊 Batch complete: {succeeded}/{len(jobs)} succeeded in {elapsed:.1f}s")
+        refinement = self.generator.combine_refinement_reports(refinements)
+        if refinement['drafts']:
+            print(f"🛠️ Drafts refined: {refinement['drafts'] - refinement['accepted']}/{refinement['drafts']} "
+                  f"({refinement['refinement_rate']:.0%}); sections refined: {refinement['sections_refined']}/"
+                  f"{refinement['sections_checked']} (draft: {refinement['draft_model']}, "
+                  f"refine: {refinement['refine_model']})")
+        if self.generator.topic_index:
+            reuse = self.generator.topic_index.stats()
+            print(f"♻️ Topic reuse: {sum(reuse['hits'].values())}/{sum(reuse['lookups'].values())} "
+                  f"strategy/SEO lookups answered from related topics ({reuse['hit_rate']:.0%})")
+        return manifest_path
+
+
+# ============================================================================
+# COMMAND LINE INTERFACE
+# ============================================================================
+def main():
+    """Parse arguments and run a batch."""
+    parser = argparse.ArgumentParser(description="Generate many competitive blog posts from a JSONL topics file")
+    parser.add_argument('topics_file', help="JSONL file with one {\"topic\": ...} object per line")
+    parser.add_argument('--workers', type=int, default=None, help="Concurrent jobs (default: batch.max_workers)")
+    parser.add_argument('--config', default="blog_config.yaml", help="Configuration file")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.topics_file)
+    if not jobs:
+        print(f"⚠️ No topics found in {args.topics_file}")
+        return
+
+    # One generator for the whole batch: config, LLM client and limiters are built once
+    generator = CompetitiveBlogFixed(args.config)
+    batch_config = generator.config.get('batch', {})
+    runner = BatchRunner(
+        generator,
+        max_workers=args.workers or batch_config.get('max_workers', 3),
+        manifest_dir=batch_config.get('manifest_dir', "output/batches")
+    )
+    runner.run(jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Offline Pipeline Benchmark
+
+Runs CompetitiveBlogFixed end to end against the local Groq/Serper
+stand-ins from mock_servers.py, so performance changes can be validated
+reproducibly without API keys or network access.
+
+Reports:
+- Throughput (blogs per minute)
+- p50 / p95 latency for the whole blog and for every stage
+- Peak Python memory (tracemalloc)
+- Requests served by the mock APIs (including injected 429s)
+
+Usage:
+    python benchmark_pipeline.py
+    python benchmark_pipeline.py --blogs 12 --concurrency 4 --llm-latency-ms 800 --rate-limit-probability 0.05
+    python benchmark_pipeline.py --json bench_results.json
+    python benchmark_pipeline.py --output-tokens-per-second 300 --draft-model llama-3.1-8b-instant --draft-tokens-per-second 1200
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import yaml
+
+from mock_servers import MockAPIServer, MockBackendConfig
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def build_benchmark_config(base_config_path: str, base_url: str, streaming: bool,
+                           draft_model: str = None) -> Dict[str, Any]:
+    """
+    Load the normal config and point it at the mock server.
+
+    Caches, checkpoints and run reports are switched off so every run does
+    the full amount of work, and the client-side rate limits are lifted so
+    the mock's own latency and 429s are what gets measured.
+    """
+    with open(base_config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+
+    config.setdefault('llm', {})['base_url'] = base_url
+    if draft_model is not None:
+        config['llm']['draft_model'] = draft_model or None  # "" benchmarks without a draft model
+    config.setdefault('search', {})['serper_base_url'] = base_url
+    # Representative research load: the four standard query-template categories
+    config.setdefault('agents', {}).setdefault('research', {})['focus_areas'] = [
+        'market_trends', 'competitor_analysis', 'industry_news', 'data_points']
+    config.setdefault('search_cache', {})['enabled'] = False
+    config.setdefault('llm_cache', {})['enabled'] = False
+    config.setdefault('topic_reuse', {})['enabled'] = False
+    config.setdefault('checkpoints', {})['enabled'] = False
+    config.setdefault('streaming', {}).update(enabled=streaming, echo_stdout=False,
+                                              output_dir=os.path.join(tempfile.gettempdir(), "blog_bench_stream"))
+    config.setdefault('monitoring', {}).update(run_report=False, verbose_progress=False)
+    config.setdefault('rate_limiting', {})['providers'] = {
+        'groq': {'requests_per_minute': 100000, 'tokens_per_minute': 100000000},
+        'serper': {'requests_per_minute': 100000},
+    }
+    return config
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(args) -> Dict[str, Any]:
+    """Start the mock server, generate the blogs and compute the statistics."""
+    # Dummy keys: the generator requires them, the mock ignores them
+    os.environ.setdefault('GROQ_API_KEY', 'mock-groq-key')
+    os.environ.setdefault('SERPER_API_KEY', 'mock-serper-key')
+
+    # Imported here so the dummy keys are in place before load_dotenv runs
+    from competitive_blog_fixed_commented import CompetitiveBlogFixed
+    from instrumentation import RunMetrics
+    from rate_limiter import reset_rate_limiters
+
+    mock_config = MockBackendConfig(
+        llm_latency_ms=args.llm_latency_ms, search_latency_ms=args.search_latency_ms,
+        jitter_ms=args.jitter_ms, rate_limit_probability=args.rate_limit_probability,
+        retry_after_seconds=args.retry_after_seconds, response_words=args.response_words,
+        search_results=args.search_results, output_tokens_per_second=args.output_tokens_per_second,
+        seed=args.seed
+    )
+
+    with MockAPIServer(mock_config) as server:
+        config = build_benchmark_config(args.config, server.base_url, args.streaming, args.draft_model)
+        draft_model = config['llm'].get('draft_model')
+        if draft_model and args.draft_tokens_per_second:
+            mock_config.model_tokens_per_second[draft_model] = args.draft_tokens_per_second
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+            yaml.safe_dump(config, f)
+            config_path = f.name
+
+        try:
+            reset_rate_limiters()
+            quiet = io.StringIO() if not args.verbose else None
+            with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+                generator = CompetitiveBlogFixed(config_path)
+
+            topics = [f"{args.topic} {i + 1}" for i in range(args.blogs)]
+            metrics = {topic: RunMetrics(topic) for topic in topics}
+
+            def generate(topic):
+                started = time.perf_counter()
+                content = generator.generate_competitive_blog(topic, run_metrics=metrics[topic])
+                return topic, bool(content), time.perf_counter() - started
+
+            print(f"🧪 Benchmark: {args.blogs} blogs, concurrency {args.concurrency}, mock at {server.base_url}")
+            tracemalloc.start()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+                with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+                    outcomes = list(executor.map(generate, topics))
+            elapsed = time.perf_counter() - started
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            os.unlink(config_path)
+
+        request_counts = dict(server.request_counts)
+
+    # Aggregate per-blog and per-stage latencies
+    blog_latencies = [seconds for _, ok, seconds in outcomes if ok]
+    stage_latencies: Dict[str, List[float]] = {}
+    for run in metrics.values():
+        for name, record in run.stages.items():
+            if record.get('wall_seconds') is not None:
+                stage_latencies.setdefault(name, []).append(record['wall_seconds'])
+
+    succeeded = len(blog_latencies)
+    return {
+        'blogs': args.blogs,
+        'succeeded': succeeded,
+        'concurrency': args.concurrency,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_blogs_per_minute': round(succeeded / elapsed * 60, 2) if elapsed else 0.0,
+        'blog_latency_seconds': {'p50': round(percentile(blog_latencies, 50), 3),
+                                 'p95': round(percentile(blog_latencies, 95), 3)},
+        'stage_latency_seconds': {
+            name: {'p50': round(percentile(values, 50), 3), 'p95': round(percentile(values, 95), 3)}
+            for name, values in stage_latencies.items()
+        },
+        'peak_memory_mb': round(peak_bytes / (1024 * 1024), 2),
+        'mock_requests': request_counts,
+        'refinement': generator.combine_refinement_reports(
+            [run.extra['refinement'] for run in metrics.values() if 'refinement' in run.extra]),
+        'mock_settings': vars(mock_config),
+    }
+
+
+def print_report(results: Dict[str, Any]):
+    """Human-readable summary of run_benchmark() results."""
+    print("\n📊 BENCHMARK RESULTS")
+    print("=" * 60)
+    print(f"Blogs:       {results['succeeded']}/{results['blogs']} succeeded "
+          f"(concurrency {results['concurrency']})")
+    print(f"Elapsed:     {results['elapsed_seconds']}s")
+    print(f"Throughput:  {results['throughput_blogs_per_minute']} blogs/min")
+    print(f"Blog p50/95: {results['blog_latency_seconds']['p50']}s / {results['blog_latency_seconds']['p95']}s")
+    print(f"Peak memory: {results['peak_memory_mb']} MB")
+    print("\nStage latency (p50 / p95):")
+    for name, stats in results['stage_latency_seconds'].items():
+        print(f"  {name:<10} {stats['p50']:>8}s / {stats['p95']}s")
+    refinement = results['refinement']
+    print(f"\nRefinement:  {refinement['accepted']}/{refinement['drafts']} drafts accepted as written, "
+          f"{refinement['sections_refined']}/{refinement['sections_checked']} sections refined "
+          f"(draft: {refinement['draft_model']}, refine: {refinement['refine_model']})")
+    print(f"\nMock requests: {results['mock_requests']}")
+
+
+# ============================================================================
+# COMMAND LINE INTERFACE
+# ============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blog pipeline against local mock APIs")
+    parser.add_argument('--blogs', type=int, default=6, help="Number of blogs to generate")
+    parser.add_argument('--concurrency', type=int, default=3, help="Blogs generated at the same time")
+    parser.add_argument('--topic', default="Benchmark topic", help="Topic prefix")
+    parser.add_argument('--config', default="blog_config.yaml", help="Base configuration file")
+    parser.add_argument('--llm-latency-ms', type=float, default=500)
+    parser.add_argument('--search-latency-ms', type=float, default=300)
+    parser.add_argument('--jitter-ms', type=float, default=100)
+    parser.add_argument('--rate-limit-probability', type=float, default=0.0, help="Chance of an injected 429")
+    parser.add_argument('--retry-after-seconds', type=float, default=1)
+    parser.add_argument('--response-words', type=int, default=600, help="Words per generated article")
+    parser.add_argument('--search-results', type=int, default=10)
+    parser.add_argument('--output-tokens-per-second', type=float, default=0,
+                        help="Simulated decode speed (0 = answers arrive at once)")
+    parser.add_argument('--draft-model', help="Draft model for the write stage (\"\" = none; default: from config)")
+    parser.add_argument('--draft-tokens-per-second', type=float, default=0,
+                        help="Simulated decode speed of the draft model")
+    parser.add_argument('--streaming', action='store_true', help="Benchmark the streaming writer/editor")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', help="Also write results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Show the generator's progress output")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
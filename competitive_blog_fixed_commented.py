@@ -15,18 +15,42 @@ This file demonstrates a complete competitive blog generation system with:
 # ============================================================================
 import os              # For file operations and environment variables
 import yaml            # For reading configuration files
+import copy            # For per-variant copies of the strategy
 import json            # For JSON data processing
-import requests        # For making HTTP requests to APIs
+import math            # For splitting word targets across sections
+import re              # For parsing AI responses
 import time            # For rate limiting and delays
+from concurrent.futures import ThreadPoolExecutor  # For concurrent searches
+from contextlib import contextmanager  # For holding a topic's checkpoint lock
 from datetime import datetime          # For timestamps
-from typing import List, Dict, Any, Optional  # For type hints
+from typing import List, Dict, Any, Optional, Tuple  # For type hints
 from dotenv import load_dotenv        # For loading .env files
 from langchain_groq import ChatGroq   # For Groq LLM integration
 
+from agent_scheduler import PipelineStage, StageScheduler  # For running agents as a dependency graph
+from rate_limiter import get_rate_limiter, estimate_tokens  # Shared per-provider quotas
+from response_cache import create_search_cache, create_llm_cache  # On-disk caches for search results and AI responses
+from run_checkpoints import RunCheckpointStore  # Resumable per-stage outputs
+from http_client import get_serper_client  # Pooled keep-alive connections for Serper
+from retry_policy import RetryPolicy, RetryExhausted  # Header-aware retries for AI and search calls
+from llm_pool import LLMBackend, LLMBackendPool  # Multi-key/multi-model routing with failover
+from context_budget import ContextBudget, compress_research, count_tokens, split_sentences  # Token budgets per prompt section
+from research_index import AdaptiveResearch, ResearchIndex, rerank_research  # Dedupe, rank and budget search results
+from seo_metrics import (MarkdownSection, split_sections, section_issues,  # Local content checks
+                         analyze_post, failed_checks, fix_heading_structure, headings,
+                         split_meta_description)
+from topic_index import create_topic_index  # Reuse strategy/SEO results across related topics
+from structured_output import (StructuredResult, STRATEGY_SCHEMA, STRATEGY_REQUIRED,  # Tolerant agent JSON
+                               SEO_SCHEMA, SEO_REQUIRED, parse_structured, fill_defaults, build_reask_prompt)
+from instrumentation import (RunMetrics, track_run, stage_scope, annotate_stage,  # Timing/token reports
+                             record_llm_call, record_search, in_current_context, current_stage)
+
 # Load environment variables from .env file
 # This looks for GROQ_API_KEY and SERPER_API_KEY
 load_dotenv()
 
+# Per-run counters of how drafts were refined (see refinement_report)
+REFINEMENT_COUNTS = ('drafts', 'accepted', 'targeted', 'document', 'sections_checked', 'sections_refined')
 # ============================================================================
 # MAIN CLASS: CompetitiveBlogFixed
 # ============================================================================
@@ -48,24 +72,49 @@ class CompetitiveBlogFixed:
         # Load configuration settings from YAML file
         self.config = self.load_config(config_path)
         
-        # Initialize the AI language model (Groq)
-        self.llm = self.setup_llm()
+        # Initialize the AI language models (Groq): one or more API keys/models,
+        # each with its own quota, chosen per call by the backend pool
+        self.llm_pool = LLMBackendPool.from_config(self.config, self.setup_llm)
+        self.llm = self.llm_pool.primary().llm  # Default-model client
+        
+        # Cache for identical AI prompts (None if disabled)
+        self.llm_cache = create_llm_cache(self.config)
+        
+        # Strategy/SEO results of earlier topics, reused for related topics (None if disabled)
+        self.topic_index = create_topic_index(self.config)
+        
+        # Token budgets for prompt sections (None = legacy fixed-length slicing)
+        self.context_budget = ContextBudget.from_config(self.config)
         
-        # Get Serper API key for web search
+        # Stream the Writer/Editor output (time to first token and tokens/sec
+        # go into the run's stage records)
+        self.streaming_enabled = self.config.get('streaming', {}).get('enabled', False)
+        
+        # Get Serper API key and endpoint for web search
         self.serper_api_key = os.getenv('SERPER_API_KEY')
+        self.serper_base_url = self.config.get('search', {}).get('serper_base_url', "https://google.serper.dev").rstrip('/')
         
-        # Set delays from config with fallbacks
-        rate_config = self.config.get('rate_limiting', {})
-        self.request_delay = rate_config.get('llm_delay_seconds', 2)
-        self.search_delay = rate_config.get('search_delay_seconds', 1)
-        self.max_retries = rate_config.get('max_retries', 3)
-        self.backoff_multiplier = rate_config.get('backoff_multiplier', 2)
+        # Pooled HTTP client (auth headers built once, shared across generators)
+        self.http_client = (get_serper_client(self.serper_api_key, self.serper_base_url, self.config.get('http', {}))
+                            if self.serper_api_key else None)
+        
+        # Persistent cache for Serper responses (None if disabled)
+        self.search_cache = create_search_cache(self.config)
         
         # Check monitoring settings
         monitoring = self.config.get('monitoring', {})
         self.verbose_progress = monitoring.get('verbose_progress', True)
         self.show_research_summary = monitoring.get('show_research_summary', True)
         
+        # Retry policies (header-aware waits, jittered backoff, fatal errors fail fast)
+        rate_config = self.config.get('rate_limiting', {})
+        self.llm_retry = RetryPolicy.from_config("LLM call", 'llm', rate_config)
+        self.search_retry = RetryPolicy.from_config("Search", 'search', rate_config,
+                                                    verbose=self.verbose_progress)
+        
+        # Shared token-bucket limiter for Serper (LLM limiters live on the pool's backends)
+        self.search_limiter = get_rate_limiter('serper', rate_config)
+        
         # Check if web search is available
         if not self.serper_api_key:
             print("⚠️ Warning: SERPER_API_KEY not found. Using LLM knowledge only.")
@@ -75,7 +124,7 @@ class CompetitiveBlogFixed:
         # Print config status if verbose
         if self.verbose_progress:
             print(f"📋 Config loaded: {config_path}")
-            print(f"⚙️ Rate limiting: {self.request_delay}s LLM, {self.search_delay}s search")
+            print(f"⚙️ Rate limiting: {self.llm_pool.describe()} | {self.search_limiter.describe()}")
     
     # ========================================================================
     # CONFIGURATION MANAGEMENT
@@ -110,29 +159,37 @@ class CompetitiveBlogFixed:
     # ========================================================================
     # AI MODEL SETUP
     # ========================================================================
-    def setup_llm(self):
+    def setup_llm(self, model: str = None, api_key: str = None, base_url: str = None):
         """
         Initialize the Groq AI language model with error handling.
         
         Groq provides fast inference for Llama models, making it ideal
         for content generation that needs to be both quick and high-quality.
+        
+        Args:
+            model: Model name (uses llm.model if None)
+            api_key: Groq API key (uses GROQ_API_KEY if None)
+            base_url: API endpoint (uses llm.base_url if None)
         """
-        api_key = os.getenv('GROQ_API_KEY')
+        api_key = api_key or os.getenv('GROQ_API_KEY')
         if not api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
         
         # Create the ChatGroq instance with our configuration
         return ChatGroq(
-            model=self.config['llm']['model'],              # Which AI model to use
+            model=model or self.config['llm']['model'],     # Which AI model to use
             temperature=self.config['llm']['temperature'],  # Creativity level (0-1)
             max_tokens=self.config['llm'].get('max_tokens', 1500),  # Response length
+            base_url=base_url or self.config['llm'].get('base_url'),  # None = Groq's public API
+            max_retries=0,  # Retries are handled (and reported) by safe_llm_call's RetryPolicy
             api_key=api_key
         )
     
     # ========================================================================
     # ROBUST AI INTERACTION WITH RATE LIMITING
     # ========================================================================
-    def safe_llm_call(self, prompt: str, max_retries: int = None) -> Optional[str]:
+    def safe_llm_call(self, prompt: str, max_retries: int = None, stage: str = None,
+                      model: str = None) -> Optional[str]:
         """
         Make AI calls with intelligent retry logic and rate limiting.
         
@@ -141,61 +198,231 @@ class CompetitiveBlogFixed:
         2. Network requests can fail
         3. Different response formats need handling
         
+        Retries follow self.llm_retry (see retry_policy.py): rate limits wait
+        for the provider's Retry-After / reset headers, other transient
+        errors back off with jitter, and fatal errors (e.g. a bad API key)
+        are not retried at all.
+        
+        Each attempt goes to the least-loaded healthy backend serving the
+        call's model; a backend that is rate limited or down is skipped
+        for the next one (see llm_pool.py).
+        
         Args:
             prompt: The question/instruction for the AI
-            max_retries: How many times to try if it fails (uses config if None)
+            max_retries: Maximum attempts, including the first (uses config if None)
+            stage: Pipeline stage, for `llm.stage_models` routing (current stage if None)
+            model: Explicit model (overrides stage routing)
             
         Returns:
             String response from AI, or None if all retries failed
         """
+        model = self.llm_pool.resolve_model(stage or current_stage(), model)
+        
+        # Identical prompt with identical model settings? Reuse the answer
+        cache_settings = self._llm_cache_settings(model)
+        if self.llm_cache:
+            cached = self.llm_cache.get(*cache_settings, prompt)
+            if cached is not None:
+                record_llm_call(cached=True, success=True, wall_seconds=0.0, retries=0, model=model,
+                                prompt_tokens=0, completion_tokens=0, rate_limit_wait_seconds=0.0)
+                return cached
+        
+        # Per-call telemetry for the run report
+        call_stats = {'cached': False, 'success': False, 'rate_limit_wait_seconds': 0.0, 'model': model,
+                      'failovers': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                      **self.llm_retry.new_telemetry()}
+        started = time.perf_counter()
         
-        # Use config setting for max_retries if not specified
-        if max_retries is None:
-            max_retries = self.max_retries
-        
-        for attempt in range(max_retries):
-            try:
-                # If this isn't the first attempt, wait progressively longer
-                if attempt > 0:
-                    wait_time = self.request_delay * (self.backoff_multiplier ** attempt)  # Config-driven backoff
-                    print(f"⏳ Waiting {wait_time}s before retry {attempt+1}...")
-                    time.sleep(wait_time)
-                
-                # Make the actual AI request
-                response = self.llm.invoke(prompt)
-                
-                # Handle different response formats from different LLM libraries
-                if hasattr(response, 'content'):
-                    content = response.content        # Most common format
-                elif hasattr(response, 'text'):
-                    content = response.text          # Alternative format
-                elif isinstance(response, str):
-                    content = response               # Direct string response
-                else:
-                    content = str(response)          # Fallback conversion
-                
-                # Wait before next call to respect rate limits
-                time.sleep(self.request_delay)
-                return content
-                
-            except Exception as e:
-                error_msg = str(e).lower()
-                
-                # Special handling for rate limit errors
-                if '429' in error_msg or 'rate limit' in error_msg:
-                    if attempt < max_retries - 1:
-                        wait_time = 30 * (attempt + 1)  # Wait longer for rate limits
-                        print(f"⚠️ Rate limit hit. Waiting {wait_time}s...")
-                        time.sleep(wait_time)
-                        continue  # Try again after waiting
-                
-                print(f"❌ LLM call failed (attempt {attempt+1}): {e}")
-                
-                # If this was our last retry, give up
-                if attempt == max_retries - 1:
-                    return None
+        try:
+            # Each attempt waits for its backend's budget, then fails over across
+            # backends; retries wait as long as the provider asks
+            response, backend = self.llm_retry.call(
+                lambda: self.llm_pool.invoke(prompt, model, call_stats),
+                telemetry=call_stats, max_attempts=max_retries
+            )
+            content = self._response_text(response)
+            
+            # Charge the completion tokens against the backend's budget
+            completion_tokens = self._completion_tokens(response, content)
+            backend.limiter.record_tokens(completion_tokens)
+            call_stats.update(success=True, completion_tokens=completion_tokens,
+                              prompt_tokens=self._prompt_tokens(response, prompt))
+            
+            if self.llm_cache and content:
+                self.llm_cache.set(*cache_settings, prompt, content)
+            return content
+        except RetryExhausted as e:
+            print(f"❌ LLM call failed: {e}")
+            return None
+        finally:
+            call_stats['wall_seconds'] = round(time.perf_counter() - started, 3)
+            record_llm_call(**call_stats)
+    
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """Handle different response formats from different LLM libraries."""
+        if hasattr(response, 'content'):
+            return response.content        # Most common format
+        elif hasattr(response, 'text'):
+            return response.text          # Alternative format
+        elif isinstance(response, str):
+            return response               # Direct string response
+        return str(response)              # Fallback conversion
+    
+    @staticmethod
+    def _prompt_tokens(response: Any, prompt: str) -> int:
+        """Prompt token count reported by the provider, or a local estimate."""
+        usage = getattr(response, 'usage_metadata', None) or {}
+        return usage.get('input_tokens') or estimate_tokens(prompt)
+    
+    @staticmethod
+    def _completion_tokens(response: Any, content: str) -> int:
+        """
+        Completion token count reported by the provider, or a local estimate.
         
-        return None
+        LangChain chat models expose usage as `usage_metadata`
+        ({'input_tokens', 'output_tokens', ...}) when the API returns it.
+        """
+        usage = getattr(response, 'usage_metadata', None) or {}
+        return usage.get('output_tokens') or estimate_tokens(content)
+    
+    def _llm_cache_settings(self, model: str = None) -> Tuple[str, float, int]:
+        """Model settings that, together with the prompt, identify a cached response."""
+        llm_config = self.config['llm']
+        return model or llm_config['model'], llm_config['temperature'], llm_config.get('max_tokens', 1500)
+    
+    # ========================================================================
+    # STREAMING AI OUTPUT (Writer and Editor)
+    # ========================================================================
+    def stream_llm_call(self, prompt: str, topic: str, label: str) -> Optional[str]:
+        """
+        Stream an AI response token by token to a markdown file and stdout.
+        
+        Long 2,500-word generations become visible as they are written, and
+        anything watching the file can start on the partial draft. Backend
+        failover and retries work as in safe_llm_call; a stream that breaks
+        part-way is started over, file included.
+        
+        Args:
+            prompt: The question/instruction for the AI
+            topic: Blog topic (used for the output filename)
+            label: Stage label, e.g. 'write' or 'polish'
+            
+        Returns:
+            Full response text, or None if every attempt failed
+        """
+        echo = self.config.get('streaming', {}).get('echo_stdout', True)
+        stream_path = self._stream_path(topic, label)
+        
+        # The stage label doubles as the stage name for model routing
+        model = self.llm_pool.resolve_model(label)
+        
+        # A cached answer is written out in one go
+        cache_settings = self._llm_cache_settings(model)
+        if self.llm_cache:
+            cached = self.llm_cache.get(*cache_settings, prompt)
+            if cached is not None:
+                with open(stream_path, 'w', encoding='utf-8') as f:
+                    f.write(cached)
+                record_llm_call(cached=True, success=True, streaming=True, wall_seconds=0.0, retries=0, model=model,
+                                prompt_tokens=0, completion_tokens=0, rate_limit_wait_seconds=0.0)
+                return cached
+        
+        if self.verbose_progress:
+            print(f"📡 Streaming {label} to {stream_path}")
+        
+        stream = {'pieces': [], 'aggregate': None, 'first_token_at': None, 'file': None}
+        
+        def start(backend: LLMBackend):
+            # A retry or failover starts the stream (and the file) over
+            if stream['pieces']:
+                if echo:
+                    print()
+                print(f"↩️ Restarting {label} stream on backend '{backend.name}'")
+            if stream['file']:
+                stream['file'].close()
+            stream.update(pieces=[], aggregate=None, first_token_at=None,
+                          file=open(stream_path, 'w', encoding='utf-8'))
+        
+        def add_chunk(chunk: Any):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            stream['aggregate'] = chunk if stream['aggregate'] is None else stream['aggregate'] + chunk
+            if not text:
+                return
+            if stream['first_token_at'] is None:
+                stream['first_token_at'] = time.time()
+            stream['pieces'].append(text)
+            stream['file'].write(text)
+            stream['file'].flush()
+            if echo:
+                print(text, end='', flush=True)
+        
+        call_stats = self._new_stream_stats(model)
+        started = time.time()
+        try:
+            # Same backend failover and retry policy as safe_llm_call
+            backend = self.llm_retry.call(
+                lambda: self.llm_pool.stream(prompt, model, call_stats, start, add_chunk),
+                telemetry=call_stats
+            )
+        except RetryExhausted as e:
+            if echo and stream['pieces']:
+                print()
+            print(f"❌ Streaming {label} failed: {e}")
+            call_stats['wall_seconds'] = round(time.time() - started, 3)
+            record_llm_call(**call_stats)
+            return None
+        finally:
+            if stream['file']:
+                stream['file'].close()
+        
+        if echo:
+            print()
+        content = "".join(stream['pieces'])
+        self._record_stream_metrics(label, prompt, content, stream['aggregate'], stream_path,
+                                    started, stream['first_token_at'], call_stats, backend)
+        
+        if self.llm_cache and content:
+            self.llm_cache.set(*cache_settings, prompt, content)
+        return content or None
+    
+    def _new_stream_stats(self, model: str) -> Dict[str, Any]:
+        """Per-call telemetry for a streamed call (see safe_llm_call)."""
+        return {'cached': False, 'success': False, 'streaming': True, 'rate_limit_wait_seconds': 0.0,
+                'model': model, 'failovers': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                **self.llm_retry.new_telemetry()}
+    
+    def _stream_path(self, topic: str, label: str) -> str:
+        """Markdown file a streamed stage is written to."""
+        output_dir = self.config.get('streaming', {}).get('output_dir', "output/streaming")
+        os.makedirs(output_dir, exist_ok=True)
+        return os.path.join(output_dir, f"{self._safe_filename(topic)}_{label}.md")
+    
+    def _record_stream_metrics(self, label: str, prompt: str, content: str, aggregate: Any,
+                               stream_path: str, started: float, first_token_at: Optional[float],
+                               call_stats: Dict[str, Any], backend: LLMBackend):
+        """Charge the streamed tokens and record time to first token and tokens/sec."""
+        finished = time.time()
+        completion_tokens = self._completion_tokens(aggregate, content)
+        backend.limiter.record_tokens(completion_tokens)
+        
+        # Streaming metrics: time to first token and decode speed
+        ttft = (first_token_at or finished) - started
+        decode_seconds = finished - (first_token_at or finished)
+        metrics = {
+            'time_to_first_token_seconds': round(ttft, 3),
+            'total_seconds': round(finished - started, 3),
+            'completion_tokens': completion_tokens,
+            'tokens_per_second': round(completion_tokens / decode_seconds, 1) if decode_seconds > 0 else None,
+            'output_path': stream_path,
+        }
+        annotate_stage(streaming=metrics)  # Per run, so concurrent jobs do not overwrite each other
+        call_stats.update(success=bool(content), wall_seconds=metrics['total_seconds'],
+                          prompt_tokens=self._prompt_tokens(aggregate, prompt), completion_tokens=completion_tokens,
+                          time_to_first_token_seconds=metrics['time_to_first_token_seconds'])
+        record_llm_call(**call_stats)
+        print(f"⚡ {label}: first token after {metrics['time_to_first_token_seconds']}s, "
+              f"{metrics['tokens_per_second']} tokens/s")
     
     # ========================================================================
     # STRATEGY AGENT - Analyzes topic and creates content strategy
@@ -219,12 +446,30 @@ class CompetitiveBlogFixed:
         """
         print("🎯 Strategy Agent: Analyzing topic and market positioning...")
         
+        reused = self.reuse_topic_result(topic, 'strategy')
+        if reused is not None:
+            return reused
+        
+        strategy_prompt = self.build_strategy_prompt(topic)
+        
+        if self.verbose_progress:
+            print(f"🔍 Analyzing market positioning for: {topic}")
+        
+        strategy_response = self.safe_llm_call(strategy_prompt, stage='strategy')
+        result, reask_prompt = self.plan_agent_json('Strategy', topic, strategy_response, STRATEGY_SCHEMA, STRATEGY_REQUIRED)
+        reask_reply = self.safe_llm_call(reask_prompt, stage='strategy') if reask_prompt else None
+        strategy_data = self.parse_strategy_response(topic, strategy_response, result, reask_reply)
+        self.remember_topic_result(topic, 'strategy', result, strategy_data)
+        return strategy_data
+    
+    def build_strategy_prompt(self, topic: str) -> str:
+        """Create the Strategy Agent prompt (shared by the sync and async generators)."""
         # Get strategy configuration
         strategy_config = self.config.get('agents', {}).get('strategy', {})
         analysis_depth = strategy_config.get('analysis_depth', 'comprehensive')
         angle_count = strategy_config.get('content_angle_generation', 3)
         
-        strategy_prompt = f"""As a Strategic Content Analyst, provide a {analysis_depth} analysis for the topic: "{topic}"
+        return f"""As a Strategic Content Analyst, provide a {analysis_depth} analysis for the topic: "{topic}"
 
 STRATEGIC ANALYSIS REQUIRED:
 
@@ -265,51 +510,40 @@ Provide specific, actionable insights in JSON format:
     "market_opportunities": ["opportunity1", "opportunity2"],
     "strategic_positioning": {{"unique_value": "...", "key_messages": ["...", "..."], "tone": "..."}}
 }}"""
-
-        if self.verbose_progress:
-            print(f"🔍 Analyzing market positioning for: {topic}")
+    
+    def default_strategy(self, topic: str) -> Dict[str, Any]:
+        """Fallback strategy data (fills any required field the AI did not provide)."""
+        return {
+            "target_audience": {"primary": "professionals", "pain_points": ["information gaps"], "preferences": "detailed analysis"},
+            "competitive_landscape": {"gaps": ["unique perspective"], "opportunities": ["detailed insights"]},
+            "content_angles": [f"Comprehensive guide to {topic}", f"Latest trends in {topic}", f"Practical applications of {topic}"],
+            "market_opportunities": ["emerging trends", "practical applications"],
+            "strategic_positioning": {"unique_value": f"Expert insights on {topic}", "key_messages": ["actionable advice"], "tone": "professional"}
+        }
+    
+    def parse_strategy_response(self, topic: str, strategy_response: Optional[str],
+                                result: Optional[StructuredResult] = None,
+                                reask_reply: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Turn the Strategy Agent's reply into strategy data.
         
-        strategy_response = self.safe_llm_call(strategy_prompt)
-        
-        if strategy_response:
-            try:
-                # Try to extract JSON from the response
-                import json
-                import re
-                
-                # Find JSON in the response
-                json_match = re.search(r'\{.*\}', strategy_response, re.DOTALL)
-                if json_match:
-                    strategy_data = json.loads(json_match.group())
-                else:
-                    # Fallback: create structured data from text response
-                    strategy_data = {
-                        "target_audience": {"primary": "professionals", "pain_points": ["information gaps"], "preferences": "detailed analysis"},
-                        "competitive_landscape": {"gaps": ["unique perspective"], "opportunities": ["detailed insights"]},
-                        "content_angles": [f"Comprehensive guide to {topic}", f"Latest trends in {topic}", f"Practical applications of {topic}"],
-                        "market_opportunities": ["emerging trends", "practical applications"],
-                        "strategic_positioning": {"unique_value": f"Expert insights on {topic}", "key_messages": ["actionable advice"], "tone": "professional"}
-                    }
-                
-                if self.show_research_summary:
-                    print(f"✅ Strategy completed: {len(strategy_data.get('content_angles', []))} unique angles identified")
-                
-                return strategy_data
-                
-            except json.JSONDecodeError:
-                print("⚠️ Strategy analysis received, but JSON parsing failed. Using structured fallback.")
-                return {
-                    "target_audience": {"primary": "professionals", "pain_points": ["knowledge gaps"], "preferences": "comprehensive content"},
-                    "content_angles": [f"Complete guide to {topic}", f"Advanced strategies for {topic}", f"Future of {topic}"],
-                    "strategic_positioning": {"unique_value": f"Expert perspective on {topic}", "tone": "authoritative"}
-                }
-        else:
+        Args:
+            topic: The blog topic (used in fallback angles)
+            strategy_response: Raw AI reply, or None if the call failed
+            result: The reply already parsed by plan_agent_json (parsed here if None)
+            reask_reply: Reply to the missing-fields prompt, if one was sent
+        """
+        if not strategy_response:
             print("❌ Strategy analysis failed, using basic strategy")
-            return {
-                "target_audience": {"primary": "general audience"},
-                "content_angles": [f"Understanding {topic}"],
-                "strategic_positioning": {"tone": "informative"}
-            }
+        if result is None:
+            result = parse_structured(strategy_response, STRATEGY_SCHEMA, STRATEGY_REQUIRED)
+        strategy_data = self.finish_agent_json('Strategy', result, reask_reply, STRATEGY_SCHEMA,
+                                               STRATEGY_REQUIRED, self.default_strategy(topic))
+        
+        if strategy_response and self.show_research_summary:
+            print(f"✅ Strategy completed: {len(strategy_data.get('content_angles', []))} unique angles identified")
+        
+        return strategy_data
 
     # ========================================================================
     # SEO AGENT - Keyword research and optimization strategy
@@ -334,6 +568,24 @@ Provide specific, actionable insights in JSON format:
         """
         print("🔍 SEO Agent: Conducting keyword research and optimization analysis...")
         
+        reused = self.reuse_topic_result(topic, 'seo')
+        if reused is not None:
+            return reused
+        
+        seo_prompt = self.build_seo_prompt(topic, strategy_data)
+        
+        if self.verbose_progress:
+            print(f"🔍 Researching keywords and SEO strategy for: {topic}")
+        
+        seo_response = self.safe_llm_call(seo_prompt, stage='seo')
+        result, reask_prompt = self.plan_agent_json('SEO', topic, seo_response, SEO_SCHEMA, SEO_REQUIRED)
+        reask_reply = self.safe_llm_call(reask_prompt, stage='seo') if reask_prompt else None
+        seo_data = self.parse_seo_response(topic, strategy_data, seo_response, result, reask_reply)
+        self.remember_topic_result(topic, 'seo', result, seo_data)
+        return seo_data
+    
+    def build_seo_prompt(self, topic: str, strategy_data: Dict[str, Any]) -> str:
+        """Create the SEO Agent prompt (shared by the sync and async generators)."""
         # Get SEO configuration
         seo_config = self.config.get('agents', {}).get('seo', {})
         primary_keywords = seo_config.get('primary_keywords', 3)
@@ -343,7 +595,7 @@ Provide specific, actionable insights in JSON format:
         target_audience = strategy_data.get('target_audience', {}).get('primary', 'general audience')
         content_angles = strategy_data.get('content_angles', [topic])
         
-        seo_prompt = f"""As an SEO Specialist, conduct comprehensive keyword research and optimization strategy for: "{topic}"
+        return f"""As an SEO Specialist, conduct comprehensive keyword research and optimization strategy for: "{topic}"
 
 STRATEGIC CONTEXT:
 - Target Audience: {target_audience}
@@ -390,66 +642,186 @@ Provide actionable SEO strategy in JSON format:
     "meta_optimization": {{"title": "...", "description": "...", "focus_keyword": "..."}},
     "seo_recommendations": ["tip1", "tip2", "tip3"]
 }}"""
-
-        if self.verbose_progress:
-            print(f"🔍 Researching keywords and SEO strategy for: {topic}")
+    
+    def default_seo(self, topic: str, strategy_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fallback SEO data (fills any required field the AI did not provide)."""
+        target_audience = strategy_data.get('target_audience', {}).get('primary', 'general audience')
+        return {
+            "primary_keywords": [topic, f"{topic} guide", f"best {topic}"],
+            "secondary_keywords": [f"how to {topic}", f"{topic} tips", f"{topic} strategies", f"{topic} benefits"],
+            "search_intent": "informational",
+            "content_structure": {
+                "h1": f"Complete Guide to {topic}",
+                "h2_sections": ["Introduction", "Key Benefits", "Best Practices", "Common Challenges", "Conclusion"]
+            },
+            "meta_optimization": {
+                "title": f"{topic}: Complete Guide for {target_audience}",
+                "description": f"Discover everything about {topic}. Expert insights, practical tips, and actionable strategies.",
+                "focus_keyword": topic
+            },
+            "seo_recommendations": ["Use keywords naturally", "Include internal links", "Optimize for featured snippets"]
+        }
+    
+    def parse_seo_response(self, topic: str, strategy_data: Dict[str, Any], seo_response: Optional[str],
+                           result: Optional[StructuredResult] = None,
+                           reask_reply: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Turn the SEO Agent's reply into SEO data.
         
-        seo_response = self.safe_llm_call(seo_prompt)
-        
-        if seo_response:
-            try:
-                # Try to extract JSON from the response
-                import json
-                import re
-                
-                # Find JSON in the response
-                json_match = re.search(r'\{.*\}', seo_response, re.DOTALL)
-                if json_match:
-                    seo_data = json.loads(json_match.group())
-                else:
-                    # Fallback: create structured SEO data
-                    seo_data = {
-                        "primary_keywords": [topic, f"{topic} guide", f"best {topic}"],
-                        "secondary_keywords": [f"how to {topic}", f"{topic} tips", f"{topic} strategies", f"{topic} benefits"],
-                        "search_intent": "informational",
-                        "content_structure": {
-                            "h1": f"Complete Guide to {topic}",
-                            "h2_sections": ["Introduction", "Key Benefits", "Best Practices", "Common Challenges", "Conclusion"]
-                        },
-                        "meta_optimization": {
-                            "title": f"{topic}: Complete Guide for {target_audience}",
-                            "description": f"Discover everything about {topic}. Expert insights, practical tips, and actionable strategies.",
-                            "focus_keyword": topic
-                        },
-                        "seo_recommendations": ["Use keywords naturally", "Include internal links", "Optimize for featured snippets"]
-                    }
-                
-                if self.show_research_summary:
-                    primary_count = len(seo_data.get('primary_keywords', []))
-                    secondary_count = len(seo_data.get('secondary_keywords', []))
-                    print(f"✅ SEO analysis completed: {primary_count} primary + {secondary_count} secondary keywords")
-                
-                return seo_data
-                
-            except json.JSONDecodeError:
-                print("⚠️ SEO analysis received, but JSON parsing failed. Using structured fallback.")
-                return {
-                    "primary_keywords": [topic, f"{topic} guide"],
-                    "secondary_keywords": [f"how to {topic}", f"{topic} tips"],
-                    "search_intent": "informational",
-                    "meta_optimization": {"title": f"Guide to {topic}", "focus_keyword": topic}
-                }
-        else:
+        Args:
+            topic: The blog topic (used in fallback keywords)
+            strategy_data: Strategy output (fallback title uses its audience)
+            seo_response: Raw AI reply, or None if the call failed
+            result: The reply already parsed by plan_agent_json (parsed here if None)
+            reask_reply: Reply to the missing-fields prompt, if one was sent
+        """
+        if not seo_response:
             print("❌ SEO analysis failed, using basic SEO strategy")
-            return {
-                "primary_keywords": [topic],
-                "secondary_keywords": [f"{topic} guide"],
-                "search_intent": "informational"
-            }
-
+        if result is None:
+            result = parse_structured(seo_response, SEO_SCHEMA, SEO_REQUIRED)
+        seo_data = self.finish_agent_json('SEO', result, reask_reply, SEO_SCHEMA, SEO_REQUIRED,
+                                          self.default_seo(topic, strategy_data))
+        
+        if seo_response and self.show_research_summary:
+            primary_count = len(seo_data.get('primary_keywords', []))
+            secondary_count = len(seo_data.get('secondary_keywords', []))
+            print(f"✅ SEO analysis completed: {primary_count} primary + {secondary_count} secondary keywords")
+        
+        return seo_data
+    
+    # ========================================================================
+    # STRUCTURED OUTPUT - Tolerant JSON parsing shared by the Strategy and SEO agents
+    # ========================================================================
+    def plan_agent_json(self, agent: str, topic: str, response: Optional[str], schema: Dict[str, Any],
+                        required: List[str]) -> Tuple[StructuredResult, Optional[str]]:
+        """
+        Parse an agent's JSON reply and decide whether to re-ask for missing fields.
+        
+        The reply may be wrapped in prose or code fences, contain common
+        syntax slips or be cut off; whatever parses is kept. Only the
+        required fields that are still missing are asked for again, in a
+        short prompt instead of repeating the whole analysis.
+        
+        Args:
+            agent: Agent name for messages and the follow-up prompt
+            topic: The blog topic
+            response: Raw AI reply, or None if the call failed
+            schema: Expected shape of the reply (see structured_output)
+            required: Dotted paths of the fields downstream agents rely on
+            
+        Returns:
+            (parsed reply, follow-up prompt or None when nothing is missing,
+            the first call failed or `structured_output.reask_missing_fields` is off)
+        """
+        result = parse_structured(response, schema, required)
+        if not response or not result.missing:
+            return result, None
+        if not self.config.get('structured_output', {}).get('reask_missing_fields', True):
+            return result, None
+        print(f"🔁 {agent} reply is missing {', '.join(result.missing)}; asking for those fields only")
+        annotate_stage(reasked_fields=list(result.missing))
+        return result, build_reask_prompt(agent, topic, result, schema)
+    
+    def finish_agent_json(self, agent: str, result: StructuredResult, reask_reply: Optional[str],
+                          schema: Dict[str, Any], required: List[str], defaults: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge a re-ask reply into a parsed result, then fill what is still missing from defaults.
+        
+        Returns:
+            Agent data with every required field present
+        """
+        if reask_reply:
+            result.merge(parse_structured(reask_reply, schema, required), required)
+        defaulted = fill_defaults(result, defaults)
+        if result.repairs:
+            print(f"🩹 {agent} JSON repaired ({', '.join(dict.fromkeys(result.repairs))})")
+        if defaulted and len(defaulted) == len(required):
+            print(f"⚠️ No usable {agent} JSON. Using structured fallback.")
+        elif defaulted:
+            print(f"⚠️ {agent} reply still missing {', '.join(defaulted)}; using defaults for those fields")
+        annotate_stage(json_repairs=list(dict.fromkeys(result.repairs)), defaulted_fields=defaulted)
+        return result.data
+    
+    # ========================================================================
+    # TOPIC REUSE - Strategy/SEO results shared across a topic family
+    # ========================================================================
+    def reuse_topic_result(self, topic: str, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored strategy or SEO result of a closely related topic, adapted to this one.
+        
+        Args:
+            topic: The blog topic
+            stage: 'strategy' or 'seo'
+            
+        Returns:
+            The adapted result, or None when no stored topic is similar
+            enough (or `topic_reuse` is disabled)
+        """
+        if not self.topic_index:
+            return None
+        match = self.topic_index.lookup(topic, stage)
+        if match is None:
+            return None
+        print(f"♻️ Reusing {stage} results of \"{match['source_topic']}\" (similarity {match['similarity']:.2f})")
+        annotate_stage(reused_from=match['source_topic'], reuse_similarity=match['similarity'])
+        return match['data']
+    
+    def remember_topic_result(self, topic: str, stage: str, result: StructuredResult, data: Dict[str, Any]):
+        """Store a fresh strategy or SEO result for related topics (not if any field came from defaults)."""
+        if self.topic_index and not result.defaulted:
+            self.topic_index.remember(topic, stage, data)
+    
     # ========================================================================
     # WEB SEARCH FUNCTIONALITY
     # ========================================================================
+    def _serper_request(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a request to a Serper endpoint, using the on-disk cache first.
+        
+        Rate limits and transient errors are retried by self.search_retry.
+        Only successful responses are cached; errors that survive the
+        retries propagate to the caller.
+        
+        Args:
+            endpoint: Serper endpoint name ('search' or 'news')
+            payload: Request body (q, num, gl, hl)
+            
+        Returns:
+            Parsed JSON response
+        """
+        if self.search_cache:
+            cached = self.search_cache.get(endpoint, payload)
+            if cached is not None:
+                record_search(endpoint=endpoint, cached=True, success=True, wall_seconds=0.0,
+                              bytes=0, rate_limit_wait_seconds=0.0)
+                return cached
+        
+        # Per-request telemetry for the run report
+        search_stats = {'endpoint': endpoint, 'cached': False, 'success': False, 'bytes': 0,
+                        'rate_limit_wait_seconds': 0.0, **self.search_retry.new_telemetry()}
+        started = time.perf_counter()
+        
+        def attempt():
+            # Wait only if the shared Serper budget is exhausted
+            search_stats['rate_limit_wait_seconds'] += self.search_limiter.acquire()
+            
+            # Make the HTTP request to Serper over a pooled keep-alive connection
+            response = self.http_client.post(endpoint, payload)
+            search_stats['bytes'] += len(response.content or b'')
+            response.raise_for_status()  # Raise exception for HTTP errors (429/5xx are retried)
+            return response.json()       # Parse JSON response
+        
+        try:
+            data = self.search_retry.call(attempt, telemetry=search_stats)
+            search_stats['success'] = True
+        finally:
+            search_stats['wall_seconds'] = round(time.perf_counter() - started, 3)
+            record_search(**search_stats)
+        
+        if self.search_cache:
+            self.search_cache.set(endpoint, payload, data)
+        return data
+    
     def search_web(self, query: str, num_results: int = None) -> List[Dict]:
         """
         Search the web using Serper API with config-driven settings.
@@ -467,6 +839,11 @@ Provide actionable SEO strategy in JSON format:
         Returns:
             List of dictionaries with title, snippet, and link
         """
+        results = self._search_web_or_none(query, num_results)
+        return results if results is not None else []  # Return empty list if search fails
+    
+    def _search_web_or_none(self, query: str, num_results: int = None) -> Optional[List[Dict]]:
+        """search_web, but None when the search failed (so it is not mistaken for 'no results')."""
         
         # If no API key, return empty results
         if not self.serper_api_key:
@@ -474,49 +851,18 @@ Provide actionable SEO strategy in JSON format:
             
         # Use config setting for num_results if not specified
         if num_results is None:
-            search_config = self.config.get('search', {})
-            num_results = search_config.get('max_results', 5)
-        
-        # Serper API endpoint for web search
-        url = "https://google.serper.dev/search"
-        
-        # Search parameters
-        payload = {
-            'q': query,              # The search query
-            'num': num_results,      # Number of results wanted
-            'gl': 'us',             # Country (US)
-            'hl': 'en'              # Language (English)
-        }
+            num_results = self._default_num_results()
         
-        # API authentication and content type
-        headers = {
-            'X-API-KEY': self.serper_api_key,
-            'Content-Type': 'application/json'
-        }
+        payload = self._search_payload(query, num_results)
         
         try:
-            # Make the HTTP request to Serper
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
-            response.raise_for_status()  # Raise exception for HTTP errors
-            data = response.json()       # Parse JSON response
-            
-            # Extract the useful information from each search result
-            results = []
-            if 'organic' in data:  # 'organic' contains the main search results
-                for item in data['organic'][:num_results]:
-                    results.append({
-                        'title': item.get('title', ''),      # Page title
-                        'snippet': item.get('snippet', ''),  # Description preview
-                        'link': item.get('link', '')         # URL
-                    })
-            
-            # Rate limiting using config setting
-            time.sleep(self.search_delay)
-            return results
+            # Serper web search endpoint (served from cache when possible)
+            data = self._serper_request('search', payload)
+            return self._parse_organic_results(data, num_results)
             
         except Exception as e:
             print(f"Search error: {e}")
-            return []  # Return empty list if search fails
+            return None
     
     def search_news(self, query: str, num_results: int = 3) -> List[Dict]:
         """
@@ -538,34 +884,58 @@ Provide actionable SEO strategy in JSON format:
         if not self.serper_api_key:
             return []
         
-        # Serper API endpoint for news search
-        url = "https://google.serper.dev/news"
-        payload = {'q': query, 'num': num_results, 'gl': 'us', 'hl': 'en'}
-        headers = {'X-API-KEY': self.serper_api_key, 'Content-Type': 'application/json'}
+        # Serper news search endpoint
+        payload = self._search_payload(query, num_results)
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract news articles
-            results = []
-            if 'news' in data:
-                for item in data['news'][:num_results]:
-                    results.append({
-                        'title': item.get('title', ''),
-                        'snippet': item.get('snippet', ''),
-                        'date': item.get('date', ''),        # Publication date
-                        'source': item.get('source', '')     # News source
-                    })
-            
-            time.sleep(1)  # Rate limiting
-            return results
+            data = self._serper_request('news', payload)
+            return self._parse_news_results(data, num_results)
             
         except Exception as e:
             print(f"News search error: {e}")
             return []
     
+    def _default_num_results(self) -> int:
+        """Web results per query from the search config."""
+        return self.config.get('search', {}).get('max_results', 5)
+    
+    @staticmethod
+    def _search_payload(query: str, num_results: int) -> Dict[str, Any]:
+        """Serper request body (shared by the sync and async clients)."""
+        return {
+            'q': query,              # The search query
+            'num': num_results,      # Number of results wanted
+            'gl': 'us',             # Country (US)
+            'hl': 'en'              # Language (English)
+        }
+    
+    @staticmethod
+    def _parse_organic_results(data: Dict[str, Any], num_results: int) -> List[Dict]:
+        """Extract title, snippet and link from a Serper web search response."""
+        results = []
+        if 'organic' in data:  # 'organic' contains the main search results
+            for item in data['organic'][:num_results]:
+                results.append({
+                    'title': item.get('title', ''),      # Page title
+                    'snippet': item.get('snippet', ''),  # Description preview
+                    'link': item.get('link', '')         # URL
+                })
+        return results
+    
+    @staticmethod
+    def _parse_news_results(data: Dict[str, Any], num_results: int) -> List[Dict]:
+        """Extract title, snippet, date and source from a Serper news response."""
+        results = []
+        if 'news' in data:
+            for item in data['news'][:num_results]:
+                results.append({
+                    'title': item.get('title', ''),
+                    'snippet': item.get('snippet', ''),
+                    'date': item.get('date', ''),        # Publication date
+                    'source': item.get('source', '')     # News source
+                })
+        return results
+    
     # ========================================================================
     # RESEARCH ORCHESTRATION
     # ========================================================================
@@ -587,16 +957,52 @@ Provide actionable SEO strategy in JSON format:
         """
         
         print(f"🔍 Researching: {topic}")
+        search_config = self.config.get('search', {})
+        adaptive = self.plan_adaptive_research(topic)
+        if adaptive:
+            search_results, news_results = self._run_searches_adaptively(*adaptive)
+            return self.assemble_research(topic, search_results, news_results)
         
-        # Initialize data structure to organize research results
-        research_data = {
-            'topic': topic,
-            'trends': [],      # Market trends and future predictions
-            'competitors': [], # Competitive analysis and company info
-            'news': [],        # Recent news and developments
-            'data': []         # Statistics, numbers, and data points
-        }
+        queries, news_query, news_count = self.build_research_plan(topic)
+        
+        # Execute all queries (concurrently if enabled) in the original order
+        if search_config.get('concurrent_research', True):
+            search_results, news_results = self._run_searches_concurrently(queries, news_query, news_count)
+        else:
+            search_results = []
+            for i, query in enumerate(queries):
+                if self.verbose_progress:
+                    print(f"📊 Search {i+1}/{len(queries)}: {query}")
+                search_results.append(self.search_web(query))  # Use config-driven num_results
+            # Separate news search for recent developments
+            news_results = self.search_news(news_query, news_count)
+        
+        return self.assemble_research(topic, search_results, news_results)
+    
+    def build_research_plan(self, topic: str) -> Tuple[List[str], str, int]:
+        """
+        Build the research queries from the 4-category focus-area system.
+        
+        Args:
+            topic: The main topic to research
+            
+        Returns:
+            (web queries in order, news query, number of news results)
+        """
+        groups, news_query, news_count = self.build_research_groups(topic)
+        queries = [query for _, group_queries in groups for query in group_queries]
+        return queries, news_query, news_count
+    
+    def build_research_groups(self, topic: str) -> Tuple[List[Tuple[str, List[str]]], str, int]:
+        """
+        Research queries grouped by category (the base topic query first).
         
+        Args:
+            topic: The main topic to research
+            
+        Returns:
+            ([(category, queries)] in order, news query, number of news results)
+        """
         # Get search configuration and focus areas
         search_config = self.config.get('search', {})
         research_config = self.config.get('agents', {}).get('research', {})
@@ -667,7 +1073,7 @@ Provide actionable SEO strategy in JSON format:
         }
         
         # Build queries using the 4-category system
-        queries = [f"{topic}"]  # Always include the base topic
+        groups = [('topic', [f"{topic}"])]  # Always include the base topic
         category_searches = [cat1_searches, cat2_searches, cat3_searches, cat4_searches]
         
         # Add queries for each of the 4 focus areas
@@ -676,46 +1082,190 @@ Provide actionable SEO strategy in JSON format:
                 area_queries = query_templates[focus_area]
                 num_searches = category_searches[i]
                 # Add the specified number of searches for this category
-                queries.extend(area_queries[:num_searches])
+                if area_queries[:num_searches]:
+                    groups.append((focus_area, area_queries[:num_searches]))
         
         if self.verbose_progress:
             print(f"🎯 4-Category System Active:")
             for i, focus_area in enumerate(focus_areas):
                 print(f"   Category {i+1}: {focus_area} ({category_searches[i]} searches)")
-            print(f"📊 Total queries generated: {len(queries)}")
-
+            print(f"📊 Total queries generated: {sum(len(queries) for _, queries in groups)}")
 
+        news_count = search_config.get('news_results', 2)
+        news_query = f"{topic} latest news"
+        return groups, news_query, news_count
+    
+    def assemble_research(self, topic: str, search_results: List[List[Dict]],
+                          news_results: List[Dict]) -> Dict[str, Any]:
+        """
+        Sort search results into research categories.
         
-        # Execute each search query and categorize results
-        for i, query in enumerate(queries):
-            if self.verbose_progress:
-                print(f"📊 Search {i+1}/{len(queries)}: {query}")
-            results = self.search_web(query)  # Use config-driven num_results
+        Args:
+            topic: The main topic researched
+            search_results: One result list per web query, in query order
+            news_results: Results of the news search
             
-            # Categorize results based on search type
-            if i == 0:
-                research_data['trends'].extend(results)
-            elif i == 1:
-                research_data['data'].extend(results)
-            elif i == 2:
-                research_data['competitors'].extend(results)
-            else:
-                research_data['data'].extend(results)
+        Returns:
+            Dictionary organized by research category
+        """
+        # Initialize data structure to organize research results
+        research_data = {
+            'topic': topic,
+            'trends': [],      # Market trends and future predictions
+            'competitors': [], # Competitive analysis and company info
+            'news': [],        # Recent news and developments
+            'data': []         # Statistics, numbers, and data points
+        }
         
-        # Separate news search for recent developments
-        news_count = search_config.get('news_results', 2)
-        news_results = self.search_news(f"{topic} latest news", news_count)
-        research_data['news'].extend(news_results)
+        index_config = self.config.get('research_index', {})
+        if not index_config.get('enabled', True):
+            # Categorize results based on search position (same buckets in both modes)
+            for i, results in enumerate(search_results):
+                research_data[self._research_bucket(i)].extend(results)
+            research_data['news'].extend(news_results)
+            
+            # Calculate and report total sources found
+            total = sum(len(v) for v in research_data.values() if isinstance(v, list))
+            print(f"✅ Research complete: {total} sources")
+            return research_data
+        
+        # Index results in query order: repeated pages and near-duplicate
+        # snippets are dropped, the rest ranked by relevance to the topic
+        index = ResearchIndex(topic, similarity=index_config.get('near_duplicate_similarity', 0.8))
+        for i, results in enumerate(search_results):
+            index.add_all(self._research_bucket(i), results)
+        index.add_all('news', news_results)
+        
+        top_k = index_config.get('max_sources_per_category', 8)
+        for category in ('trends', 'competitors', 'news', 'data'):
+            research_data[category] = index.top(category, top_k)
+        research_data['index_stats'] = stats = index.stats()
         
-        # Calculate and report total sources found
         total = sum(len(v) for v in research_data.values() if isinstance(v, list))
-        print(f"✅ Research complete: {total} sources")
+        removed = stats['duplicate_urls'] + stats['near_duplicates']
+        print(f"✅ Research complete: {total} sources ({removed} duplicates removed)")
         return research_data
     
+    # ========================================================================
+    # ADAPTIVE RESEARCH - Stop searching categories that bring nothing new
+    # ========================================================================
+    def plan_adaptive_research(self, topic: str) -> Optional[Tuple[AdaptiveResearch, str, int]]:
+        """
+        Query plan for adaptive research (None when `search.adaptive_research` is off).
+        
+        Without `max_search_calls` every planned query may be sent; only
+        categories that run dry stop early.
+        
+        Returns:
+            (AdaptiveResearch over the grouped queries, news query, number of news results)
+        """
+        adaptive_config = self.config.get('search', {}).get('adaptive_research', {})
+        if not adaptive_config.get('enabled', False):
+            return None
+        groups, news_query, news_count = self.build_research_groups(topic)
+        plan = AdaptiveResearch(
+            groups, min_novelty=adaptive_config.get('min_novelty', 0.35),
+            max_search_calls=adaptive_config.get('max_search_calls'),
+            similarity=self.config.get('research_index', {}).get('near_duplicate_similarity', 0.8)
+        )
+        return plan, news_query, news_count
+    
+    def finish_adaptive_research(self, plan: AdaptiveResearch) -> List[List[Dict]]:
+        """Report the searches saved and return one result list per planned query."""
+        stats = plan.stats()
+        annotate_stage(search_calls=stats['search_calls'], queries_skipped=stats['queries_skipped'],
+                       failed_searches=stats['failed_searches'], stopped_categories=stats['stopped_categories'])
+        if stats['queries_skipped']:
+            stopped = ", ".join(f"{category} ({reason})" for category, reason in stats['stopped_categories'].items())
+            print(f"✂️ Adaptive research: {stats['search_calls']} searches, "
+                  f"{stats['queries_skipped']} skipped (stopped: {stopped})")
+        return plan.results()
+    
+    def _run_searches_adaptively(self, plan: AdaptiveResearch, news_query: str,
+                                 news_count: int) -> Tuple[List[List[Dict]], List[Dict]]:
+        """
+        Send the research queries in waves until every category runs dry.
+        
+        The news search goes out with the first wave. With
+        `search.concurrent_research` each wave's queries run in parallel.
+        
+        Returns:
+            Tuple of (per-query web results, news results)
+        """
+        search_config = self.config.get('search', {})
+        max_workers = max(1, search_config.get('max_concurrent_searches', 5))
+        if not search_config.get('concurrent_research', True):
+            max_workers = 1
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            news_future = executor.submit(in_current_context(self.search_news), news_query, news_count)
+            wave = plan.next_wave()
+            while wave:
+                if self.verbose_progress:
+                    print(f"📊 Search wave: {', '.join(query for _, query in wave)}")
+                futures = [(index, executor.submit(in_current_context(self._search_web_or_none), query))
+                           for index, query in wave]
+                plan.record([(index, future.result()) for index, future in futures])
+                wave = plan.next_wave()
+            news_results = news_future.result()
+        
+        return self.finish_adaptive_research(plan), news_results
+    
+    @staticmethod
+    def _research_bucket(query_index: int) -> str:
+        """
+        Map a query's position to its research category.
+        
+        The base topic query feeds 'trends', the next two feed 'data' and
+        'competitors', and everything after that is treated as 'data'.
+        """
+        if query_index == 0:
+            return 'trends'
+        elif query_index == 1:
+            return 'data'
+        elif query_index == 2:
+            return 'competitors'
+        return 'data'
+    
+    def _run_searches_concurrently(self, queries: List[str], news_query: str,
+                                   news_count: int) -> Tuple[List[List[Dict]], List[Dict]]:
+        """
+        Send every research query (plus the news search) at once.
+        
+        A thread pool capped by `search.max_concurrent_searches` runs the
+        requests, so research takes about as long as the slowest query
+        instead of the sum of all of them. Results come back in query order,
+        which keeps the bucketing identical to the sequential mode.
+        
+        Args:
+            queries: Web search queries in bucketing order
+            news_query: Query for the separate news search
+            news_count: Number of news articles to request
+            
+        Returns:
+            Tuple of (per-query web results, news results)
+        """
+        search_config = self.config.get('search', {})
+        max_workers = max(1, search_config.get('max_concurrent_searches', 5))
+        
+        if self.verbose_progress:
+            print(f"⚡ Running {len(queries) + 1} searches concurrently (max {max_workers} at once)")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each search keeps the caller's context so it is attributed to this run
+            news_future = executor.submit(in_current_context(self.search_news), news_query, news_count)
+            web_futures = [executor.submit(in_current_context(self.search_web), query) for query in queries]
+            
+            # Collect in submission order so buckets stay deterministic
+            search_results = [future.result() for future in web_futures]
+            news_results = news_future.result()
+        
+        return search_results, news_results
+    
     # ========================================================================
     # DATA FORMATTING FOR AI CONSUMPTION
     # ========================================================================
-    def format_research(self, research_data: Dict) -> str:
+    def format_research(self, research_data: Dict, focus: Optional[List[str]] = None) -> str:
         """
         Format research data into a clear structure for AI processing.
         
@@ -725,11 +1275,29 @@ Provide actionable SEO strategy in JSON format:
         
         Args:
             research_data: Dictionary of categorized search results
+            focus: Content angles to rank sources against (in addition to the topic)
             
         Returns:
             Formatted string ready for AI consumption
         """
         
+        # Put the sources that best match the chosen angles first
+        if focus and self.config.get('research_index', {}).get('enabled', True):
+            research_data = rerank_research(research_data, focus)
+        
+        # With a context budget: keep the sentences most relevant to the topic
+        # and angles until the research budget is used (duplicate sources are
+        # dropped here unless the research index already removed them)
+        if self.context_budget:
+            budget_config = self.config.get('context_budget', {})
+            return compress_research(
+                research_data, self.context_budget.section_tokens['research'],
+                query=" ".join([research_data.get('topic', ''), *(focus or [])]),
+                sentences_per_source=budget_config.get('sentences_per_source', 2),
+                max_sources_per_section=budget_config.get('max_sources_per_section', 5),
+                deduplicate='index_stats' not in research_data
+            )
+        
         formatted = [f"RESEARCH DATA: {research_data['topic']}\n"]
         
         # Format market trends section
@@ -761,84 +1329,95 @@ Provide actionable SEO strategy in JSON format:
         return "\n".join(formatted)
     
     # ========================================================================
-    # MAIN CONTENT GENERATION PIPELINE
+    # ANALYSIS AGENT - Synthesizes research into competitive insights
     # ========================================================================
-    def generate_competitive_blog(self, topic: str) -> Optional[str]:
+    def build_analysis_prompt(self, topic: str, research_summary: str) -> str:
+        """Create the Analysis Agent prompt from formatted research."""
+        return f"""Analyze this research for "{topic}" and identify:
+1. Key trends and opportunities
+2. Competitive gaps
+3. Unique angles to explore
+
+{research_summary}
+
+Keep analysis concise (max 300 words):"""
+    
+    def analyze_research(self, topic: str, research_summary: str) -> Optional[str]:
         """
-        Enhanced pipeline for generating competitive blog content.
+        Analysis Agent: Synthesize research into trends, gaps and angles.
         
-        This implements a 5-agent approach:
-        1. Strategy Agent: Analyzes topic and creates content strategy
-        2. Research Agent: Gathers competitive intelligence (strategy-guided)
-        3. SEO Agent: Keyword research and optimization strategy
-        4. Writer Agent: Creates comprehensive blog content (strategy + SEO guided)
-        5. Editor Agent: Polishes and optimizes the final output
+        Only needs the research output, so it can run alongside the SEO Agent.
         
         Args:
-            topic: The blog topic to write about
+            topic: The blog topic
+            research_summary: Output of format_research
             
         Returns:
-            Complete blog post as string, or None if generation failed
+            Analysis text, or None if the AI call failed
         """
-        
-        print(f"🚀 Starting enhanced 5-agent blog generation: {topic}")
-        print("=" * 70)
-        
-        # ====================================================================
-        # STEP 1: STRATEGY AGENT - Analyze topic and create content strategy
-        # ====================================================================
-        strategy_data = self.strategy_analysis(topic)
-        if not strategy_data:
-            print("❌ Strategy analysis failed")
-            return None
-        
-        # ====================================================================
-        # STEP 2: RESEARCH AGENT - Gather competitive intelligence (strategy-guided)
-        # ====================================================================
-        research_data = self.conduct_research(topic)
-        research_summary = self.format_research(research_data)
-        
-        # ====================================================================
-        # STEP 3: SEO AGENT - Keyword research and optimization strategy
-        # ====================================================================
-        seo_data = self.seo_analysis(topic, strategy_data)
-        if not seo_data:
-            print("❌ SEO analysis failed")
-            return None
-        
-        # ====================================================================
-        # STEP 4: ANALYSIS AGENT - Synthesize insights (now informed by strategy + SEO)
-        # ====================================================================
         print("🔬 Analyzing competitive intelligence...")
         
-        # Create prompt for analysis agent
-        analysis_prompt = f"""Analyze this research for "{topic}" and identify:
-1. Key trends and opportunities
-2. Competitive gaps
-3. Unique angles to explore
-
-{research_summary}
-
-Keep analysis concise (max 300 words):"""
-        
         # Get analysis from AI
-        analysis = self.safe_llm_call(analysis_prompt)
+        analysis = self.safe_llm_call(self.build_analysis_prompt(topic, research_summary), stage='analysis')
         if not analysis:
             print("❌ Analysis failed")
             return None
+        return analysis
+    
+    # ========================================================================
+    # PROMPT BUDGETING - Fit prompt sections to their token budgets
+    # ========================================================================
+    def _fit_prompt(self, render, **sections: str) -> str:
+        """
+        Render a prompt with every section cut down to its token budget.
         
-        # ====================================================================
-        # STEP 5: WRITER AGENT - Create main content (strategy + SEO guided)
-        # ====================================================================
-        print("✍️ Writing SEO-optimized competitive blog post...")
+        Everything render() adds around the sections (instructions, a draft
+        being edited) counts as fixed; if the prompt would exceed
+        `context_budget.max_prompt_tokens`, the section budgets shrink.
+        Section sizes are recorded on the active stage of the run report.
         
-        # Get blog configuration settings
+        Args:
+            render: Function building the prompt from the section texts
+            **sections: Section name (strategy, seo, analysis, research) -> text
+            
+        Returns:
+            The finished prompt
+        """
+        if not self.context_budget:
+            return render(**sections)
+        
+        fixed_tokens = count_tokens(render(**{name: '' for name in sections}))
+        budgets = self.context_budget.allocate(sections, fixed_tokens)
+        fitted = {name: self.context_budget.fit(text, budgets[name]) for name, text in sections.items()}
+        annotate_stage(prompt_fixed_tokens=fixed_tokens,
+                       prompt_section_tokens={name: count_tokens(text) for name, text in fitted.items()})
+        return render(**fitted)
+    
+    # ========================================================================
+    # WRITER AGENT - Creates the main content (strategy + SEO guided)
+    # ========================================================================
+    def _blog_voice(self, strategy_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Writing style and audience: the variant's if set (see variant_strategy), else the `blog` config."""
         blog_config = self.config.get('blog', {})
-        min_words = blog_config.get('min_word_count', 1500)
-        style = blog_config.get('style', 'professional')
-        audience = blog_config.get('target_audience', 'professionals')
-        include_sources = blog_config.get('include_sources', True)
-        include_data = blog_config.get('include_data', True)
+        variant = strategy_data.get('variant') or {}
+        return (variant.get('style') or blog_config.get('style', 'professional'),
+                variant.get('audience') or blog_config.get('target_audience', 'professionals'))
+    
+    @staticmethod
+    def _stream_label(stage: str, strategy_data: Dict[str, Any]) -> str:
+        """Streaming file label for a stage (one file per variant)."""
+        variant = strategy_data.get('variant')
+        return f"{stage}_{variant['name']}" if variant else stage
+    
+    def _writer_blocks(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any],
+                       research_summary: str) -> Dict[str, str]:
+        """
+        Strategy, SEO and research blocks shared by every writer prompt.
+        
+        Returns:
+            Dictionary with 'strategy', 'seo' and 'research' prompt blocks
+        """
+        _, audience = self._blog_voice(strategy_data)
         
         # Extract strategic and SEO guidance
         strategic_angles = strategy_data.get('content_angles', [f"Comprehensive guide to {topic}"])
@@ -847,26 +1426,46 @@ Keep analysis concise (max 300 words):"""
         content_structure = seo_data.get('content_structure', {})
         seo_title = seo_data.get('meta_optimization', {}).get('title', f"Complete Guide to {topic}")
         
-        # Create comprehensive prompt using strategy, SEO, and config settings
-        blog_prompt = f"""Write a {style} blog post about "{topic}" ({min_words}+ words) for {audience}.
-
-STRATEGIC DIRECTION:
+        strategy_block = f"""STRATEGIC DIRECTION:
 - Primary Content Angle: {strategic_angles[0] if strategic_angles else f"Complete guide to {topic}"}
 - Target Audience: {strategy_data.get('target_audience', {}).get('primary', audience)}
-- Unique Positioning: {strategy_data.get('strategic_positioning', {}).get('unique_value', 'Expert insights')}
-
-SEO OPTIMIZATION REQUIREMENTS:
+- Unique Positioning: {strategy_data.get('strategic_positioning', {}).get('unique_value', 'Expert insights')}"""
+        
+        seo_block = f"""SEO OPTIMIZATION REQUIREMENTS:
 - Title: {seo_title}
 - Primary Keywords: {', '.join(primary_keywords[:3])}
 - Secondary Keywords: {', '.join(secondary_keywords[:5])}
 - Content Structure: {content_structure.get('h2_sections', ['Introduction', 'Main Content', 'Conclusion'])}
-- Search Intent: {seo_data.get('search_intent', 'informational')}
+- Search Intent: {seo_data.get('search_intent', 'informational')}"""
+        
+        # Without a context budget, fall back to a fixed character slice of the research
+        research_block = research_summary if self.context_budget else f"{research_summary[:1000]}..."
+        return {'strategy': strategy_block, 'seo': seo_block, 'research': research_block}
+    
+    def build_blog_prompt(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any],
+                          analysis: str, research_summary: str) -> str:
+        """Create the Writer Agent prompt from strategy, SEO, analysis and research."""
+        
+        # Get blog configuration settings
+        blog_config = self.config.get('blog', {})
+        min_words = blog_config.get('min_word_count', 1500)
+        style, audience = self._blog_voice(strategy_data)
+        include_sources = blog_config.get('include_sources', True)
+        include_data = blog_config.get('include_data', True)
+        
+        # Create comprehensive prompt using strategy, SEO, and config settings
+        def render(strategy: str, seo: str, analysis: str, research: str) -> str:
+            return f"""Write a {style} blog post about "{topic}" ({min_words}+ words) for {audience}.
+
+{strategy}
+
+{seo}
 
 COMPETITIVE ANALYSIS:
 {analysis}
 
 RESEARCH DATA:
-{research_summary[:1000]}...
+{research}
 
 CONTENT REQUIREMENTS:
 - {style.title()} tone, data-driven content
@@ -883,38 +1482,299 @@ CONTENT REQUIREMENTS:
 
 Write the complete SEO-optimized blog post:"""
         
-        # Generate main blog content
-        blog_content = self.safe_llm_call(blog_prompt)
+        return self._fit_prompt(render, analysis=analysis,
+                                **self._writer_blocks(topic, strategy_data, seo_data, research_summary))
+    
+    def write_blog(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any],
+                   analysis: str, research_summary: str) -> Optional[str]:
+        """
+        Writer Agent: Create the full blog draft.
+        
+        With `agents.writer.sectioned_writing`, every outline section is
+        written at the same time (see write_blog_sectioned); otherwise the
+        whole post comes from one AI call.
+        
+        Returns:
+            Draft blog post, or None if the AI call failed
+        """
+        print("✍️ Writing SEO-optimized competitive blog post...")
+        
+        sections = self.plan_sections(seo_data)
+        if sections:
+            blog_content = self.write_blog_sectioned(topic, strategy_data, seo_data, analysis,
+                                                     research_summary, sections)
+            if blog_content:
+                return blog_content
+            print("⚠️ Sectioned writing failed, writing the post in one pass")
+        
+        # Generate main blog content (streamed to file and stdout if enabled)
+        blog_prompt = self.build_blog_prompt(topic, strategy_data, seo_data, analysis, research_summary)
+        if self.streaming_enabled:
+            blog_content = self.stream_llm_call(blog_prompt, topic, self._stream_label('write', strategy_data))
+        else:
+            blog_content = self.safe_llm_call(blog_prompt, stage='write')
         if not blog_content:
             print("❌ Blog writing failed")
             return None
+        return blog_content
+    
+    # ========================================================================
+    # SECTIONED WRITING - One AI call per outline section, run in parallel
+    # ========================================================================
+    def plan_sections(self, seo_data: Dict[str, Any]) -> List[str]:
+        """
+        Outline sections to write in parallel.
         
-        # ====================================================================
-        # STEP 6: EDITOR AGENT - Polish, optimize, and verify alignment
-        # ====================================================================
-        print("📝 Final editing, SEO optimization, and strategy alignment...")
+        Returns:
+            The SEO Agent's H2 sections, or an empty list when sectioned
+            writing is off or the outline is too short to split
+        """
+        writer_config = self.config.get('agents', {}).get('writer', {})
+        if not writer_config.get('sectioned_writing', False):
+            return []
+        sections = seo_data.get('content_structure', {}).get('h2_sections') or []
+        sections = [str(section).strip() for section in sections if str(section).strip()]
+        return sections if len(sections) >= 2 else []
+    
+    def _section_word_target(self, section_count: int) -> int:
+        """Words per section so the sections add up to the post's target length."""
+        writer_config = self.config.get('agents', {}).get('writer', {})
+        total = writer_config.get('word_count_target') or self.config.get('blog', {}).get('min_word_count', 1500)
+        return max(100, math.ceil(total / section_count))
+    
+    def build_section_prompt(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any],
+                             analysis: str, research_summary: str, sections: List[str], index: int) -> str:
+        """
+        Create the Writer Agent prompt for one outline section.
         
-        # Get editor configuration
-        editor_config = self.config.get('agents', {}).get('editor', {})
+        Every section prompt shares the same context and outline and only
+        differs in its final instruction, so the sections stay consistent
+        (and providers with prompt caching can reuse the common prefix).
         
-        # Create comprehensive prompt for editing and optimization
-        polish_prompt = f"""Polish and optimize this blog post about "{topic}":
+        Args:
+            sections: Outline (H2 section titles)
+            index: Position of the section to write (0-based)
+        """
+        blog_config = self.config.get('blog', {})
+        style, audience = self._blog_voice(strategy_data)
+        include_sources = blog_config.get('include_sources', True)
+        include_data = blog_config.get('include_data', True)
+        
+        title = sections[index]
+        words = self._section_word_target(len(sections))
+        outline = "\n".join(f"{number}. {section}" for number, section in enumerate(sections, 1))
+        
+        def render(strategy: str, seo: str, analysis: str, research: str) -> str:
+            return f"""You are writing one section of a {style} blog post about "{topic}" for {audience}.
 
-{blog_content}
+{strategy}
+
+{seo}
+
+COMPETITIVE ANALYSIS:
+{analysis}
+
+RESEARCH DATA:
+{research}
+
+ARTICLE OUTLINE (each section is written separately):
+{outline}
+
+CONTENT REQUIREMENTS:
+- {style.title()} tone, data-driven content
+- Provide unique insights based on strategic angles
+- Naturally incorporate primary and secondary keywords
+- Include actionable advice
+{'- Include source citations' if include_sources else ''}
+{'- Include data points and statistics' if include_data else ''}
+
+Write ONLY section {index + 1}: "{title}" (about {words} words).
+- Start with the heading "## {title}" and use ### subheadings where helpful
+- Do not write the article title or content that belongs to other sections
+
+Write the section:"""
+        
+        return self._fit_prompt(render, analysis=analysis,
+                                **self._writer_blocks(topic, strategy_data, seo_data, research_summary))
+    
+    @staticmethod
+    def clean_section(title: str, content: str) -> str:
+        """Section text under a single '## title' heading (drops headings the model added itself)."""
+        lines = content.strip().splitlines()
+        while lines and (not lines[0].strip() or lines[0].lstrip().startswith('#')):
+            heading = lines.pop(0).strip()
+            if heading.startswith('###'):  # A subheading is real content
+                lines.insert(0, heading)
+                break
+        return f"## {title}\n\n" + "\n".join(lines).strip()
+    
+    def build_stitch_prompt(self, topic: str, title: str, sections: List[str],
+                            contents: List[str], needs_intro: bool) -> str:
+        """
+        Create the prompt for the stitching pass.
+        
+        Only the opening and closing sentence of every section are sent and
+        only short connecting text comes back, so this pass stays fast.
+        """
+        summaries = []
+        for number, (section, content) in enumerate(zip(sections, contents), 1):
+            body = [line for line in content.splitlines()[1:] if line.strip() and not line.startswith('#')]
+            sentences = split_sentences(" ".join(body)) or [""]
+            summaries.append(f'{number}. {section}\n   Opens: "{sentences[0]}"\n   Ends: "{sentences[-1]}"')
+        
+        intro_request = "INTRO: <2-3 sentence introduction to the whole post>\n" if needs_intro else ""
+        transition_format = "\n".join(f"TRANSITION {number}: <one sentence leading from section {number} "
+                                      f"into section {number + 1}>" for number in range(1, len(sections)))
+        return f"""These sections of the blog post "{title}" (topic: "{topic}") were written separately:
 
-STRATEGY ALIGNMENT CHECK:
+{chr(10).join(summaries)}
+
+Write the connecting text that makes them read as one article.
+Reply in exactly this format, one item per line:
+{intro_request}{transition_format}"""
+    
+    @staticmethod
+    def parse_stitch_response(response: Optional[str]) -> Tuple[str, Dict[int, str]]:
+        """
+        Read the stitching pass reply.
+        
+        Returns:
+            (introduction or "", section number -> transition sentence)
+        """
+        intro, transitions = "", {}
+        for match in re.finditer(r'^\W*(INTRO|TRANSITION\s+(\d+))\W*:\s*(.+)$', response or "",
+                                 re.MULTILINE | re.IGNORECASE):
+            text = match.group(3).strip()
+            if match.group(2):
+                transitions[int(match.group(2))] = text
+            else:
+                intro = text
+        return intro, transitions
+    
+    @staticmethod
+    def assemble_sections(title: str, contents: List[str], intro: str = "",
+                          transitions: Optional[Dict[int, str]] = None) -> str:
+        """Join sections under the H1 title, with the introduction and transitions in place."""
+        transitions = transitions or {}
+        parts = [f"# {title}"]
+        if intro:
+            parts.append(intro)
+        for number, content in enumerate(contents, 1):
+            parts.append(content)
+            if number in transitions and number < len(contents):
+                parts.append(transitions[number])
+        return "\n\n".join(parts) + "\n"
+    
+    def _stitch_plan(self, topic: str, seo_data: Dict[str, Any], sections: List[str],
+                     contents: List[str]) -> Tuple[str, Optional[str]]:
+        """
+        Post title and stitching prompt (None when the stitching pass is off).
+        """
+        title = seo_data.get('meta_optimization', {}).get('title', f"Complete Guide to {topic}")
+        if not self.config.get('agents', {}).get('writer', {}).get('stitch_transitions', True):
+            return title, None
+        needs_intro = not re.search(r'intro|overview', sections[0], re.IGNORECASE)
+        return title, self.build_stitch_prompt(topic, title, sections, contents, needs_intro)
+    
+    def write_blog_sectioned(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any],
+                             analysis: str, research_summary: str, sections: List[str]) -> Optional[str]:
+        """
+        Write every outline section at the same time, then stitch them together.
+        
+        Each section is a separate, shorter AI call, so the draft takes
+        about as long as the longest section instead of the whole article
+        and no single response runs into the `llm.max_tokens` limit. A short
+        final pass adds the introduction and transitions between sections.
+        
+        Args:
+            sections: H2 section titles from the SEO Agent
+            
+        Returns:
+            The assembled draft, or None if any section failed
+        """
+        max_workers = max(1, self.config.get('agents', {}).get('writer', {}).get('max_parallel_sections', 4))
+        if self.verbose_progress:
+            print(f"⚡ Writing {len(sections)} sections in parallel (max {max_workers} at once)")
+        annotate_stage(write_mode='sectioned', sections=len(sections))
+        
+        prompts = [self.build_section_prompt(topic, strategy_data, seo_data, analysis, research_summary,
+                                             sections, index) for index in range(len(sections))]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each call keeps the caller's context so it is attributed to the write stage
+            futures = [executor.submit(in_current_context(self.safe_llm_call), prompt, stage='write')
+                       for prompt in prompts]
+            results = [future.result() for future in futures]
+        
+        if not all(results):
+            return None
+        contents = [self.clean_section(section, result) for section, result in zip(sections, results)]
+        
+        title, stitch_prompt = self._stitch_plan(topic, seo_data, sections, contents)
+        intro, transitions = self.parse_stitch_response(
+            self.safe_llm_call(stitch_prompt, stage='write') if stitch_prompt else None
+        )
+        return self.assemble_sections(title, contents, intro, transitions)
+    
+    # ========================================================================
+    # EDITOR AGENT - Polish, optimize, and verify alignment
+    # ========================================================================
+    def _editor_blocks(self, topic: str, strategy_data: Dict[str, Any], seo_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Strategy and SEO checklists shared by the editor prompts.
+        
+        Returns:
+            Dictionary with 'strategy' and 'seo' prompt blocks
+        """
+        _, audience = self._blog_voice(strategy_data)
+        
+        strategic_angles = strategy_data.get('content_angles', [f"Comprehensive guide to {topic}"])
+        primary_keywords = seo_data.get('primary_keywords', [topic])
+        secondary_keywords = seo_data.get('secondary_keywords', [])
+        content_structure = seo_data.get('content_structure', {})
+        seo_title = seo_data.get('meta_optimization', {}).get('title', f"Complete Guide to {topic}")
+        
+        strategy_block = f"""STRATEGY ALIGNMENT CHECK:
 - Primary Content Angle: {strategic_angles[0] if strategic_angles else f"Guide to {topic}"}
 - Target Audience: {strategy_data.get('target_audience', {}).get('primary', audience)}
-- Strategic Positioning: {strategy_data.get('strategic_positioning', {}).get('unique_value', 'Expert insights')}
-
-SEO OPTIMIZATION VERIFICATION:
+- Strategic Positioning: {strategy_data.get('strategic_positioning', {}).get('unique_value', 'Expert insights')}"""
+        
+        seo_block = f"""SEO OPTIMIZATION VERIFICATION:
 - Title optimization: {seo_title}
 - Primary keywords: {', '.join(primary_keywords[:3])}
 - Secondary keywords: {', '.join(secondary_keywords[:5])}
 - Content structure: {content_structure.get('h2_sections', ['Well-structured headings'])}
-- Meta description needed: {seo_data.get('meta_optimization', {}).get('description', f'Complete guide to {topic}')}
+- Meta description needed: {seo_data.get('meta_optimization', {}).get('description', f'Complete guide to {topic}')}"""
+        return {'strategy': strategy_block, 'seo': seo_block}
+    
+    def build_polish_prompt(self, topic: str, blog_content: str, strategy_data: Dict[str, Any],
+                            seo_data: Dict[str, Any], failures: Optional[List[str]] = None) -> str:
+        """
+        Create the Editor Agent prompt for a finished draft.
+        
+        Args:
+            failures: Failed local SEO checks (see check_post) to fix
+        """
+        
+        # Get editor configuration
+        editor_config = self.config.get('agents', {}).get('editor', {})
+        
+        # Measured problems replace asking the AI to check density/readability itself
+        measured = ""
+        if failures:
+            measured = "MEASURED ISSUES (fix these):\n" + "\n".join(f"- {failure}" for failure in failures) + "\n\n"
+        
+        # Create comprehensive prompt for editing and optimization
+        # (the draft is never shortened; the guidance blocks shrink around it)
+        def render(strategy: str, seo: str) -> str:
+            return f"""Polish and optimize this blog post about "{topic}":
 
-EDITING REQUIREMENTS:
+{blog_content}
+
+{strategy}
+
+{seo}
+
+{measured}EDITING REQUIREMENTS:
 - Improve readability and flow
 - Ensure natural keyword integration (avoid keyword stuffing)
 - Verify strategic angle is maintained throughout
@@ -924,25 +1784,848 @@ EDITING REQUIREMENTS:
 - Optimize headings for SEO (H1, H2, H3 structure)
 - Ensure content matches search intent: {seo_data.get('search_intent', 'informational')}
 - Final quality and consistency check
-{'- Verify keyword density is appropriate' if editor_config.get('keyword_density_check') else ''}
-{'- Add meta description at the end' if editor_config.get('meta_description_generation') else ''}
+{'- Keep the "Meta description:" line at the end' if editor_config.get('meta_description_generation') else ''}
 
 Return the final polished, SEO-optimized, and strategically-aligned blog post:"""
         
-        # Get polished version
-        final_content = self.safe_llm_call(polish_prompt)
-        if not final_content:
+        return self._fit_prompt(render, **self._editor_blocks(topic, strategy_data, seo_data))
+    
+    def polish_blog(self, topic: str, blog_content: str, strategy_data: Dict[str, Any],
+                    seo_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Editor Agent: Polish the draft.
+        
+        The draft is measured locally first (see plan_polish). If every
+        SEO check passes, no AI call is made. Readability, keyword stuffing
+        and meta description problems get targeted fixes (only the failing
+        sections with `agents.editor.section_editing`, and a short meta
+        description rewrite); anything else edits the whole post with the
+        failed checks listed in the prompt.
+        
+        Returns:
+            Polished blog post, or None if editing failed (the pipeline then
+            falls back to the draft, and a resumed run retries only this stage)
+        """
+        print("📝 Final editing, SEO optimization, and strategy alignment...")
+        
+        plan = self.plan_polish(blog_content, seo_data)
+        if plan['mode'] == 'document':
+            # Get polished version (streamed to file and stdout if enabled)
+            draft = self._with_meta_description(plan['body'], plan['description'])
+            polish_prompt = self.build_polish_prompt(topic, draft, strategy_data, seo_data, plan['failures'])
+            if self.streaming_enabled:
+                polished = self.stream_llm_call(polish_prompt, topic, self._stream_label('polish', strategy_data))
+            else:
+                polished = self.safe_llm_call(polish_prompt, stage='polish')
+            return self.finish_polish(self.accept_document_polish(draft, polished), seo_data)
+        
+        body, description = self.fix_structure(topic, plan, seo_data), plan['description']
+        if plan['fix_meta']:
+            description = self.clean_meta_description(
+                self.safe_llm_call(self.build_meta_description_prompt(topic, body, seo_data, description),
+                                   stage='polish'),
+                description
+            )
+        added = None
+        if plan['extension']:
+            added = self.safe_llm_call(self.build_extension_prompt(topic, body, plan['extension'],
+                                                                   strategy_data, seo_data), stage='polish')
+        if plan['edit_sections']:
+            body = self.polish_blog_sections(topic, body, strategy_data, seo_data)
+        body = self.insert_sections(body, added)
+        return self.finish_polish(self._with_meta_description(body, description), seo_data)
+    
+    # ========================================================================
+    # SEO CHECKS - Local, deterministic measurements that gate AI editing
+    # ========================================================================
+    def check_post(self, content: str, seo_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Measure a post against the `blog` and `agents.editor` targets.
+        
+        Returns:
+            analyze_post report (metrics, per-check results, overall pass)
+        """
+        blog_config = self.config.get('blog', {})
+        editor_config = self.config.get('agents', {}).get('editor', {})
+        settings = {
+            **editor_config,
+            'min_word_count': blog_config.get('min_word_count', 0),
+            'max_word_count': blog_config.get('max_word_count'),
+            'meta_description_check': editor_config.get('meta_description_generation', True),
+        }
+        return analyze_post(content, seo_data.get('primary_keywords', [])[:3],
+                            seo_data.get('secondary_keywords', [])[:5], settings)
+    
+    def _with_meta_description(self, body: str, description: Optional[str]) -> str:
+        """Post body with its meta description line at the end (body unchanged without one)."""
+        if not description:
+            return body
+        return body.rstrip() + f"\n\n**Meta description:** {description}\n"
+    
+    def plan_polish(self, blog_content: str, seo_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decide how much AI editing the draft needs.
+        
+        The meta description line is taken out of the draft (the SEO
+        Agent's description is used if the draft has none and
+        `meta_description_generation` is on) so section edits never touch it.
+        
+        A draft too long to come back whole within `llm.max_tokens` is
+        never edited in one call. Its heading problems are fixed locally
+        ('fix_headings'), missing length, H2 sections or primary keywords
+        are added as new sections in one call ('extension', see
+        plan_extension), and only the sections that fail their own checks
+        are edited.
+        
+        Returns:
+            Dictionary with the draft 'body', its 'description', the
+            'failures' found, and 'mode': 'skip' (every check passes),
+            'targeted' (see 'edit_sections', 'fix_meta', 'fix_headings' and
+            'extension') or 'document'
+        """
+        editor_config = self.config.get('agents', {}).get('editor', {})
+        body, description = split_meta_description(blog_content)
+        if not description and editor_config.get('meta_description_generation'):
+            description = seo_data.get('meta_optimization', {}).get('description')
+        
+        report = self.check_post(self._with_meta_description(body, description), seo_data)
+        failures = failed_checks(report)
+        failing = {name for name, result in report['checks'].items() if not result['passed']}
+        plan = {'body': body, 'description': description, 'failures': failures,
+                'mode': 'document', 'edit_sections': False, 'fix_meta': False,
+                'fix_headings': False, 'extension': None}
+        
+        # Section edits fix readability and keyword stuffing and a short call fixes
+        # the meta description; length, headings and missing keywords need the whole post
+        section_failures = failing & {'readability', 'keyword_density'}
+        sections_can_fix = not section_failures or (
+            editor_config.get('section_editing', False)
+            and not report['checks'].get('keyword_density', {}).get('missing'))
+        if not failing:
+            if editor_config.get('skip_polish_when_checks_pass', True):
+                print(f"✅ All {len(report['checks'])} SEO checks pass locally; skipping AI polish")
+                plan['mode'] = 'skip'
+        elif sections_can_fix and not failing - section_failures - {'meta_description'}:
+            plan.update(mode='targeted', edit_sections=bool(section_failures),
+                        fix_meta='meta_description' in failing)
+        elif len(body.split()) > self.config['llm'].get('max_tokens', 2000) * 0.75:
+            # A whole-post reply would be cut off at max_tokens and replace the full draft
+            print("✂️ Draft too long for one editing call; fixing its structure and the failing sections")
+            plan.update(mode='targeted', edit_sections=bool(section_failures), fix_meta='meta_description' in failing,
+                        fix_headings='headings' in failing, extension=self.plan_extension(body, report))
+            if report['metrics']['word_count'] > (self.config.get('blog', {}).get('max_word_count') or float('inf')):
+                print("⚠️ Draft is above max_word_count; it is kept at its length")
+        
+        for failure in failures:
+            print(f"   📏 {failure}")
+        annotate_stage(draft_checks_failed=sorted(failing), polish_mode=plan['mode'])
+        if not plan['edit_sections']:
+            # Sections are kept as drafted, except that a whole-post edit refines all of them
+            section_count = len(split_sections(body))
+            annotate_stage(sections_checked=section_count,
+                           sections_refined=section_count if plan['mode'] == 'document' else 0)
+        return plan
+    
+    def build_meta_description_prompt(self, topic: str, body: str, seo_data: Dict[str, Any],
+                                      current: Optional[str]) -> str:
+        """Create the prompt for rewriting only the meta description."""
+        editor_config = self.config.get('agents', {}).get('editor', {})
+        low = editor_config.get('meta_description_min_chars', 120)
+        high = editor_config.get('meta_description_max_chars', 160)
+        title = next((heading for level, heading in headings(body) if level == 1), topic)
+        primary = ', '.join(seo_data.get('primary_keywords', [topic])[:2])
+        return f"""Write a meta description for the blog post "{title}" about "{topic}".
+- Between {low} and {high} characters
+- Include: {primary}
+- Current description: {current or 'none'}
+
+Reply with the meta description only:"""
+    
+    @staticmethod
+    def clean_meta_description(response: Optional[str], fallback: Optional[str]) -> Optional[str]:
+        """First line of the model's reply without labels or quotes (fallback if empty)."""
+        if not response or not response.strip():
+            return fallback
+        line = response.strip().splitlines()[0]
+        line = re.sub(r'^[*_\s]*meta[ -]description[*_\s]*:\s*', '', line, flags=re.IGNORECASE)
+        return line.strip(' *_"\'') or fallback
+    
+    def fix_structure(self, topic: str, plan: Dict[str, Any], seo_data: Dict[str, Any]) -> str:
+        """The planned body with its heading problems repaired locally (if any)."""
+        if not plan['fix_headings']:
+            return plan['body']
+        title = seo_data.get('meta_optimization', {}).get('title', f"Complete Guide to {topic}")
+        annotate_stage(headings_fixed=True)
+        return fix_heading_structure(plan['body'], title)
+    
+    def plan_extension(self, body: str, report: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        New sections a too-long-to-edit draft needs (None if it needs none).
+        
+        Covers a draft below `blog.min_word_count`, with fewer H2 sections
+        than `agents.editor.min_h2_sections` or missing primary keywords.
+        
+        Returns:
+            {'words': words to add, 'sections': new H2 sections, 'keywords': missing primary keywords}
+        """
+        min_words = self.config.get('blog', {}).get('min_word_count', 0)
+        min_h2 = self.config.get('agents', {}).get('editor', {}).get('min_h2_sections', 2)
+        missing_words = max(0, min_words - report['metrics']['word_count'])
+        missing_h2 = max(0, min_h2 - sum(1 for level, _ in headings(body) if level == 2))
+        keywords = report['checks'].get('keyword_density', {}).get('missing') or []
+        if not (missing_words or missing_h2 or keywords):
+            return None
+        
+        # One reply has to hold every new section
+        max_words = int(self.config['llm'].get('max_tokens', 2000) * 0.75)
+        words = min(max(missing_words, 150), max_words)
+        sections = max(1, missing_h2, min(math.ceil(words / 300), 4))
+        return {'words': words, 'sections': sections, 'keywords': keywords}
+    
+    def build_extension_prompt(self, topic: str, body: str, extension: Dict[str, Any],
+                               strategy_data: Dict[str, Any], seo_data: Dict[str, Any]) -> str:
+        """Create the Editor Agent prompt for new sections that fill a draft's gaps."""
+        outline = "\n".join(f"{'  ' * (level - 1)}- {text}" for level, text in headings(body)) or "- (no headings)"
+        keyword_line = (f"- Use these keywords naturally: {', '.join(extension['keywords'])}\n"
+                        if extension['keywords'] else "")
+        
+        def render(strategy: str, seo: str) -> str:
+            return f"""A blog post about "{topic}" needs more content. Its current outline:
+
+{outline}
+
+{strategy}
+
+{seo}
+
+Write {extension['sections']} new section(s) for this post:
+- About {extension['words']} words in total
+- Each starts with a "## " heading and covers a subtopic the outline does not
+{keyword_line}- No introduction or conclusion for the whole post, and no meta description
+
+Return only the new sections:"""
+        
+        return self._fit_prompt(render, **self._editor_blocks(topic, strategy_data, seo_data))
+    
+    @staticmethod
+    def insert_sections(body: str, added: Optional[str]) -> str:
+        """
+        New sections placed before the post's last H2 section (usually the
+        conclusion); the body unchanged if the reply has no H2 heading.
+        """
+        first_h2 = re.search(r'^## ', added or '', re.MULTILINE)
+        if not first_h2:
+            return body
+        added = added[first_h2.start():].strip()  # Drop any preamble before the first heading
+        sections = split_sections(body)
+        last_h2 = max((index for index, section in enumerate(sections) if section.text.startswith('## ')),
+                      default=None)
+        if last_h2 is None:
+            return body.rstrip() + "\n\n" + added + "\n"
+        before = "".join(section.text for section in sections[:last_h2]).rstrip()
+        after = "".join(section.text for section in sections[last_h2:])
+        return f"{before}\n\n{added}\n\n{after}"
+    
+    def accept_document_polish(self, draft: str, polished: Optional[str], min_ratio: float = 0.8) -> Optional[str]:
+        """
+        The whole-post edit, or the draft if the reply is much shorter.
+        
+        A reply cut off at `llm.max_tokens` would otherwise silently
+        replace the full draft.
+        """
+        if not polished:
+            return polished
+        draft_words, polished_words = len(draft.split()), len(polished.split())
+        if polished_words < draft_words * min_ratio:
+            print(f"⚠️ Edited post is much shorter than the draft ({polished_words} vs {draft_words} words); "
+                  f"keeping the draft")
+            annotate_stage(polish_rejected=f"{polished_words}/{draft_words} words")
+            return draft
+        return polished
+    
+    def finish_polish(self, content: Optional[str], seo_data: Dict[str, Any]) -> Optional[str]:
+        """Record the final post's SEO checks on the run report (None passes through)."""
+        if not content:
+            return content
+        report = self.check_post(content, seo_data)
+        annotate_stage(seo_checks={name: result['passed'] for name, result in report['checks'].items()},
+                       seo_metrics=report['metrics'])
+        passed = sum(1 for result in report['checks'].values() if result['passed'])
+        print(f"📏 SEO checks: {passed}/{len(report['checks'])} pass")
+        return content
+    
+    def refinement_report(self, run_metrics: RunMetrics) -> Dict[str, Any]:
+        """
+        How often one run's drafts needed the Editor, from its polish stages.
+        
+        With `llm.draft_model` set, this is how often the fast model's
+        draft was accepted as-is versus refined by the refine model.
+        Variant runs count one draft per variant; resumed polish stages
+        are not counted.
+        """
+        records = [record for name, record in run_metrics.stage_records().items()
+                   if name.split('_')[0] == 'polish' and record.get('polish_mode')]
+        counts = dict.fromkeys(REFINEMENT_COUNTS, 0)
+        for record in records:
+            counts['drafts'] += 1
+            counts['accepted' if record['polish_mode'] == 'skip' else record['polish_mode']] += 1
+            counts['sections_checked'] += record.get('sections_checked', 0)
+            counts['sections_refined'] += record.get('sections_refined', 0)
+        return self._refinement_summary(counts)
+    
+    def combine_refinement_reports(self, reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Totals of several runs' refinement reports (batch and service summaries)."""
+        counts = {key: sum(report.get(key, 0) for report in reports) for key in REFINEMENT_COUNTS}
+        return self._refinement_summary(counts)
+    
+    def _refinement_summary(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        """Refinement counts with the models involved and the refinement rates."""
+        drafts, sections = counts['drafts'], counts['sections_checked']
+        return {
+            **counts,
+            'draft_model': self.llm_pool.resolve_model('write'),
+            'refine_model': self.llm_pool.resolve_model('polish'),
+            'refinement_rate': round((drafts - counts['accepted']) / drafts, 3) if drafts else 0.0,
+            'section_refinement_rate': round(counts['sections_refined'] / sections, 3) if sections else 0.0,
+        }
+    
+    # ========================================================================
+    # SECTION EDITING - Edit only the sections that fail local checks
+    # ========================================================================
+    def plan_section_edits(self, blog_content: str,
+                           seo_data: Dict[str, Any]) -> Tuple[List[MarkdownSection], Dict[int, List[str]]]:
+        """
+        Split the draft at its headings and check every section locally.
+        
+        Returns:
+            (sections in order, section index -> issues for the sections that need editing)
+        """
+        editor_config = self.config.get('agents', {}).get('editor', {})
+        keywords = list(seo_data.get('primary_keywords', [])[:3]) + list(seo_data.get('secondary_keywords', [])[:5])
+        sections = split_sections(blog_content)
+        issues = {}
+        for index, section in enumerate(sections):
+            found = section_issues(section, keywords, editor_config)
+            if found:
+                issues[index] = found
+        annotate_stage(sections_checked=len(sections), sections_refined=len(issues))
+        return sections, issues
+    
+    def build_section_polish_prompt(self, topic: str, section: MarkdownSection, issues: List[str],
+                                    position: int, total: int, strategy_data: Dict[str, Any],
+                                    seo_data: Dict[str, Any]) -> str:
+        """Create the Editor Agent prompt for one section and the issues found in it."""
+        heading_line = section.text.split('\n', 1)[0].strip() if section.heading else ""
+        issue_lines = "\n".join(f"- {issue}" for issue in issues)
+        keep_heading = (f'Return only the revised section, starting with the heading "{heading_line}":'
+                        if heading_line else "Return only the revised text:")
+        
+        def render(strategy: str, seo: str) -> str:
+            return f"""Polish this section (part {position} of {total}) of a blog post about "{topic}":
+
+{section.text.strip()}
+
+{strategy}
+
+{seo}
+
+ISSUES FOUND:
+{issue_lines}
+
+EDITING REQUIREMENTS:
+- Fix the issues listed above
+- Keep the facts, sources, subheadings and roughly the same length
+- Ensure natural keyword integration (avoid keyword stuffing)
+- Do not add an introduction or conclusion for the whole post
+
+{keep_heading}"""
+        
+        return self._fit_prompt(render, **self._editor_blocks(topic, strategy_data, seo_data))
+    
+    @staticmethod
+    def merge_section_edit(section: MarkdownSection, revised: Optional[str]) -> str:
+        """Revised section text in the original's place (the original if editing failed)."""
+        if not revised or not revised.strip():
+            return section.text
+        revised = revised.strip()
+        heading_line = section.text.split('\n', 1)[0].strip() if section.heading else ""
+        if heading_line and not revised.lstrip().startswith('#'):
+            revised = f"{heading_line}\n\n{revised}"
+        # Keep the spacing that separated this section from the next one
+        trailing = section.text[len(section.text.rstrip()):]
+        return revised + (trailing or "\n")
+    
+    @staticmethod
+    def _finish_section_edits(sections: List[MarkdownSection], edited: Dict[int, str]) -> str:
+        """Reassemble the post with the edited sections in place."""
+        return "".join(edited.get(index, section.text) for index, section in enumerate(sections))
+    
+    def polish_blog_sections(self, topic: str, blog_content: str, strategy_data: Dict[str, Any],
+                             seo_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Edit only the sections of the draft that fail the local checks, in parallel.
+        
+        Sections are split at # and ## headings. Each one is checked for
+        readability, sentence length and keyword stuffing (thresholds in
+        `agents.editor`); the ones that pass are kept as they are, and the
+        others are edited at the same time and merged back in place. A
+        section whose edit fails keeps its draft text, so one failure
+        never discards the rest of the post.
+        
+        Returns:
+            The edited post (the draft itself when every section passes)
+        """
+        sections, issues = self.plan_section_edits(blog_content, seo_data)
+        annotate_stage(edit_mode='sections', sections=len(sections), sections_edited=len(issues))
+        passing = sum(1 for index in range(len(sections)) if not issues.get(index))
+        print(f"🔎 {passing}/{len(sections)} sections pass local checks; editing {len(issues)}")
+        if not issues:
+            return self._finish_section_edits(sections, {})
+        
+        max_workers = max(1, self.config.get('agents', {}).get('editor', {}).get('max_parallel_sections', 4))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each call keeps the caller's context so it is attributed to the polish stage
+            futures = {
+                index: executor.submit(
+                    in_current_context(self.safe_llm_call),
+                    self.build_section_polish_prompt(topic, sections[index], found, index + 1, len(sections),
+                                                     strategy_data, seo_data),
+                    stage='polish'
+                )
+                for index, found in issues.items()
+            }
+            edited = {index: self.merge_section_edit(sections[index], future.result())
+                      for index, future in futures.items()}
+        return self._finish_section_edits(sections, edited)
+    
+    # ========================================================================
+    # MAIN CONTENT GENERATION PIPELINE
+    # ========================================================================
+    def build_pipeline_stages(self, topic: str) -> List[PipelineStage]:
+        """
+        Describe the 5-agent pipeline as a dependency graph.
+        
+        Each stage lists the stages whose output it needs; the scheduler
+        starts it as soon as those are done:
+        
+            strategy ──► seo ───────┐
+                                    ├──► write ──► polish
+            research ──► analysis ──┘
+        
+        Args:
+            topic: The blog topic
+            
+        Returns:
+            Stages in their sequential (declaration) order
+        """
+        return [
+            PipelineStage('strategy', lambda r: self.strategy_analysis(topic),
+                          config_keys=['llm', 'agents.strategy', 'structured_output', 'topic_reuse']),
+            PipelineStage('research', lambda r: self.conduct_research(topic),
+                          config_keys=['search', 'agents.research', 'research_index']),
+            PipelineStage('seo', lambda r: self.seo_analysis(topic, r['strategy']),
+                          depends_on=['strategy'], config_keys=['llm', 'agents.seo', 'structured_output', 'topic_reuse']),
+            PipelineStage('analysis',
+                          lambda r: self.analyze_research(topic, self.format_research(r['research'])),
+                          depends_on=['research'], config_keys=['llm', 'context_budget']),
+            PipelineStage('write',
+                          lambda r: self.write_blog(topic, r['strategy'], r['seo'], r['analysis'],
+                                                    self.format_research(r['research'],
+                                                                         r['strategy'].get('content_angles'))),
+                          depends_on=['strategy', 'research', 'seo', 'analysis'],
+                          config_keys=['llm', 'blog', 'agents.writer', 'context_budget']),
+            PipelineStage('polish',
+                          lambda r: self.polish_blog(topic, r['write'], r['strategy'], r['seo']),
+                          depends_on=['write', 'strategy', 'seo'],
+                          config_keys=['llm', 'blog', 'agents.editor', 'context_budget']),
+        ]
+    
+    # ========================================================================
+    # VARIANTS - Several posts from one strategy/research/SEO/analysis run
+    # ========================================================================
+    def plan_variants(self, count: Optional[int] = None, vary: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Variants to write, from the `variants` config section.
+        
+        Args:
+            count: Number of posts (default `variants.count`)
+            vary: 'angle' (one per strategy content angle), 'style' or
+                'audience' (one per entry of `variants.styles` / `variants.audiences`)
+            
+        Returns:
+            Variant descriptions with a unique 'name' (used in stage and file names)
+            and 'vary' (which setting differs)
+            
+        Raises:
+            ValueError: For an unknown vary option or an empty style/audience list
+        """
+        variant_config = self.config.get('variants', {})
+        count = max(1, count or variant_config.get('count', 3))
+        vary = vary or variant_config.get('vary', 'angle')
+        
+        if vary == 'angle':
+            # The angle itself is only known once the Strategy Agent has run
+            return [{'name': f"angle{i + 1}", 'vary': vary, 'angle_index': i} for i in range(count)]
+        if vary not in ('style', 'audience'):
+            raise ValueError(f"Unknown variant type '{vary}' (use angle, style or audience)")
+        options = variant_config.get('styles' if vary == 'style' else 'audiences') or []
+        if not options:
+            raise ValueError(f"variants.{vary}s is empty in the configuration")
+        if count > len(options):
+            print(f"⚠️ Only {len(options)} {vary} options configured; writing {len(options)} variants")
+        return [{'name': f"{vary}-{self._safe_filename(str(option)).lower()}", 'vary': vary, vary: option}
+                for option in options[:count]]
+    
+    def variant_strategy(self, strategy_data: Dict[str, Any], variant: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Strategy data as one variant's Writer and Editor should see it.
+        
+        The variant's angle becomes the primary content angle and its
+        audience the target audience; its style is applied by _blog_voice.
+        """
+        data = copy.deepcopy(strategy_data)
+        angles = data.get('content_angles') or []
+        if 'angle_index' in variant and variant['angle_index'] < len(angles):
+            angle = angles[variant['angle_index']]
+            data['content_angles'] = [angle] + [other for other in angles if other != angle]
+        if variant.get('audience'):
+            if not isinstance(data.get('target_audience'), dict):
+                data['target_audience'] = {}
+            data['target_audience']['primary'] = variant['audience']
+        data['variant'] = variant
+        return data
+    
+    @staticmethod
+    def variant_angle_missing(strategy_data: Dict[str, Any], variant: Dict[str, Any]) -> bool:
+        """True for an angle variant beyond the content angles the Strategy Agent found."""
+        angles = strategy_data.get('content_angles') or []
+        return 'angle_index' in variant and variant['angle_index'] >= max(1, len(angles))
+    
+    def _skipped_variant_output(self) -> Any:
+        """Stage output of a variant that is not written (an empty post)."""
+        return ''
+    
+    def build_variant_stages(self, topic: str, variants: List[Dict[str, Any]]) -> List[PipelineStage]:
+        """
+        Pipeline graph with one write + polish pair per variant.
+        
+        Strategy, research, SEO and analysis run once; every variant's
+        write stage starts as soon as they finish, so N variants cost one
+        upstream run plus N parallel writes:
+        
+            strategy, research, seo, analysis ──┬──► write_angle1 ──► polish_angle1
+                                                ├──► write_angle2 ──► polish_angle2
+                                                └──► ...
+        
+        The variant stages wrap the regular write/polish stage functions
+        (sync or async alike) with the variant's strategy data. Angle
+        variants beyond the strategy's content angles return an empty post
+        instead of repeating an angle (see _variant_outputs).
+        """
+        stages = self.build_pipeline_stages(topic)
+        write = next(stage for stage in stages if stage.name == 'write')
+        polish = next(stage for stage in stages if stage.name == 'polish')
+        stages = [stage for stage in stages if stage not in (write, polish)]
+        
+        for variant in variants:
+            write_name, polish_name = f"write_{variant['name']}", f"polish_{variant['name']}"
+            
+            def variant_results(r, variant=variant, write_name=write_name):
+                view = {**r, 'strategy': self.variant_strategy(r['strategy'], variant)}
+                if write_name in r:
+                    view['write'] = r[write_name]
+                return view
+            
+            def run_variant(r, func, variant=variant, variant_results=variant_results):
+                if self.variant_angle_missing(r['strategy'], variant):
+                    # Not None: a failed stage would stop the other variants
+                    return self._skipped_variant_output()
+                return func(variant_results(r))
+            
+            stages.append(PipelineStage(write_name, lambda r, f=write.func, run=run_variant: run(r, f),
+                                        depends_on=list(write.depends_on),
+                                        config_keys=write.config_keys + ['variants']))
+            stages.append(PipelineStage(polish_name, lambda r, f=polish.func, run=run_variant: run(r, f),
+                                        depends_on=[write_name] + [d for d in polish.depends_on if d != 'write'],
+                                        config_keys=polish.config_keys + ['variants']))
+        return stages
+    
+    def _variant_outputs(self, scheduler: StageScheduler, results: Dict[str, Any],
+                         variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One entry per variant: its description, resolved angle and final post (or None)."""
+        strategy = results.get('strategy') or {}
+        if results.get('strategy') is not None:
+            kept = [variant for variant in variants if not self.variant_angle_missing(strategy, variant)]
+            if len(kept) < len(variants):
+                angle_count = len(strategy.get('content_angles') or [])
+                print(f"⚠️ Only {angle_count} content angles identified; wrote {len(kept)} variants")
+            variants = kept
+        outputs = []
+        for variant in variants:
+            write_name, polish_name = f"write_{variant['name']}", f"polish_{variant['name']}"
+            content = results.get(polish_name)
+            if content is None and write_name not in scheduler.failed and results.get(write_name):
+                print(f"⚠️ Polish failed for variant {variant['name']}, using its draft")
+                content = results[write_name]
+            variant_data = self.variant_strategy(strategy, variant)
+            outputs.append({
+                **variant,
+                'angle': (variant_data.get('content_angles') or [None])[0],
+                'style': self._blog_voice(variant_data)[0],
+                'audience': variant_data.get('target_audience', {}).get('primary'),
+                'content': content,
+            })
+        
+        upstream_failed = [name for name in scheduler.failed if name in ('strategy', 'research', 'seo', 'analysis')]
+        if upstream_failed:
+            print(f"❌ Pipeline stopped at stage: {', '.join(upstream_failed)}")
+        else:
+            done = sum(1 for output in outputs if output['content'])
+            print(f"✅ Variant generation complete: {done}/{len(outputs)} posts")
+        return outputs
+    
+    # ========================================================================
+    # CHECKPOINTS - Persist stage outputs so failed runs can resume
+    # ========================================================================
+    def get_run_dir(self, topic: str) -> str:
+        """Checkpoint directory for a topic (stable, so a later run can resume)."""
+        runs_dir = self.config.get('checkpoints', {}).get('runs_dir', "output/runs")
+        return os.path.join(runs_dir, self._safe_filename(topic))
+    
+    def open_checkpoints(self, topic: str) -> Optional[RunCheckpointStore]:
+        """
+        Checkpoint store for the topic, locked for this run.
+        
+        Another run of the same topic (in any process) holds the lock until
+        it finishes; this waits up to `checkpoints.lock_wait_seconds` for it
+        and then goes on without checkpoints rather than overwriting them.
+        
+        Returns:
+            The locked store, or None if checkpoints are disabled or the
+            lock could not be taken (release it with store.release())
+        """
+        checkpoint_config = self.config.get('checkpoints', {})
+        if not checkpoint_config.get('enabled', True):
+            return None
+        
+        store = RunCheckpointStore(self.get_run_dir(topic))
+        if store.acquire(timeout=0):
+            return store
+        wait_seconds = checkpoint_config.get('lock_wait_seconds', 900)
+        print(f"⏳ Another run is using {store.run_dir}; waiting up to {wait_seconds}s for it to finish")
+        if store.acquire(timeout=wait_seconds):
+            return store
+        print(f"⚠️ {store.run_dir} is still locked; running without checkpoints")
+        return None
+    
+    @contextmanager
+    def checkpoint_lock(self, topic: str):
+        """Hold the topic's checkpoint store (or None) for the duration of a run."""
+        store = self.open_checkpoints(topic)
+        try:
+            yield store
+        finally:
+            if store:
+                store.release()
+    
+    def _add_checkpoints(self, topic: str, scheduler: StageScheduler, store: RunCheckpointStore,
+                         resume: bool):
+        """
+        Wrap every stage so its output is saved when it completes.
+        
+        In resume mode a stage whose checkpoint fingerprint still matches is
+        loaded instead of re-run. Fingerprints chain through dependencies, so
+        a config change re-runs the affected stage and everything downstream.
+        """
+        fingerprints = {}
+        for name in scheduler.topological_order():
+            stage = scheduler.stages[name]
+            fingerprint = store.fingerprint(
+                topic, name, self.config, stage.config_keys,
+                [fingerprints[dep] for dep in stage.depends_on]
+            )
+            fingerprints[name] = fingerprint
+            stage.func = self._checkpointed_stage(name, stage.func, store, fingerprint, resume)
+    
+    def _checkpointed_stage(self, name, func, store, fingerprint, resume):
+        """Return a stage function that loads/saves its checkpoint."""
+        def run(results):
+            if resume:
+                saved = store.load(name, fingerprint)
+                if saved is not None:
+                    print(f"♻️ Resumed '{name}' from checkpoint")
+                    annotate_stage(status='resumed')
+                    return saved
+            output = func(results)
+            if output is not None:
+                store.save(name, fingerprint, output)
+            return output
+        return run
+    
+    @staticmethod
+    def _timed_stage(name, func):
+        """Return a stage function that records its wall time on the active run."""
+        def run(results):
+            with stage_scope(name) as record:
+                output = func(results)
+                if output is None:
+                    record['status'] = 'failed'
+                return output
+        return run
+    
+    def generate_competitive_blog(self, topic: str, resume: Optional[bool] = None,
+                                  run_metrics: Optional[RunMetrics] = None) -> Optional[str]:
+        """
+        Enhanced pipeline for generating competitive blog content.
+        
+        This implements a 5-agent approach:
+        1. Strategy Agent: Analyzes topic and creates content strategy
+        2. Research Agent: Gathers competitive intelligence (strategy-guided)
+        3. SEO Agent: Keyword research and optimization strategy
+        4. Writer Agent: Creates comprehensive blog content (strategy + SEO guided)
+        5. Editor Agent: Polishes and optimizes the final output
+        
+        Independent agents run side by side when `pipeline.parallel_stages`
+        is enabled: Strategy overlaps with Research, and the SEO and
+        Analysis calls run together (see build_pipeline_stages).
+        
+        With `checkpoints.enabled`, every stage output is saved under
+        get_run_dir(topic); a resumed run skips stages that are still valid.
+        
+        Args:
+            topic: The blog topic to write about
+            resume: Reuse saved stage outputs (uses `checkpoints.resume` if None)
+            run_metrics: Collector for timings and token usage (a new one is
+                created if None); written as a run report when enabled
+            
+        Returns:
+            Complete blog post as string, or None if generation failed
+        """
+        if run_metrics is None:
+            run_metrics = RunMetrics(topic)
+        
+        with track_run(run_metrics), self.checkpoint_lock(topic) as store:
+            final_content = self._run_pipeline(topic, resume, store)
+        self._finish_run(run_metrics, final_content)
+        return final_content
+    
+    def generate_blog_variants(self, topic: str, count: Optional[int] = None, vary: Optional[str] = None,
+                               resume: Optional[bool] = None,
+                               run_metrics: Optional[RunMetrics] = None) -> List[Dict[str, Any]]:
+        """
+        Several complete posts on one topic (e.g. for A/B tests).
+        
+        Strategy, research, SEO and analysis run once; the Writer and
+        Editor then run once per variant, in parallel (see build_variant_stages).
+        
+        Args:
+            topic: The blog topic
+            count: Number of variants (default `variants.count`)
+            vary: 'angle', 'style' or 'audience' (default `variants.vary`)
+            resume: Reuse saved stage outputs (uses `checkpoints.resume` if None)
+            run_metrics: Collector for timings and token usage
+            
+        Returns:
+            One dictionary per variant with 'name', 'angle', 'style',
+            'audience' and 'content' (None if that variant failed)
+        """
+        variants = self.plan_variants(count, vary)
+        if run_metrics is None:
+            run_metrics = RunMetrics(topic)
+        
+        with track_run(run_metrics), self.checkpoint_lock(topic) as store:
+            scheduler = self._build_scheduler(topic, resume, store, self.build_variant_stages(topic, variants),
+                                              min_workers=len(variants))
+            results = scheduler.run()
+            outputs = self._variant_outputs(scheduler, results, variants)
+        self._finish_run(run_metrics, next((output['content'] for output in outputs if output['content']), None))
+        return outputs
+    
+    def _http_client_stats(self) -> Optional[Dict[str, Any]]:
+        """Connection reuse metrics of the Serper client, if one is in use."""
+        return self.http_client.stats() if self.http_client else None
+    
+    def _finish_run(self, run_metrics: RunMetrics, final_content: Optional[str]):
+        """Close out the run's metrics and write its report if enabled."""
+        run_metrics.finish('succeeded' if final_content else 'failed')
+        http_stats = self._http_client_stats()
+        if http_stats:
+            run_metrics.extra['http_client'] = http_stats
+        run_metrics.extra['llm_backends'] = self.llm_pool.stats()
+        if self.topic_index:
+            run_metrics.extra['topic_reuse'] = self.topic_index.stats()
+        run_metrics.extra['refinement'] = self.refinement_report(run_metrics)
+        
+        # Structured run report (and optional Prometheus metrics) for capacity planning
+        monitoring = self.config.get('monitoring', {})
+        if monitoring.get('run_report', True):
+            report_path = run_metrics.write_reports(
+                monitoring.get('run_report_dir', "output/reports"),
+                prometheus=monitoring.get('prometheus_metrics', False)
+            )
+            if self.verbose_progress:
+                print(f"📈 Run report: {report_path}")
+    
+    def _run_pipeline(self, topic: str, resume: Optional[bool],
+                      store: Optional[RunCheckpointStore]) -> Optional[str]:
+        """Build, schedule and run the stage graph for one topic."""
+        scheduler = self._build_scheduler(topic, resume, store)
+        results = scheduler.run()
+        return self._pipeline_result(scheduler, results)
+    
+    def _build_scheduler(self, topic: str, resume: Optional[bool], store: Optional[RunCheckpointStore],
+                         stages: Optional[List[PipelineStage]] = None, min_workers: int = 0) -> StageScheduler:
+        """
+        Create the stage scheduler with checkpointing and timing applied.
+        
+        Args:
+            store: Locked checkpoint store from open_checkpoints (None runs
+                without checkpoints)
+            stages: Stage graph (default build_pipeline_stages(topic))
+            min_workers: Lower bound for `pipeline.max_parallel_stages`
+                (variant runs need one worker per variant)
+        """
+        print(f"🚀 Starting enhanced 5-agent blog generation: {topic}")
+        print("=" * 70)
+        
+        pipeline_config = self.config.get('pipeline', {})
+        scheduler = StageScheduler(
+            stages or self.build_pipeline_stages(topic),
+            max_workers=max(min_workers, pipeline_config.get('max_parallel_stages', 4)),
+            parallel=pipeline_config.get('parallel_stages', True),
+            verbose=self.verbose_progress
+        )
+        
+        if store:
+            if resume is None:
+                resume = self.config.get('checkpoints', {}).get('resume', False)
+            self._add_checkpoints(topic, scheduler, store, resume)
+            if self.verbose_progress:
+                print(f"💾 Checkpoints: {store.run_dir}{' (resuming)' if resume else ''}")
+        
+        # Time every stage (outermost, so resumed stages are timed too)
+        for stage in scheduler.stages.values():
+            stage.func = self._timed_stage(stage.name, stage.func)
+        return scheduler
+    
+    @staticmethod
+    def _pipeline_result(scheduler: StageScheduler, results: Dict[str, Any]) -> Optional[str]:
+        """Final blog from a finished scheduler run (draft if only polishing failed)."""
+        if scheduler.failed == ['polish']:
             print("⚠️ Polish failed, using original content")
-            final_content = blog_content  # Fallback to unpolished version
+            return results['write']  # Fallback to unpolished version
+        if scheduler.failed:
+            print(f"❌ Pipeline stopped at stage: {', '.join(scheduler.failed)}")
+            return None
         
         print("✅ Enhanced 5-agent blog generation complete!")
         print(f"📊 Generated: Strategy → Research → SEO → Writing → Editing")
-        return final_content
+        return results['polish']
     
     # ========================================================================
     # FILE OUTPUT AND MANAGEMENT
     # ========================================================================
-    def save_blog_post(self, content: str, topic: str) -> str:
+    def save_blog_post(self, content: str, topic: str, variant: Optional[str] = None) -> str:
         """
         Save the generated blog post to a file with metadata.
         
@@ -954,6 +2637,7 @@ Return the final polished, SEO-optimized, and strategically-aligned blog post:""
         Args:
             content: The blog post content
             topic: Original topic for filename
+            variant: Variant name added to the filename and metadata (see generate_blog_variants)
             
         Returns:
             Path to saved file
@@ -966,17 +2650,17 @@ Return the final polished, SEO-optimized, and strategically-aligned blog post:""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Clean topic for safe filename (remove special characters)
-        safe_topic = "".join(c if c.isalnum() or c in (' ', '-', '_') else '' for c in topic)
-        safe_topic = safe_topic.replace(' ', '_')
+        safe_topic = self._safe_filename(topic)
         
         # Construct filename
-        filename = f"output/{timestamp}_Fixed_{safe_topic}.md"
+        filename = f"output/{timestamp}_Fixed_{safe_topic}{'_' + variant if variant else ''}.md"
         
         # Create metadata header for the blog post
+        variant_line = f"*Variant: {variant}*\n" if variant else ""
         metadata = f"""# {topic}
 *Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
 *System: Fixed Competitive Blog Generator*
-*Features: Rate limiting, Error handling, Real-time research*
+{variant_line}*Features: Rate limiting, Error handling, Real-time research*
 
 ---
 
@@ -987,10 +2671,35 @@ Return the final polished, SEO-optimized, and strategically-aligned blog post:""
             f.write(metadata + content)
         
         return filename
+    
+    @staticmethod
+    def _safe_filename(topic: str) -> str:
+        """Topic with special characters removed and spaces as underscores."""
+        safe_topic = "".join(c if c.isalnum() or c in (' ', '-', '_') else '' for c in topic)
+        return safe_topic.replace(' ', '_')
 
 # ============================================================================
 # COMMAND LINE INTERFACE
 # ============================================================================
+def print_usage():
+    """Show the command line usage and examples."""
+    print("🚀 Fixed Competitive Blog Generator")
+    print("Usage: python competitive_blog_fixed.py 'Your Topic' [--resume] [--variants N [--vary angle|style|audience]]")
+    print("\nExamples:")
+    print("python competitive_blog_fixed.py 'Remote Work Trends'")
+    print("python competitive_blog_fixed.py 'AI Tools for Business'")
+    print("python competitive_blog_fixed.py 'AI Tools for Business' --resume  # Continue a failed run")
+    print("python competitive_blog_fixed.py 'AI Tools for Business' --variants 3  # One post per content angle")
+
+
+def option_value(options: List[str], flag: str) -> Optional[str]:
+    """The argument after a command line flag (None if the flag or its value is missing)."""
+    if flag not in options:
+        return None
+    position = options.index(flag) + 1
+    return options[position] if position < len(options) else None
+
+
 def main():
     """
     Command line interface with comprehensive error handling.
@@ -1002,15 +2711,20 @@ def main():
     
     # Check if user provided a topic
     if len(sys.argv) < 2:
-        print("🚀 Fixed Competitive Blog Generator")
-        print("Usage: python competitive_blog_fixed.py 'Your Topic'")
-        print("\nExamples:")
-        print("python competitive_blog_fixed.py 'Remote Work Trends'")
-        print("python competitive_blog_fixed.py 'AI Tools for Business'")
+        print_usage()
         return
     
     # Get topic from command line argument
     topic = sys.argv[1]
+    options = sys.argv[2:]
+    resume = '--resume' in options
+    variant_count = option_value(options, '--variants')
+    vary = option_value(options, '--vary')
+    if ('--variants' in options and not (variant_count or '').isdigit()) or ('--vary' in options and not vary):
+        print("❌ --variants needs a whole number (e.g. --variants 3) and --vary one of angle, style, audience\n")
+        print_usage()
+        return
+    variant_count = int(variant_count) if variant_count else None
     
     try:
         # Initialize the generator
@@ -1021,8 +2735,19 @@ def main():
         print("⏱️ Note: This may take 3-5 minutes due to rate limiting")
         print("-" * 60)
         
+        if variant_count or vary:
+            # Several posts from one shared strategy/research/SEO run
+            variants = generator.generate_blog_variants(topic, variant_count, vary, resume=resume or None)
+            for variant in variants:
+                if variant['content']:
+                    filepath = generator.save_blog_post(variant['content'], topic, variant['name'])
+                    print(f"✅ {variant['name']} ({variant[variant['vary']]}): {filepath}")
+                else:
+                    print(f"❌ {variant['name']}: generation failed")
+            return
+        
         # Generate the blog post
-        result = generator.generate_competitive_blog(topic)
+        result = generator.generate_competitive_blog(topic, resume=resume or None)
         
         if result:
             # Save and show success
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Prompt Context Budgeting
+
+Keeps prompts to a planned size instead of pasting whole sections in:
+- Counts tokens locally (tiktoken when installed, otherwise a close
+  word/punctuation estimate; no API call either way)
+- Gives every prompt section (strategy, SEO, analysis, research) its own
+  token budget, scaled down when the prompt would exceed
+  `max_prompt_tokens` (a draft being edited is never cut; the other
+  sections shrink around it)
+- Compresses research to its budget by dropping duplicate sources and
+  keeping the sentences that best match the topic (extractive ranking)
+
+Smaller prompts are cheaper, return faster and use up less of the
+provider's tokens-per-minute quota.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Optional: exact BPE token counts (falls back to an estimate when not installed)
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # ImportError, or the encoding cannot be downloaded
+    _ENCODING = None
+
+
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“(])')
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d")
+
+# Words that say nothing about relevance
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'with', 'you', 'your',
+}
+
+# Research categories in prompt order: (key, heading, show date)
+RESEARCH_SECTIONS = [
+    ('trends', "MARKET TRENDS:", False),
+    ('competitors', "COMPETITIVE LANDSCAPE:", False),
+    ('data', "DATA & STATISTICS:", False),
+    ('news', "LATEST NEWS:", True),
+]
+
+
+# ============================================================================
+# TOKEN COUNTING
+# ============================================================================
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens in text.
+
+    Exact (cl100k_base) with tiktoken installed; otherwise each word costs
+    one token per 4 characters (at least one) and each punctuation mark one.
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return sum(max(1, math.ceil(len(piece) / 4)) if piece[0].isalnum() or piece[0] == '_' else 1
+               for piece in _TOKEN_PIECE.findall(text))
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split prose into sentences (good enough for snippets and drafts)."""
+    text = " ".join(text.split())
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence]
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = " ...") -> str:
+    """
+    Shorten text to at most max_tokens, cutting at a line, sentence or word boundary.
+
+    Returns:
+        The text unchanged if it fits, otherwise a prefix ending with marker
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - count_tokens(marker)
+    kept: List[str] = []
+    used = 0
+    # Whole lines first (keeps list structure), then sentences, then words
+    for line in text.splitlines():
+        cost = count_tokens(line) + 1
+        if used + cost <= budget:
+            kept.append(line)
+            used += cost
+            continue
+        pieces = []
+        for sentence in split_sentences(line):
+            sentence_cost = count_tokens(sentence) + 1
+            if used + sentence_cost > budget:
+                if not pieces and not kept:
+                    words = []
+                    for word in sentence.split():
+                        word_cost = count_tokens(word)
+                        if used + word_cost > budget:
+                            break
+                        words.append(word)
+                        used += word_cost
+                    pieces.append(" ".join(words))
+                break
+            pieces.append(sentence)
+            used += sentence_cost
+        if pieces:
+            kept.append(" ".join(pieces))
+        break
+    return "\n".join(kept).rstrip() + marker
+
+
+# ============================================================================
+# RESEARCH COMPRESSION
+# ============================================================================
+def _terms(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 1}
+
+
+def _source_key(item: Dict[str, Any]) -> str:
+    link = (item.get('link') or '').lower().rstrip('/')
+    link = re.sub(r'^https?://(www\.)?', '', link)
+    return link or " ".join(_WORD.findall((item.get('title') or '').lower()))
+
+
+def dedupe_items(items: Iterable[Tuple[str, int, Dict[str, Any]]],
+                 similarity: float = 0.8) -> List[Tuple[str, int, Dict[str, Any]]]:
+    """
+    Drop repeated sources across research categories.
+
+    Items are (category, rank, result). A result is a duplicate when its
+    URL (or title) was already seen, or when its snippet shares at least
+    `similarity` of its words (Jaccard) with a kept snippet.
+    """
+    kept, seen_keys, kept_terms = [], set(), []
+    for category, rank, item in items:
+        key = _source_key(item)
+        if key and key in seen_keys:
+            continue
+        terms = _terms(item.get('snippet', ''))
+        if terms and any(len(terms & other) / len(terms | other) >= similarity for other in kept_terms):
+            continue
+        seen_keys.add(key)
+        kept_terms.append(terms)
+        kept.append((category, rank, item))
+    return kept
+
+
+def _sentence_score(sentence: str, query_terms: set) -> float:
+    """Topic overlap, with a bonus for figures (statistics make better evidence)."""
+    terms = _terms(sentence)
+    if not terms:
+        return 0.0
+    overlap = len(terms & query_terms) / math.sqrt(len(terms))
+    return overlap + (0.5 if _NUMBER.search(sentence) else 0.0)
+
+
+def compress_research(research_data: Dict[str, Any], max_tokens: int, query: Optional[str] = None,
+                      sentences_per_source: int = 2, max_sources_per_section: int = 5,
+                      deduplicate: bool = True) -> str:
+    """
+    Format research for a prompt within a token budget.
+
+    Duplicate sources are removed, every snippet is reduced to its most
+    relevant sentences, and sources are added best first (taking turns
+    between categories so none is crowded out) until the budget is used.
+
+    Args:
+        research_data: Output of conduct_research
+        max_tokens: Token budget for the whole research block
+        query: Text to rank against (defaults to the topic)
+        sentences_per_source: Sentences kept from each snippet
+        max_sources_per_section: Upper limit per research category
+        deduplicate: Drop repeated sources first (skip when the research
+            index already removed them)
+
+    Returns:
+        Research block in the same layout as format_research
+    """
+    topic = research_data.get('topic', '')
+    query_terms = _terms(query or topic)
+    header = f"RESEARCH DATA: {topic}\n"
+
+    items = [(key, rank, item)
+             for key, _, _ in RESEARCH_SECTIONS
+             for rank, item in enumerate(research_data.get(key) or [])]
+    candidates: Dict[str, List[Tuple[float, int, Dict[str, Any], str]]] = {key: [] for key, _, _ in RESEARCH_SECTIONS}
+    for category, rank, item in (dedupe_items(items) if deduplicate else items):
+        sentences = split_sentences(item.get('snippet', ''))
+        best = sorted(sentences, key=lambda s: _sentence_score(s, query_terms), reverse=True)[:sentences_per_source]
+        summary = " ".join(s for s in sentences if s in best)  # Keep original order
+        score = (_sentence_score(item.get('title', '') + ". " + summary, query_terms)
+                 + 1.0 / (rank + 2))  # Search rank as a tie-breaker
+        candidates[category].append((score, rank, item, summary))
+    for entries in candidates.values():
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+
+    # Round-robin across categories, best source first, until the budget is spent
+    used = count_tokens(header) + sum(count_tokens(heading) + 1 for key, heading, _ in RESEARCH_SECTIONS
+                                      if candidates[key])
+    chosen: Dict[str, List[Tuple[int, str]]] = {key: [] for key, _, _ in RESEARCH_SECTIONS}
+    position = 0
+    while any(position < min(len(entries), max_sources_per_section) for entries in candidates.values()):
+        for key, _, show_date in RESEARCH_SECTIONS:
+            entries = candidates[key]
+            if position >= min(len(entries), max_sources_per_section):
+                continue
+            _, rank, item, summary = entries[position]
+            title = item.get('title', '')
+            if show_date:
+                title = f"{title} ({item.get('date') or 'Recent'})"
+            block = f"{title}\n   {summary}\n"
+            cost = count_tokens(block) + 2
+            if used + cost > max_tokens:
+                continue
+            chosen[key].append((rank, block))
+            used += cost
+        position += 1
+
+    formatted = [header]
+    for key, heading, _ in RESEARCH_SECTIONS:
+        if not chosen[key]:
+            continue
+        formatted.append(heading)
+        for number, (_, block) in enumerate(sorted(chosen[key]), 1):
+            formatted.append(f"{number}. {block}")
+    return "\n".join(formatted).rstrip() + "\n"
+
+
+# ============================================================================
+# SECTION BUDGETS
+# ============================================================================
+class ContextBudget:
+    """
+    Per-section token budgets for one kind of prompt.
+
+    Budgets are upper limits; when their sum plus the fixed parts of a
+    prompt would exceed max_prompt_tokens, every section is scaled down
+    by the same factor.
+    """
+
+    DEFAULT_SECTIONS = {'strategy': 250, 'seo': 250, 'analysis': 450, 'research': 900}
+
+    def __init__(self, section_tokens: Optional[Dict[str, int]] = None, max_prompt_tokens: Optional[int] = None):
+        """
+        Args:
+            section_tokens: Section name -> token budget (defaults fill any gaps)
+            max_prompt_tokens: Ceiling for a whole prompt, or None for no ceiling
+        """
+        self.section_tokens = {**self.DEFAULT_SECTIONS, **(section_tokens or {})}
+        self.max_prompt_tokens = max_prompt_tokens
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['ContextBudget']:
+        """Build from the `context_budget` config section (None when disabled)."""
+        budget_config = config.get('context_budget', {}) or {}
+        if not budget_config.get('enabled', True):
+            return None
+        return cls(budget_config.get('section_tokens'), budget_config.get('max_prompt_tokens'))
+
+    def allocate(self, sections: Iterable[str], fixed_tokens: int = 0) -> Dict[str, int]:
+        """
+        Budgets for the given sections in a prompt with fixed_tokens of other text.
+
+        Args:
+            sections: Section names that appear in this prompt
+            fixed_tokens: Tokens of instructions and anything that cannot shrink
+        """
+        budgets = {name: self.section_tokens.get(name, 0) for name in sections}
+        if self.max_prompt_tokens:
+            available = max(0, self.max_prompt_tokens - fixed_tokens)
+            total = sum(budgets.values())
+            if total > available:
+                scale = available / total if total else 0
+                budgets = {name: int(tokens * scale) for name, tokens in budgets.items()}
+        return budgets
+
+    def fit(self, text: str, budget: int) -> str:
+        """Text cut down to its section budget."""
+        return truncate_to_tokens(text, budget)
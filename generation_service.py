@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Blog Generation Service
+
+A long-running process with a small HTTP API, so generating a post does
+not pay for Python startup, the langchain import and client construction
+every time:
+- One shared generator keeps the LLM pool, pooled Serper connections,
+  rate limiters and caches warm between jobs
+- Submitted topics wait in an internal queue; a fixed number of workers
+  (`service.max_concurrent_jobs`) generate them
+- Every job carries its own run metrics, so stage progress can be polled
+  while it runs
+
+API (JSON unless noted):
+    POST /jobs                  {"topic": "...", "id": "optional-id"} -> 202 job
+    GET  /jobs                  All known jobs (newest first)
+    GET  /jobs/<id>             Status and per-stage progress
+    GET  /jobs/<id>/result      Finished post (?format=markdown for the raw text)
+    GET  /health                Liveness, workers and queue depth
+    GET  /metrics               Prometheus text format (?format=json for JSON)
+
+Usage:
+    python generation_service.py
+    python generation_service.py --port 8080 --workers 4
+    python generation_service.py --mock          # Local Groq/Serper stand-ins, no API keys needed
+
+    curl -X POST localhost:8080/jobs -d '{"topic": "How to prevent bartholin cyst"}'
+    curl localhost:8080/jobs/<id>
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import argparse
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from instrumentation import RunMetrics
+
+# Caller-chosen job ids end up in URLs and file names
+JOB_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+
+# ============================================================================
+# JOBS
+# ============================================================================
+class GenerationJob:
+    """One submitted topic and everything known about its generation."""
+
+    def __init__(self, job_id: str, topic: str):
+        """
+        Args:
+            job_id: Unique job id (used in the URLs)
+            topic: Blog topic to generate
+        """
+        self.id = job_id
+        self.topic = topic
+        self.status = 'queued'
+        self.submitted_at = datetime.now().isoformat(timespec='seconds')
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self.metrics = RunMetrics(topic)
+        self.content: Optional[str] = None
+        self.output_path: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def stage_progress(self) -> Dict[str, Dict[str, Any]]:
+        """Status and wall time of every stage started so far."""
+        return {name: {'status': record.get('status'), 'wall_seconds': record.get('wall_seconds')}
+                for name, record in self.metrics.stage_records().items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Job status for the API (the post itself is served by /result)."""
+        return {
+            'id': self.id,
+            'topic': self.topic,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration_seconds': self.duration_seconds,
+            'stages': self.stage_progress(),
+            'output_path': self.output_path,
+            'word_count': len(self.content.split()) if self.content else None,
+            'error': self.error,
+        }
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while `service.max_queued_jobs` are waiting."""
+
+
+class DuplicateJobError(ValueError):
+    """Raised when a submitted job id is already in use."""
+
+
+# ============================================================================
+# SERVICE
+# ============================================================================
+class GenerationService:
+    """
+    Job queue and worker threads around one shared generator.
+
+    Like BatchRunner, every job uses the same CompetitiveBlogFixed
+    instance; it holds no per-topic state, so jobs only share its warm
+    clients, caches and the process-wide rate limiters.
+    """
+
+    def __init__(self, generator, max_concurrent_jobs: int = 2, max_queued_jobs: int = 100,
+                 keep_finished_jobs: int = 200, save_posts: bool = True):
+        """
+        Args:
+            generator: Shared CompetitiveBlogFixed instance
+            max_concurrent_jobs: Blogs generated at the same time
+            max_queued_jobs: Submissions beyond this many waiting jobs are refused
+            keep_finished_jobs: Finished jobs kept for status/result requests
+            save_posts: Also save every finished post with save_blog_post()
+        """
+        self.generator = generator
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.max_queued_jobs = max_queued_jobs
+        self.keep_finished_jobs = keep_finished_jobs
+        self.save_posts = save_posts
+        self.started_at = time.time()
+
+        self._refinement_totals: List[Dict[str, Any]] = []  # Running total over finished jobs (kept after a job is forgotten)
+        self._jobs: Dict[str, GenerationJob] = {}
+        self._queue: "queue.Queue[Optional[GenerationJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._worker, name=f"generation-worker-{i + 1}", daemon=True)
+                         for i in range(self.max_concurrent_jobs)]
+        for worker in self._workers:
+            worker.start()
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+    def submit(self, topic: str, job_id: Optional[str] = None) -> GenerationJob:
+        """
+        Queue a topic for generation.
+
+        Raises:
+            ValueError: Missing topic, or a job id that is not a string of
+                letters, digits, '_' and '-'
+            DuplicateJobError: The job id is already in use
+            QueueFullError: `max_queued_jobs` jobs are already waiting
+        """
+        if not isinstance(topic, str) or not topic.strip():
+            raise ValueError('"topic" is required and must be a string')
+        topic = topic.strip()
+        if job_id is not None and not (isinstance(job_id, str) and JOB_ID_PATTERN.fullmatch(job_id)):
+            raise ValueError('"id" may only contain letters, digits, "_" and "-"')
+        with self._lock:
+            if self._queue.qsize() >= self.max_queued_jobs:
+                raise QueueFullError(f"{self.max_queued_jobs} jobs are already queued")
+            job_id = job_id or uuid.uuid4().hex[:12]
+            if job_id in self._jobs:
+                raise DuplicateJobError(f'Job id "{job_id}" already exists')
+            job = self._jobs[job_id] = GenerationJob(job_id, topic)
+            self._queue.put(job)
+        print(f"📥 Job {job.id} queued: {topic}")
+        return job
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        """A job by id (None if unknown or already forgotten)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[GenerationJob]:
+        """All known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _worker(self):
+        """Take jobs off the queue until shutdown() sends None."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run_job(job)
+
+    def _run_job(self, job: GenerationJob):
+        """Generate one post, capturing failures on the job."""
+        job.status = 'running'
+        job.started_at = datetime.now().isoformat(timespec='seconds')
+        started = time.perf_counter()
+        print(f"🚀 Job {job.id} started: {job.topic}")
+        try:
+            content = self.generator.generate_competitive_blog(job.topic, run_metrics=job.metrics)
+            if content:
+                job.content = content
+                if self.save_posts:
+                    job.output_path = self.generator.save_blog_post(content, job.topic)
+                job.status = 'succeeded'
+            else:
+                job.error = 'Generation returned no content'
+                job.status = 'failed'
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = 'failed'
+        job.duration_seconds = round(time.perf_counter() - started, 2)
+        if 'refinement' in job.metrics.extra:
+            with self._lock:
+                self._refinement_totals = [self.generator.combine_refinement_reports(
+                    self._refinement_totals + [job.metrics.extra['refinement']])]
+        job.finished_at = datetime.now().isoformat(timespec='seconds')
+        print(f"{'✅' if job.status == 'succeeded' else '❌'} Job {job.id} {job.status} "
+              f"in {job.duration_seconds}s: {job.topic}")
+        self._forget_old_jobs()
+
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond `keep_finished_jobs`."""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.status in ('succeeded', 'failed')]
+            for job_id in finished[:max(0, len(finished) - self.keep_finished_jobs)]:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers once the jobs already queued are done."""
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def health(self) -> Dict[str, Any]:
+        """Liveness details for /health."""
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'workers': self.max_concurrent_jobs,
+            'workers_alive': sum(1 for worker in self._workers if worker.is_alive()),
+            'queued': self._queue.qsize(),
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """Job counts, durations and the shared generator's counters."""
+        jobs = self.jobs()
+        by_status = {status: 0 for status in ('queued', 'running', 'succeeded', 'failed')}
+        for job in jobs:
+            by_status[job.status] += 1
+        durations = [job.duration_seconds for job in jobs if job.status == 'succeeded']
+        with self._lock:
+            refinement_totals = list(self._refinement_totals)
+        metrics = {
+            'jobs': by_status,
+            'queue_depth': self._queue.qsize(),
+            'workers': self.max_concurrent_jobs,
+            'succeeded_duration_seconds': {'count': len(durations), 'sum': round(sum(durations), 2)},
+            'llm_backends': self.generator.llm_pool.stats(),
+            'refinement': self.generator.combine_refinement_reports(refinement_totals),
+        }
+        if self.generator.topic_index:
+            metrics['topic_reuse'] = self.generator.topic_index.stats()
+        return metrics
+
+    def to_prometheus(self) -> str:
+        """Render metrics() as Prometheus text-format metrics."""
+        metrics = self.metrics()
+        lines = []
+
+        def metric(name: str, help_text: str, samples: List[tuple], kind: str = 'gauge'):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        metric('generation_jobs', 'Known jobs by status',
+               [({'status': status}, count) for status, count in metrics['jobs'].items()])
+        metric('generation_queue_depth', 'Jobs waiting for a worker', [({}, metrics['queue_depth'])])
+        metric('generation_workers', 'Blogs generated at the same time', [({}, metrics['workers'])])
+        metric('generation_job_duration_seconds_sum', 'Total wall time of succeeded jobs',
+               [({}, metrics['succeeded_duration_seconds']['sum'])])
+        metric('generation_job_duration_seconds_count', 'Succeeded jobs timed',
+               [({}, metrics['succeeded_duration_seconds']['count'])])
+        metric('generation_refinement_rate', 'Share of drafts sent to the refine model',
+               [({}, metrics['refinement']['refinement_rate'])])
+        if 'topic_reuse' in metrics:
+            metric('generation_topic_reuse_hit_rate', 'Strategy/SEO lookups answered from related topics',
+                   [({}, metrics['topic_reuse']['hit_rate'])])
+        return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# HTTP API
+# ============================================================================
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """Routes API requests to the GenerationService."""
+
+    server: "GenerationHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Silence the default per-request logging (jobs log their own progress)."""
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, body: Any):
+        self._send(status, json.dumps(body, ensure_ascii=False, indent=2).encode('utf-8'), 'application/json')
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, {'error': message})
+
+    def do_POST(self):
+        route = urlsplit(self.path).path.rstrip('/')
+        if route != '/jobs':
+            self._send_error(404, f"Unknown endpoint: POST {route}")
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_error(400, "Invalid Content-Length header")
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        except json.JSONDecodeError as e:
+            self._send_error(400, f"Invalid JSON: {e}")
+            return
+        if not isinstance(payload, dict):
+            self._send_error(400, 'Expected a JSON object like {"topic": "..."}')
+            return
+
+        try:
+            job = self.server.service.submit(payload.get('topic'), payload.get('id'))
+        except QueueFullError as e:
+            self._send_error(503, str(e))
+            return
+        except DuplicateJobError as e:
+            self._send_error(409, str(e))
+            return
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+        self._send_json(202, job.to_dict())
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = url.path.rstrip('/')
+        params = parse_qs(url.query)
+        service = self.server.service
+
+        if route == '/health':
+            self._send_json(200, service.health())
+        elif route == '/metrics':
+            if params.get('format', [''])[0] == 'json':
+                self._send_json(200, service.metrics())
+            else:
+                self._send(200, service.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4')
+        elif route == '/jobs':
+            self._send_json(200, [job.to_dict() for job in service.jobs()])
+        elif route.startswith('/jobs/'):
+            parts = route.split('/')[2:]
+            job = service.get(parts[0])
+            if job is None:
+                self._send_error(404, f"Unknown job: {parts[0]}")
+            elif len(parts) == 1:
+                self._send_json(200, job.to_dict())
+            elif parts[1:] == ['result']:
+                self._send_result(job, params.get('format', [''])[0])
+            else:
+                self._send_error(404, f"Unknown endpoint: GET {route}")
+        else:
+            self._send_error(404, f"Unknown endpoint: GET {route}")
+
+    def _send_result(self, job: GenerationJob, output_format: str):
+        """The finished post, or 409 while the job is not done."""
+        if job.status in ('queued', 'running'):
+            self._send_error(409, f"Job {job.id} is {job.status}")
+        elif job.status == 'failed':
+            self._send_error(500, job.error or 'Generation failed')
+        elif output_format == 'markdown':
+            self._send(200, job.content.encode('utf-8'), 'text/markdown; charset=utf-8')
+        else:
+            self._send_json(200, {'id': job.id, 'topic': job.topic, 'output_path': job.output_path,
+                                  'content': job.content})
+
+
+class GenerationHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP front end for a GenerationService, served from a background thread.
+
+    Usage:
+        with GenerationHTTPServer(service, port=8080) as server:
+            print(server.base_url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service: GenerationService, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Args:
+            service: Job queue the API submits to
+            host: Interface to bind
+            port: Port to bind (0 = pick a free port)
+        """
+        super().__init__((host, port), _ServiceHandler)
+        self.service = service
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GenerationHTTPServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ============================================================================
+# SETUP
+# ============================================================================
+def create_service(config_path: str = "blog_config.yaml", max_concurrent_jobs: Optional[int] = None) -> GenerationService:
+    """
+    Build the shared generator and the job queue from the `service` config section.
+
+    Args:
+        config_path: Configuration file
+        max_concurrent_jobs: Override for `service.max_concurrent_jobs`
+    """
+    from competitive_blog_fixed_commented import CompetitiveBlogFixed
+
+    generator = CompetitiveBlogFixed(config_path)
+    service_config = generator.config.get('service', {})
+    return GenerationService(
+        generator,
+        max_concurrent_jobs=max_concurrent_jobs or service_config.get('max_concurrent_jobs', 2),
+        max_queued_jobs=service_config.get('max_queued_jobs', 100),
+        keep_finished_jobs=service_config.get('keep_finished_jobs', 200),
+        save_posts=service_config.get('save_posts', True)
+    )
+
+
+def mock_config_path(config_path: str, base_url: str) -> str:
+    """
+    Copy of the config pointed at a MockAPIServer (caller deletes the file).
+
+    The client-side rate limits are lifted (the mock has no quotas), but
+    unlike the benchmark the caches stay on, so repeated topics show the
+    warm-cache behaviour of a long-running service.
+    """
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    config.setdefault('llm', {})['base_url'] = base_url
+    config.setdefault('search', {})['serper_base_url'] = base_url
+    config.setdefault('rate_limiting', {})['providers'] = {
+        'groq': {'requests_per_minute': 100000, 'tokens_per_minute': 100000000},
+        'serper': {'requests_per_minute': 100000},
+    }
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+        yaml.safe_dump(config, f)
+        return f.name
+
+
+# ============================================================================
+# COMMAND LINE INTERFACE
+# ============================================================================
+def main():
+    """Start the service and serve until interrupted."""
+    parser = argparse.ArgumentParser(description="Long-running blog generation service with an HTTP API")
+    parser.add_argument('--config', default="blog_config.yaml", help="Configuration file")
+    parser.add_argument('--host', default=None, help="Interface to bind (default: service.host)")
+    parser.add_argument('--port', type=int, default=None, help="Port to listen on (default: service.port)")
+    parser.add_argument('--workers', type=int, default=None, help="Concurrent jobs (default: service.max_concurrent_jobs)")
+    parser.add_argument('--mock', action='store_true', help="Serve against local Groq/Serper stand-ins (mock_servers.py)")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        service_config = (yaml.safe_load(f) or {}).get('service', {})
+    host = args.host or service_config.get('host', "127.0.0.1")
+    port = args.port if args.port is not None else service_config.get('port', 8080)
+
+    mock_server = None
+    config_path = args.config
+    if args.mock:
+        from mock_servers import MockAPIServer
+
+        # Dummy keys: the generator requires them, the mock ignores them
+        os.environ.setdefault('GROQ_API_KEY', 'mock-groq-key')
+        os.environ.setdefault('SERPER_API_KEY', 'mock-serper-key')
+        mock_server = MockAPIServer().start()
+        config_path = mock_config_path(args.config, mock_server.base_url)
+        print(f"🧪 Mock Groq + Serper at {mock_server.base_url}")
+
+    try:
+        service = create_service(config_path, args.workers)
+    finally:
+        if mock_server:
+            os.unlink(config_path)
+
+    server = GenerationHTTPServer(service, host, port).start()
+    print(f"🛰️ Generation service listening on {server.base_url} ({service.max_concurrent_jobs} workers)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down: finishing queued jobs...")
+    finally:
+        server.stop()
+        service.shutdown()
+        if mock_server:
+            mock_server.stop()
+
+
+if __name__ == "__main__":
+    main()
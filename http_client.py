@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Client for Serper
+
+A module-level `requests.post` opens a fresh TCP + TLS connection for
+every search and rebuilds the headers each time. This client keeps a pool
+of keep-alive connections instead:
+- HTTP/2 via httpx when `httpx` and `h2` are installed (pip install "httpx[http2]")
+- Otherwise a requests.Session with a sized urllib3 connection pool
+- Headers (API key, content type) built once
+- Connection reuse metrics (requests sent vs. connections opened)
+
+Clients are shared per endpoint and API key, so every generator in a
+batch reuses the same warm connections. AsyncSerperHttpClient is the
+httpx.AsyncClient equivalent used by the asyncio generator.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Optional: httpx (async client) and HTTP/2 support (falls back to requests when not installed)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = httpx is not None
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# ============================================================================
+# POOLED CLIENT
+# ============================================================================
+class SerperHttpClient:
+    """
+    Keep-alive connection pool for one Serper endpoint and API key.
+
+    Thread-safe: both requests.Session (with a pooled adapter) and
+    httpx.Client may be shared by the research thread pool.
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://google.serper.dev",
+                 pool_size: int = 20, timeout: float = 10, http2: bool = True):
+        """
+        Args:
+            api_key: Serper API key (sent on every request)
+            base_url: Serper endpoint root
+            pool_size: Maximum open connections kept in the pool
+            timeout: Request timeout in seconds
+            http2: Use HTTP/2 when httpx[http2] is installed
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        headers = {'X-API-KEY': api_key, 'Content-Type': 'application/json'}
+
+        self._lock = threading.Lock()
+        self._requests_sent = 0
+        self._streams_seen = set()
+        self._negotiated_protocol = 'HTTP/1.1'
+
+        self.uses_http2 = bool(http2 and HTTP2_AVAILABLE)
+        if self.uses_http2:
+            self._client = httpx.Client(
+                http2=True,
+                headers=headers,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=self.pool_size,
+                                    max_keepalive_connections=self.pool_size)
+            )
+        else:
+            self._session = requests.Session()
+            self._session.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+            self._adapter = adapter
+
+    def post(self, endpoint: str, payload: Dict[str, Any]):
+        """
+        POST a JSON payload to `<base_url>/<endpoint>` over a pooled connection.
+
+        Returns:
+            The response object (requests.Response or httpx.Response; both
+            provide status_code, headers, content, json() and raise_for_status())
+        """
+        url = f"{self.base_url}/{endpoint}"
+        if self.uses_http2:
+            response = self._client.post(url, json=payload)
+            # Each distinct network stream is one underlying connection
+            stream = response.extensions.get('network_stream')
+            with self._lock:
+                self._requests_sent += 1
+                self._negotiated_protocol = response.http_version  # HTTP/2 needs TLS (ALPN)
+                if stream is not None:
+                    self._streams_seen.add(id(stream))
+            return response
+
+        response = self._session.post(url, json=payload, timeout=self.timeout)
+        with self._lock:
+            self._requests_sent += 1
+        return response
+
+    def _connections_opened(self) -> int:
+        """Connections created so far."""
+        if self.uses_http2:
+            with self._lock:
+                return len(self._streams_seen)
+        # urllib3 counts new connections per host pool
+        pools = self._adapter.poolmanager.pools
+        return sum(getattr(pools[key], 'num_connections', 0) for key in list(pools.keys()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection reuse metrics for this client."""
+        with self._lock:
+            sent = self._requests_sent
+        opened = self._connections_opened()
+        return {
+            'client': 'httpx' if self.uses_http2 else 'requests',
+            'protocol': self._negotiated_protocol,
+            'pool_size': self.pool_size,
+            'requests': sent,
+            'connections_opened': opened,
+            'reuse_ratio': round(1 - opened / sent, 3) if sent else 0.0,
+        }
+
+    def close(self):
+        """Close every pooled connection."""
+        if self.uses_http2:
+            self._client.close()
+        else:
+            self._session.close()
+
+
+# ============================================================================
+# ASYNC CLIENT
+# ============================================================================
+class AsyncSerperHttpClient:
+    """
+    httpx.AsyncClient connection pool for one Serper endpoint and API key.
+
+    Bound to the event loop it is first used on; create one per loop and
+    close it with `await client.aclose()`. Requires httpx.
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://google.serper.dev",
+                 pool_size: int = 20, timeout: float = 10, http2: bool = True):
+        """
+        Args:
+            api_key: Serper API key (sent on every request)
+            base_url: Serper endpoint root
+            pool_size: Maximum open connections kept in the pool
+            timeout: Request timeout in seconds
+            http2: Use HTTP/2 when h2 is installed
+        """
+        if httpx is None:
+            raise ImportError("AsyncSerperHttpClient requires httpx (pip install httpx)")
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = max(1, pool_size)
+        self.uses_http2 = bool(http2 and HTTP2_AVAILABLE)
+        self._requests_sent = 0
+        self._streams_seen = set()
+        self._negotiated_protocol = 'HTTP/1.1'
+        self._client = httpx.AsyncClient(
+            http2=self.uses_http2,
+            headers={'X-API-KEY': api_key, 'Content-Type': 'application/json'},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=self.pool_size,
+                                max_keepalive_connections=self.pool_size)
+        )
+
+    async def post(self, endpoint: str, payload: Dict[str, Any]):
+        """POST a JSON payload to `<base_url>/<endpoint>`; returns the httpx.Response."""
+        response = await self._client.post(f"{self.base_url}/{endpoint}", json=payload)
+        # Single event loop thread: no lock needed for the counters
+        self._requests_sent += 1
+        self._negotiated_protocol = response.http_version
+        stream = response.extensions.get('network_stream')
+        if stream is not None:
+            self._streams_seen.add(id(stream))
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection reuse metrics (same keys as SerperHttpClient.stats)."""
+        sent = self._requests_sent
+        opened = len(self._streams_seen)
+        return {
+            'client': 'httpx-async',
+            'protocol': self._negotiated_protocol,
+            'pool_size': self.pool_size,
+            'requests': sent,
+            'connections_opened': opened,
+            'reuse_ratio': round(1 - opened / sent, 3) if sent else 0.0,
+        }
+
+    async def aclose(self):
+        """Close every pooled connection."""
+        await self._client.aclose()
+
+
+# ============================================================================
+# SHARED CLIENT REGISTRY
+# ============================================================================
+_clients: Dict[Tuple[str, str], SerperHttpClient] = {}
+_registry_lock = threading.Lock()
+_fallback_reported = False
+
+
+def _report_fallback(http2: bool):
+    """Say once per process which client is used when the configured one is not installed."""
+    global _fallback_reported
+    if _fallback_reported or (httpx is not None and (HTTP2_AVAILABLE or not http2)):
+        return
+    _fallback_reported = True
+    if httpx is None:
+        print("⚠️ httpx is not installed: Serper requests use requests (HTTP/1.1 keep-alive) and the "
+              "async generator runs them in worker threads (pip install \"httpx[http2]\")")
+    else:
+        print("⚠️ h2 is not installed: Serper requests use requests (HTTP/1.1 keep-alive) "
+              "instead of HTTP/2 (pip install \"httpx[http2]\")")
+
+
+def get_serper_client(api_key: str, base_url: str, http_config: Optional[Dict[str, Any]] = None) -> SerperHttpClient:
+    """
+    Return a pooled Serper client configured from the `http` config section.
+
+    With `http.share_client` (the default) one client per endpoint and key
+    is shared by every generator in the process.
+    """
+    http_config = http_config or {}
+    _report_fallback(http_config.get('http2', True))
+
+    def build():
+        return SerperHttpClient(
+            api_key, base_url,
+            pool_size=http_config.get('pool_size', 20),
+            timeout=http_config.get('timeout_seconds', 10),
+            http2=http_config.get('http2', True)
+        )
+
+    if not http_config.get('share_client', True):
+        return build()
+
+    key = (base_url.rstrip('/'), api_key)
+    with _registry_lock:
+        if key not in _clients:
+            _clients[key] = build()
+        return _clients[key]
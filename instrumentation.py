@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Run Instrumentation and Reports
+
+Records where a blog generation spends its time and budget:
+- Wall time and status of every pipeline stage
+- Every LLM call: wall time, retries, retry/rate-limit waits, prompt/completion tokens
+- Every search: wall time, bytes transferred, cache hits, retries, retry/rate-limit waits
+
+The active run and stage are tracked with context variables, so calls made
+from scheduler and research threads are attributed to the right run even
+when a batch generates several blogs at once. Results are written as a
+JSON run report and, optionally, as Prometheus text-format metrics.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+# The run and stage that calls on this thread/task belong to
+_current_run: contextvars.ContextVar = contextvars.ContextVar('current_run', default=None)
+_current_stage: contextvars.ContextVar = contextvars.ContextVar('current_stage', default='unassigned')
+
+
+# ============================================================================
+# RUN METRICS
+# ============================================================================
+class RunMetrics:
+    """
+    Thread-safe collector for one blog generation.
+    """
+
+    def __init__(self, topic: str):
+        """
+        Args:
+            topic: Blog topic (included in the report)
+        """
+        self.topic = topic
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._started = time.perf_counter()
+        self.wall_seconds: Optional[float] = None
+        self.status = 'running'
+
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.searches: List[Dict[str, Any]] = []
+        self.extra: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage; calls made inside it are attributed to it."""
+        record = {'status': 'running', 'wall_seconds': None}
+        with self._lock:
+            self.stages[name] = record
+        token = _current_stage.set(name)
+        started = time.perf_counter()
+        try:
+            yield record
+            if record['status'] == 'running':
+                record['status'] = 'completed'
+        except Exception:
+            record['status'] = 'failed'
+            raise
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - started, 3)
+            _current_stage.reset(token)
+
+    def record_llm_call(self, **fields):
+        """Add one LLM call record (stage is filled in from context)."""
+        fields.setdefault('stage', _current_stage.get())
+        with self._lock:
+            self.llm_calls.append(fields)
+
+    def record_search(self, **fields):
+        """Add one search request record (stage is filled in from context)."""
+        fields.setdefault('stage', _current_stage.get())
+        with self._lock:
+            self.searches.append(fields)
+
+    def finish(self, status: str):
+        """Mark the run as finished ('succeeded' or 'failed')."""
+        self.status = status
+        self.wall_seconds = round(time.perf_counter() - self._started, 3)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def stage_records(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of every stage record started so far (safe to read while stages run)."""
+        with self._lock:
+            return {name: dict(record) for name, record in self.stages.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-stage and overall totals."""
+        with self._lock:
+            llm_calls = list(self.llm_calls)
+            searches = list(self.searches)
+            stages = {name: dict(record) for name, record in self.stages.items()}
+
+        for name, record in stages.items():
+            stage_llm = [call for call in llm_calls if call['stage'] == name]
+            stage_search = [search for search in searches if search['stage'] == name]
+            record.update({
+                'llm_calls': len(stage_llm),
+                'llm_retries': sum(call.get('retries', 0) for call in stage_llm),
+                'prompt_tokens': sum(call.get('prompt_tokens', 0) for call in stage_llm),
+                'completion_tokens': sum(call.get('completion_tokens', 0) for call in stage_llm),
+                'searches': len(stage_search),
+                'search_retries': sum(search.get('retries', 0) for search in stage_search),
+                'search_bytes': sum(search.get('bytes', 0) for search in stage_search),
+                'rate_limit_wait_seconds': round(
+                    sum(item.get('rate_limit_wait_seconds', 0) for item in stage_llm + stage_search), 3),
+                'retry_wait_seconds': round(
+                    sum(item.get('retry_wait_seconds', 0) for item in stage_llm + stage_search), 3),
+            })
+
+        totals = {
+            'llm_calls': len(llm_calls),
+            'llm_cache_hits': sum(1 for call in llm_calls if call.get('cached')),
+            'llm_retries': sum(call.get('retries', 0) for call in llm_calls),
+            'prompt_tokens': sum(call.get('prompt_tokens', 0) for call in llm_calls),
+            'completion_tokens': sum(call.get('completion_tokens', 0) for call in llm_calls),
+            'searches': len(searches),
+            'search_cache_hits': sum(1 for search in searches if search.get('cached')),
+            'search_retries': sum(search.get('retries', 0) for search in searches),
+            'search_bytes': sum(search.get('bytes', 0) for search in searches),
+            'llm_rate_limit_wait_seconds': round(sum(c.get('rate_limit_wait_seconds', 0) for c in llm_calls), 3),
+            'search_rate_limit_wait_seconds': round(sum(s.get('rate_limit_wait_seconds', 0) for s in searches), 3),
+            'llm_retry_wait_seconds': round(sum(c.get('retry_wait_seconds', 0) for c in llm_calls), 3),
+            'search_retry_wait_seconds': round(sum(s.get('retry_wait_seconds', 0) for s in searches), 3),
+        }
+        return {'stages': stages, 'totals': totals}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full structured report."""
+        summary = self.summary()
+        with self._lock:
+            return {
+                'topic': self.topic,
+                'started_at': self.started_at,
+                'status': self.status,
+                'wall_seconds': self.wall_seconds,
+                'stages': summary['stages'],
+                'totals': summary['totals'],
+                'llm_calls': list(self.llm_calls),
+                'searches': list(self.searches),
+                **self.extra,
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the run as Prometheus text-format metrics."""
+        summary = self.summary()
+        lines = []
+
+        def metric(name: str, help_text: str, samples: List[tuple]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        stages = summary['stages']
+        metric('blog_run_duration_seconds', 'Wall time of the whole generation',
+               [({}, self.wall_seconds or 0)])
+        metric('blog_stage_duration_seconds', 'Wall time per pipeline stage',
+               [({'stage': name}, record['wall_seconds'] or 0) for name, record in stages.items()])
+        metric('blog_llm_calls_total', 'LLM calls per stage',
+               [({'stage': name}, record['llm_calls']) for name, record in stages.items()])
+        metric('blog_llm_retries_total', 'LLM retries per stage',
+               [({'stage': name}, record['llm_retries']) for name, record in stages.items()])
+        metric('blog_llm_prompt_tokens_total', 'Prompt tokens per stage',
+               [({'stage': name}, record['prompt_tokens']) for name, record in stages.items()])
+        metric('blog_llm_completion_tokens_total', 'Completion tokens per stage',
+               [({'stage': name}, record['completion_tokens']) for name, record in stages.items()])
+        metric('blog_search_requests_total', 'Search requests per stage',
+               [({'stage': name}, record['searches']) for name, record in stages.items()])
+        metric('blog_search_retries_total', 'Search retries per stage',
+               [({'stage': name}, record['search_retries']) for name, record in stages.items()])
+        metric('blog_search_bytes_total', 'Search response bytes per stage',
+               [({'stage': name}, record['search_bytes']) for name, record in stages.items()])
+        metric('blog_rate_limit_wait_seconds_total', 'Time spent waiting for rate-limit budget',
+               [({'provider': 'llm'}, summary['totals']['llm_rate_limit_wait_seconds']),
+                ({'provider': 'search'}, summary['totals']['search_rate_limit_wait_seconds'])])
+        metric('blog_retry_wait_seconds_total', 'Time spent backing off before retries',
+               [({'provider': 'llm'}, summary['totals']['llm_retry_wait_seconds']),
+                ({'provider': 'search'}, summary['totals']['search_retry_wait_seconds'])])
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, report_dir: str, prometheus: bool = False) -> str:
+        """
+        Write the JSON report (and optionally a .prom file) to report_dir.
+
+        Returns:
+            Path to the JSON report
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_topic = "".join(c if c.isalnum() or c in (' ', '-', '_') else '' for c in self.topic).replace(' ', '_')
+        base_path = os.path.join(report_dir, f"{timestamp}_{safe_topic}")
+
+        report_path = f"{base_path}_run_report.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        if prometheus:
+            with open(f"{base_path}_metrics.prom", 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+        return report_path
+
+
+# ============================================================================
+# CONTEXT HELPERS
+# ============================================================================
+@contextmanager
+def track_run(metrics: RunMetrics):
+    """Make `metrics` the active run for everything called inside the block."""
+    token = _current_run.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_run.reset(token)
+
+
+def current_run() -> Optional[RunMetrics]:
+    """The run being generated on this thread/task, if any."""
+    return _current_run.get()
+
+
+def current_stage() -> str:
+    """The pipeline stage running on this thread/task."""
+    return _current_stage.get()
+
+
+@contextmanager
+def stage_scope(name: str):
+    """Time a stage on the active run (does nothing outside a tracked run)."""
+    metrics = current_run()
+    if metrics is None:
+        yield {}
+        return
+    with metrics.stage(name) as record:
+        yield record
+
+
+def annotate_stage(**fields):
+    """Attach extra fields (e.g. resumed=True) to the active stage record."""
+    metrics = current_run()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.stages.setdefault(current_stage(), {}).update(fields)
+
+
+def record_llm_call(**fields):
+    """Record an LLM call on the active run (no-op outside a tracked run)."""
+    metrics = current_run()
+    if metrics is not None:
+        metrics.record_llm_call(**fields)
+
+
+def record_search(**fields):
+    """Record a search request on the active run (no-op outside a tracked run)."""
+    metrics = current_run()
+    if metrics is not None:
+        metrics.record_search(**fields)
+
+
+def in_current_context(func: Callable) -> Callable:
+    """
+    Bind func to a copy of the caller's context.
+
+    Thread pools do not inherit context variables, so work submitted to an
+    executor is wrapped with this to keep its run/stage attribution.
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
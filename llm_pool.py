@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+LLM Backend Pool
+
+One API key and one model cap throughput at that key's quota. The pool
+holds several backends (API key + model pairs), each with its own
+token-bucket limiter, and for every call:
+- Picks the least-loaded healthy backend serving the requested model
+  (calls in flight plus how much of its quota is used)
+- Fails over to the next backend on 429s, 5xx errors, timeouts and
+  rejected keys, putting the failing backend in a cooldown
+- Routes pipeline stages to specific models (`llm.stage_models`), so a
+  small fast model can produce the strategy/SEO JSON while a large model
+  writes the post
+
+Without `llm.backends` the pool has a single backend built from
+`llm.model` and GROQ_API_KEY, which is the original behaviour.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rate_limiter import RateLimiter, get_rate_limiter, estimate_tokens
+from retry_policy import classify_error
+
+
+# Failures that make another backend worth trying right away
+FAILOVER_REASONS = {'rate_limit', 'connection'}
+AUTH_STATUS = {401, 403}
+
+
+# ============================================================================
+# BACKEND
+# ============================================================================
+class LLMBackend:
+    """One API key + model combination with its own quota and health."""
+
+    def __init__(self, name: str, model: str, llm: Any, limiter: RateLimiter):
+        """
+        Args:
+            name: Backend label (used in logs and run reports)
+            model: Model served by this backend
+            llm: Chat model instance (e.g. ChatGroq)
+            limiter: Requests/tokens budget of this key + model
+        """
+        self.name = name
+        self.model = model
+        self.llm = llm
+        self.limiter = limiter
+
+        self.in_flight = 0
+        self.unhealthy_until = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.cooldowns = 0
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        """False while the backend is cooling down after a failure."""
+        return (now or time.monotonic()) >= self.unhealthy_until
+
+    def load(self) -> float:
+        """Routing score: calls in flight plus quota utilization (0-1)."""
+        return self.in_flight + self.limiter.utilization()
+
+    def stats(self) -> Dict[str, Any]:
+        """Usage counters for reports."""
+        remaining = self.unhealthy_until - time.monotonic()
+        return {
+            'model': self.model,
+            'calls': self.calls,
+            'failures': self.failures,
+            'cooldowns': self.cooldowns,
+            'in_flight': self.in_flight,
+            'utilization': round(self.limiter.utilization(), 3),
+            'cooldown_seconds': (None if math.isinf(remaining) else round(remaining, 1)) if remaining > 0 else 0.0,
+        }
+
+
+# ============================================================================
+# STAGE ROUTING
+# ============================================================================
+def stage_models_from_config(llm_config: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Pipeline stage -> model from the `llm` config section.
+
+    `draft_model` routes the Writer ('write') and `refine_model` the
+    Editor ('polish'); explicit `stage_models` entries take precedence.
+    """
+    stage_models = {}
+    if llm_config.get('draft_model'):
+        stage_models['write'] = llm_config['draft_model']
+    if llm_config.get('refine_model'):
+        stage_models['polish'] = llm_config['refine_model']
+    stage_models.update(llm_config.get('stage_models') or {})
+    return stage_models
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+class LLMBackendPool:
+    """
+    Least-loaded routing with failover across LLM backends.
+
+    Thread-safe; the same pool also works from an asyncio event loop.
+    """
+
+    def __init__(self, backends: List[LLMBackend], default_model: str,
+                 stage_models: Optional[Dict[str, str]] = None, cooldown_seconds: float = 30,
+                 verbose: bool = True):
+        """
+        Args:
+            backends: Available backends (at least one)
+            default_model: Model used when neither the call nor its stage names one
+            stage_models: Pipeline stage name -> model
+            cooldown_seconds: How long a failing backend is skipped (unless
+                the provider's Retry-After says otherwise)
+            verbose: Print failover messages
+        """
+        if not backends:
+            raise ValueError("LLM backend pool needs at least one backend")
+        self.backends = backends
+        self.default_model = default_model
+        self.stage_models = dict(stage_models or {})
+        self.cooldown_seconds = cooldown_seconds
+        self.verbose = verbose
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], build_llm: Callable[[str, str, Optional[str]], Any],
+                    verbose: bool = True) -> 'LLMBackendPool':
+        """
+        Build the pool from the `llm` and `rate_limiting` config sections.
+
+        Args:
+            config: Full configuration
+            build_llm: Factory (model, api_key, base_url) -> chat model
+            verbose: Print skipped backends and failovers
+
+        Raises:
+            ValueError: If no backend has an API key
+        """
+        llm_config = config['llm']
+        rate_config = config.get('rate_limiting', {})
+        default_model = llm_config['model']
+        stage_models = stage_models_from_config(llm_config)
+        backend_configs = llm_config.get('backends') or [
+            {'name': 'default', 'api_key_env': 'GROQ_API_KEY', 'model': default_model}
+        ] + [
+            # Other routed models use the same key (Groq quotas are per model)
+            {'name': model, 'api_key_env': 'GROQ_API_KEY', 'model': model}
+            for model in dict.fromkeys(stage_models.values()) if model != default_model
+        ]
+
+        backends = []
+        for index, backend_config in enumerate(backend_configs):
+            name = backend_config.get('name') or f"backend{index + 1}"
+            key_env = backend_config.get('api_key_env', 'GROQ_API_KEY')
+            api_key = os.getenv(key_env)
+            if not api_key:
+                if verbose:
+                    print(f"⚠️ LLM backend '{name}' skipped: {key_env} not set")
+                continue
+            model = backend_config.get('model', default_model)
+
+            # Quota per backend; without explicit limits, each uses the groq provider limits
+            limits = {key: backend_config[key] for key in ('requests_per_minute', 'tokens_per_minute')
+                      if key in backend_config}
+            if limits:
+                limiter = get_rate_limiter(f"groq:{name}", rate_config, limits=limits)
+            elif index == 0 and not llm_config.get('backends'):
+                limiter = get_rate_limiter('groq', rate_config)
+            else:
+                limiter = get_rate_limiter(f"groq:{name}", rate_config,
+                                           limits=(rate_config.get('providers') or {}).get('groq'))
+            llm = build_llm(model, api_key, backend_config.get('base_url'))
+            backends.append(LLMBackend(name, model, llm, limiter))
+
+        if not backends:
+            raise ValueError("GROQ_API_KEY not found in environment variables")
+
+        return cls(backends, default_model,
+                   stage_models=stage_models,
+                   cooldown_seconds=llm_config.get('backend_cooldown_seconds', 30),
+                   verbose=verbose)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+    def resolve_model(self, stage: Optional[str] = None, model: Optional[str] = None) -> str:
+        """
+        Model for a call: explicit model, then the stage's model, then the default.
+
+        Variant stages ('write_angle1') use the model of their base stage ('write').
+        """
+        stage = stage or ''
+        return model or self.stage_models.get(stage) or self.stage_models.get(stage.split('_')[0]) or self.default_model
+
+    def candidates(self, model: str) -> List[LLMBackend]:
+        """
+        Healthy backends serving `model`, least loaded first.
+
+        If all of them are cooling down, only the one available soonest is
+        returned (the retry policy then waits before trying it). If no
+        backend serves the model, every backend is considered.
+        """
+        with self._lock:
+            serving = [backend for backend in self.backends if backend.model == model] or list(self.backends)
+            now = time.monotonic()
+            healthy = sorted((b for b in serving if b.is_healthy(now)), key=lambda b: b.load())
+            if healthy:
+                return healthy
+            return [min(serving, key=lambda b: b.unhealthy_until)]
+
+    def primary(self) -> LLMBackend:
+        """The first backend serving the default model."""
+        return self.candidates(self.default_model)[0]
+
+    @contextmanager
+    def lease(self, backend: LLMBackend):
+        """Count a call as in flight on a backend while it runs."""
+        with self._lock:
+            backend.in_flight += 1
+            backend.calls += 1
+        try:
+            yield backend
+        finally:
+            with self._lock:
+                backend.in_flight -= 1
+
+    def mark_failure(self, backend: LLMBackend, error: Exception) -> bool:
+        """
+        Record a failed call and cool the backend down if appropriate.
+
+        Returns:
+            True if another backend should be tried immediately
+        """
+        decision = classify_error(error)
+        with self._lock:
+            backend.failures += 1
+            if decision.status in AUTH_STATUS:
+                backend.unhealthy_until = math.inf  # Rejected key: never route here again
+            elif decision.reason in FAILOVER_REASONS or (decision.status or 0) >= 500:
+                cooldown = decision.retry_after if decision.retry_after is not None else self.cooldown_seconds
+                backend.unhealthy_until = time.monotonic() + cooldown
+            else:
+                return False
+            backend.cooldowns += 1
+        if self.verbose and len(self.backends) > 1:
+            print(f"🔀 LLM backend '{backend.name}' failed ({decision.reason}); trying another backend")
+        return True
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+    def invoke(self, prompt: str, model: str, call_stats: Dict[str, Any]) -> Tuple[Any, LLMBackend]:
+        """
+        One attempt across the pool: try backends in order until one answers.
+
+        Args:
+            prompt: The prompt
+            model: Model to route to
+            call_stats: Per-call telemetry (rate-limit waits, backend, failovers)
+
+        Returns:
+            (response, backend that produced it)
+
+        Raises:
+            The last backend's error when no backend could answer
+        """
+        last_error = None
+        candidates = self.candidates(model)
+        for backend in candidates:
+            call_stats['rate_limit_wait_seconds'] += backend.limiter.acquire(estimate_tokens(prompt))
+            call_stats.update(backend=backend.name, model=backend.model)
+            try:
+                with self.lease(backend):
+                    return backend.llm.invoke(prompt), backend
+            except Exception as e:
+                last_error = e
+                if not self.mark_failure(backend, e):
+                    raise
+                if backend is not candidates[-1]:
+                    call_stats['failovers'] = call_stats.get('failovers', 0) + 1
+        raise last_error
+
+    async def ainvoke(self, prompt: str, model: str, call_stats: Dict[str, Any]) -> Tuple[Any, LLMBackend]:
+        """Async version of invoke()."""
+        last_error = None
+        candidates = self.candidates(model)
+        for backend in candidates:
+            call_stats['rate_limit_wait_seconds'] += await backend.limiter.acquire_async(estimate_tokens(prompt))
+            call_stats.update(backend=backend.name, model=backend.model)
+            try:
+                with self.lease(backend):
+                    return await backend.llm.ainvoke(prompt), backend
+            except Exception as e:
+                last_error = e
+                if not self.mark_failure(backend, e):
+                    raise
+                if backend is not candidates[-1]:
+                    call_stats['failovers'] = call_stats.get('failovers', 0) + 1
+        raise last_error
+
+    def stream(self, prompt: str, model: str, call_stats: Dict[str, Any],
+               on_start: Callable[[LLMBackend], None], on_chunk: Callable[[Any], None]) -> LLMBackend:
+        """
+        One streaming attempt across the pool, with the same failover as invoke().
+
+        Args:
+            prompt: The prompt
+            model: Model to route to
+            call_stats: Per-call telemetry (rate-limit waits, backend, failovers)
+            on_start: Called with each backend before its stream begins, so
+                chunks from a backend that failed part-way can be discarded
+            on_chunk: Called with every streamed chunk
+
+        Returns:
+            The backend whose stream completed
+
+        Raises:
+            The last backend's error when no backend could answer
+        """
+        last_error = None
+        candidates = self.candidates(model)
+        for backend in candidates:
+            call_stats['rate_limit_wait_seconds'] += backend.limiter.acquire(estimate_tokens(prompt))
+            call_stats.update(backend=backend.name, model=backend.model)
+            try:
+                with self.lease(backend):
+                    on_start(backend)
+                    for chunk in backend.llm.stream(prompt):
+                        on_chunk(chunk)
+                return backend
+            except Exception as e:
+                last_error = e
+                if not self.mark_failure(backend, e):
+                    raise
+                if backend is not candidates[-1]:
+                    call_stats['failovers'] = call_stats.get('failovers', 0) + 1
+        raise last_error
+
+    async def astream(self, prompt: str, model: str, call_stats: Dict[str, Any],
+                      on_start: Callable[[LLMBackend], Awaitable[None]],
+                      on_chunk: Callable[[Any], Awaitable[None]]) -> LLMBackend:
+        """Async version of stream() (the callbacks return awaitables)."""
+        last_error = None
+        candidates = self.candidates(model)
+        for backend in candidates:
+            call_stats['rate_limit_wait_seconds'] += await backend.limiter.acquire_async(estimate_tokens(prompt))
+            call_stats.update(backend=backend.name, model=backend.model)
+            try:
+                with self.lease(backend):
+                    await on_start(backend)
+                    async for chunk in backend.llm.astream(prompt):
+                        await on_chunk(chunk)
+                return backend
+            except Exception as e:
+                last_error = e
+                if not self.mark_failure(backend, e):
+                    raise
+                if backend is not candidates[-1]:
+                    call_stats['failovers'] = call_stats.get('failovers', 0) + 1
+        raise last_error
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend counters, keyed by backend name."""
+        with self._lock:
+            return {backend.name: backend.stats() for backend in self.backends}
+
+    def describe(self) -> str:
+        """Short human-readable summary for the startup banner."""
+        if len(self.backends) == 1:
+            return self.backends[0].limiter.describe()
+        return "; ".join(f"{b.name} ({b.model}) {b.limiter.describe().split(': ', 1)[-1]}"
+                         for b in self.backends)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Local Stand-ins for the Groq and Serper APIs
+
+A small threaded HTTP server that speaks just enough of both APIs to run
+the full pipeline offline:
+- POST /openai/v1/chat/completions   (Groq, OpenAI-compatible; supports stream=true)
+- POST /search and /news             (Serper)
+
+Latency, jitter, injected 429 responses and response sizes are all
+configurable, so performance changes can be measured reproducibly on a
+laptop without API keys or network access.
+
+Point the generator at it with:
+    llm.base_url: http://127.0.0.1:<port>
+    search.serper_base_url: http://127.0.0.1:<port>
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+# ============================================================================
+# MOCK BEHAVIOUR SETTINGS
+# ============================================================================
+class MockBackendConfig:
+    """How the mock APIs behave."""
+
+    def __init__(self, llm_latency_ms: float = 500, search_latency_ms: float = 300,
+                 jitter_ms: float = 100, rate_limit_probability: float = 0.0,
+                 retry_after_seconds: float = 1, response_words: int = 600,
+                 search_results: int = 10, snippet_chars: int = 160,
+                 stream_chunk_words: int = 5, output_tokens_per_second: float = 0,
+                 model_tokens_per_second: Optional[Dict[str, float]] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            llm_latency_ms: Mean time before a chat completion starts responding
+            search_latency_ms: Mean Serper response time
+            jitter_ms: Uniform +/- jitter added to every latency
+            rate_limit_probability: Chance (0-1) of answering with HTTP 429
+            retry_after_seconds: Value of the Retry-After header on 429s
+            response_words: Words in a generated (non-JSON) completion
+            search_results: Organic/news results per search
+            snippet_chars: Length of each result snippet
+            stream_chunk_words: Words per streamed chunk
+            output_tokens_per_second: Simulated decode speed; longer answers
+                take longer (0 = answers arrive all at once)
+            model_tokens_per_second: Per-model decode speeds overriding
+                output_tokens_per_second (e.g. a fast draft model)
+            seed: Random seed for reproducible jitter and 429 injection
+        """
+        self.llm_latency_ms = llm_latency_ms
+        self.search_latency_ms = search_latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after_seconds = retry_after_seconds
+        self.response_words = response_words
+        self.search_results = search_results
+        self.snippet_chars = snippet_chars
+        self.stream_chunk_words = stream_chunk_words
+        self.output_tokens_per_second = output_tokens_per_second
+        self.model_tokens_per_second = dict(model_tokens_per_second or {})
+        self.seed = seed
+
+    def tokens_per_second(self, model: str) -> float:
+        """Decode speed for a model (0 = no decode delay)."""
+        return self.model_tokens_per_second.get(model, self.output_tokens_per_second)
+
+
+# ============================================================================
+# CANNED CONTENT
+# ============================================================================
+_WORDS = ("health research study data trend market growth practice guide expert "
+          "prevention diet routine evidence result insight strategy benefit risk "
+          "women care daily simple natural support system option plan").split()
+
+_STRATEGY_JSON = {
+    "target_audience": {"primary": "health-conscious adults", "pain_points": ["confusing advice", "lack of data"],
+                        "preferences": "practical guides"},
+    "competitive_landscape": {"gaps": ["evidence-based tips"], "opportunities": ["step-by-step routines"]},
+    "content_angles": ["Evidence-based prevention guide", "Daily habits that help", "What experts recommend"],
+    "market_opportunities": ["beginner guides", "checklists"],
+    "strategic_positioning": {"unique_value": "Research-backed and practical", "key_messages": ["small habits matter"],
+                              "tone": "supportive"},
+}
+
+_SEO_JSON = {
+    "primary_keywords": ["prevention guide", "daily habits", "expert tips"],
+    "secondary_keywords": ["how to prevent", "natural remedies", "diet tips", "risk factors", "early signs"],
+    "search_intent": "informational",
+    "content_structure": {"h1": "The Complete Prevention Guide",
+                          "h2_sections": ["Introduction", "Causes and Risk Factors", "Daily Habits",
+                                          "Diet and Nutrition", "When to See a Doctor", "Conclusion"]},
+    "meta_optimization": {"title": "Prevention Guide: Daily Habits That Work",
+                          "description": "Evidence-based prevention tips, daily habits and expert advice in one practical guide.",
+                          "focus_keyword": "prevention guide"},
+    "seo_recommendations": ["Use question headings", "Add a checklist", "Cite studies"],
+}
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    """Random sentences adding up to `words` words."""
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 16))
+        sentences.append(" ".join(rng.choice(_WORDS) for _ in range(length)).capitalize() + ".")
+        remaining -= length
+    return ' '.join(sentences)
+
+
+def _article(rng: random.Random, words: int) -> str:
+    """Markdown article with headings and roughly `words` words."""
+    sections = ["Introduction", "Key Findings", "Daily Habits", "Expert Advice", "Conclusion"]
+    per_section = max(10, words // len(sections))
+    parts = ["# The Complete Prevention Guide\n"]
+    for heading in sections:
+        parts.append(f"## {heading}\n\n{_paragraph(rng, per_section)}\n")
+    return "\n".join(parts)
+
+
+# ============================================================================
+# REQUEST HANDLER
+# ============================================================================
+class _MockHandler(BaseHTTPRequestHandler):
+    """Routes requests to the Groq or Serper stand-in."""
+
+    server: "MockAPIServer"
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        """Silence the default per-request logging."""
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b'{}'
+        return json.loads(body or b'{}')
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        encoded = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_POST(self):
+        route = self.path.split('?')[0].rstrip('/')
+        payload = self._read_json()
+        mock = self.server.mock_config
+        self.server.count(route)
+
+        # Injected provider rate limiting
+        if self.server.should_rate_limit():
+            self.server.count('429')
+            retry_after = mock.retry_after_seconds
+            self._send_json(429, {'error': {'message': 'Rate limit reached (mock)', 'type': 'rate_limit_exceeded'}},
+                            {'Retry-After': f"{retry_after:g}",
+                             'x-ratelimit-reset-requests': f"{retry_after:g}s",
+                             'x-ratelimit-reset-tokens': f"{retry_after:g}s"})
+            return
+
+        if route.endswith('/chat/completions'):
+            self.server.sleep(mock.llm_latency_ms)
+            self._chat_completion(payload)
+        elif route in ('/search', '/news'):
+            self.server.sleep(mock.search_latency_ms)
+            self._serper(route[1:], payload)
+        else:
+            self._send_json(404, {'error': f"Unknown route {route}"})
+
+    # ------------------------------------------------------------------
+    # Groq (OpenAI-compatible chat completions)
+    # ------------------------------------------------------------------
+    def _chat_completion(self, payload: Dict[str, Any]):
+        messages = payload.get('messages') or [{}]
+        prompt = str(messages[-1].get('content', ''))
+        rng = self.server.rng_for(prompt)
+
+        edited = re.search(r'starting with the heading "([^"]+)"', prompt)
+        section = re.search(r'Write ONLY section \d+: "([^"]+)" \(about (\d+) words\)', prompt)
+        if 'JSON format' in prompt:
+            data = _SEO_JSON if 'SEO' in prompt[:200] else _STRATEGY_JSON
+            content = "Here is the analysis:\n" + json.dumps(data, indent=2)
+        elif section:
+            # One section of a sectioned draft
+            content = f"## {section.group(1)}\n\n{_paragraph(rng, int(section.group(2)))}\n"
+        elif edited:
+            # Section editing: the section comes back under the same heading
+            content = f"{edited.group(1)}\n\n{_paragraph(rng, 120)}\n"
+        elif 'Reply with the meta description only' in prompt:
+            content = _paragraph(rng, 22)[:150].rsplit(' ', 1)[0] + "."
+        elif 'TRANSITION 1:' in prompt:
+            # Stitching pass: one line per requested item
+            labels = re.findall(r'^(INTRO|TRANSITION \d+):', prompt, re.MULTILINE)
+            content = "\n".join(f"{label}: {_paragraph(rng, 20 if label == 'INTRO' else 12)}" for label in labels)
+        else:
+            content = _article(rng, self.server.mock_config.response_words)
+
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+        model = payload.get('model', 'mock-model')
+        created = int(time.time())
+
+        if payload.get('stream'):
+            self._stream_completion(content, model, created, usage)
+            return
+
+        # Decode time grows with the answer's length
+        tokens_per_second = self.server.mock_config.tokens_per_second(model)
+        if tokens_per_second > 0:
+            time.sleep(completion_tokens / tokens_per_second)
+
+        self._send_json(200, {
+            'id': 'chatcmpl-mock', 'object': 'chat.completion', 'created': created, 'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                         'finish_reason': 'stop'}],
+            'usage': usage,
+        })
+
+    def _stream_completion(self, content: str, model: str, created: int, usage: Dict[str, int]):
+        """Send the completion as server-sent events, a few words per chunk."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        words = content.split(' ')
+        step = max(1, self.server.mock_config.stream_chunk_words)
+        tokens_per_second = self.server.mock_config.tokens_per_second(model)
+        for start in range(0, len(words), step):
+            text = ' '.join(words[start:start + step]) + (' ' if start + step < len(words) else '')
+            if tokens_per_second > 0:
+                time.sleep(max(1, len(text) // 4) / tokens_per_second)
+            chunk = {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                     'choices': [{'index': 0, 'delta': {'content': text}, 'finish_reason': None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        final = {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+                 'x_groq': {'usage': usage}}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    # ------------------------------------------------------------------
+    # Serper (search and news)
+    # ------------------------------------------------------------------
+    def _serper(self, endpoint: str, payload: Dict[str, Any]):
+        query = str(payload.get('q', ''))
+        mock = self.server.mock_config
+        count = min(int(payload.get('num') or mock.search_results), mock.search_results)
+        rng = self.server.rng_for(endpoint + query)
+
+        items = []
+        for i in range(count):
+            snippet = " ".join(rng.choice(_WORDS) for _ in range(mock.snippet_chars // 6))[:mock.snippet_chars]
+            slug = query.lower().replace(' ', '-')
+            item = {'title': f"{query.title()} - result {i + 1}", 'snippet': snippet,
+                    'link': f"https://site{rng.randint(1, 40)}.example.com/{slug}/{i}"}
+            if endpoint == 'news':
+                item.update({'date': f"{i + 1} days ago", 'source': f"News Source {i + 1}"})
+            items.append(item)
+
+        key = 'news' if endpoint == 'news' else 'organic'
+        self._send_json(200, {'searchParameters': payload, key: items})
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+class MockAPIServer(ThreadingHTTPServer):
+    """
+    Threaded mock server running in a background thread.
+
+    Usage:
+        with MockAPIServer(MockBackendConfig(llm_latency_ms=200)) as server:
+            print(server.base_url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, mock_config: Optional[MockBackendConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            mock_config: Latency/error/size settings
+            host: Interface to bind
+            port: Port to bind (0 = pick a free port)
+        """
+        super().__init__((host, port), _MockHandler)
+        self.mock_config = mock_config or MockBackendConfig()
+        self._rng = random.Random(self.mock_config.seed)
+        self._lock = threading.Lock()
+        self.request_counts: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str):
+        with self._lock:
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def should_rate_limit(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.mock_config.rate_limit_probability
+
+    def sleep(self, mean_ms: float):
+        """Sleep for the configured latency plus uniform jitter."""
+        with self._lock:
+            jitter = self._rng.uniform(-self.mock_config.jitter_ms, self.mock_config.jitter_ms)
+        time.sleep(max(0.0, mean_ms + jitter) / 1000.0)
+
+    def rng_for(self, text: str) -> random.Random:
+        """Deterministic generator per request content (same prompt → same answer)."""
+        return random.Random(f"{self.mock_config.seed}:{text}")
+
+    def start(self) -> "MockAPIServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # Run standalone for manual testing: python mock_servers.py
+    with MockAPIServer(port=8765) as server:
+        print(f"🧪 Mock Groq + Serper listening on {server.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
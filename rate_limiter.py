@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Shared Token-Bucket Rate Limiting
+
+Replaces fixed sleeps after every API call with budgets that only make
+callers wait when a provider's quota is actually exhausted:
+- Requests per minute (every provider)
+- Tokens per minute (LLM providers)
+
+Limiters are shared per provider across every generator in the process,
+so several generators using the same API key respect one common budget.
+Both blocking (threads) and awaitable (asyncio) acquisition are supported.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# ============================================================================
+# TOKEN BUCKET
+# ============================================================================
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` units and refills
+    continuously at `refill_per_second`.
+
+    The balance may go negative when usage is recorded after the fact
+    (e.g. completion tokens), which simply delays the next callers.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Args:
+            capacity: Maximum burst size (a full minute of budget)
+            refill_per_second: Units added back per second
+        """
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._available = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add the units earned since the last update (caller holds the lock)."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._available = min(self.capacity, self._available + elapsed * self.refill_per_second)
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """
+        Take `amount` units if available.
+
+        Returns:
+            0 if the units were taken, otherwise the seconds to wait
+            before they will be available
+        """
+        # A request larger than the whole bucket could never be satisfied
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill()
+            if self._available >= amount:
+                self._available -= amount
+                return 0.0
+            return (amount - self._available) / self.refill_per_second
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Block the current thread until `amount` units are taken.
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait_time = self.try_acquire(amount)
+            if wait_time <= 0:
+                return waited
+            time.sleep(wait_time)
+            waited += wait_time
+
+    async def acquire_async(self, amount: float = 1) -> float:
+        """
+        Await until `amount` units are taken without blocking the event loop.
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait_time = self.try_acquire(amount)
+            if wait_time <= 0:
+                return waited
+            await asyncio.sleep(wait_time)
+            waited += wait_time
+
+    def consume(self, amount: float):
+        """Record usage without waiting (the balance may go negative)."""
+        with self._lock:
+            self._refill()
+            self._available -= float(amount)
+
+    def utilization(self) -> float:
+        """Fraction of the bucket currently used (0.0 = idle, 1.0+ = exhausted)."""
+        with self._lock:
+            self._refill()
+            return 1.0 - (self._available / self.capacity)
+
+
+# ============================================================================
+# PROVIDER RATE LIMITER
+# ============================================================================
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets for one provider.
+
+    Either limit may be None, meaning that dimension is not limited.
+    """
+
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            name: Provider name used in log messages (e.g. 'groq', 'serper')
+            requests_per_minute: Allowed requests per minute, or None
+            tokens_per_minute: Allowed tokens per minute, or None
+        """
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if tokens_per_minute else None
+
+    def acquire(self, tokens: float = 0) -> float:
+        """
+        Wait (only if needed) for one request slot and `tokens` tokens.
+
+        Args:
+            tokens: Estimated tokens this request will use up front
+
+        Returns:
+            Seconds spent waiting for the budget
+        """
+        waited = 0.0
+        if self.requests:
+            waited += self.requests.acquire(1)
+        if self.tokens and tokens:
+            waited += self.tokens.acquire(tokens)
+        return waited
+
+    async def acquire_async(self, tokens: float = 0) -> float:
+        """Async version of acquire()."""
+        waited = 0.0
+        if self.requests:
+            waited += await self.requests.acquire_async(1)
+        if self.tokens and tokens:
+            waited += await self.tokens.acquire_async(tokens)
+        return waited
+
+    def record_tokens(self, tokens: float):
+        """Charge tokens that were only known after the call (e.g. the completion)."""
+        if self.tokens and tokens:
+            self.tokens.consume(tokens)
+
+    def utilization(self) -> float:
+        """Highest utilization across the configured budgets."""
+        buckets = [bucket for bucket in (self.requests, self.tokens) if bucket]
+        return max((bucket.utilization() for bucket in buckets), default=0.0)
+
+    def describe(self) -> str:
+        """Short human-readable summary of the limits."""
+        parts = []
+        if self.requests_per_minute:
+            parts.append(f"{self.requests_per_minute:g} req/min")
+        if self.tokens_per_minute:
+            parts.append(f"{self.tokens_per_minute:g} tokens/min")
+        return f"{self.name}: {', '.join(parts) if parts else 'unlimited'}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+# ============================================================================
+# SHARED LIMITER REGISTRY
+# ============================================================================
+# One limiter per provider for the whole process, so every generator
+# (and every worker in batch mode) draws from the same budget
+_limiters: Dict[str, RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, rate_config: Dict[str, Any],
+                     limits: Optional[Dict[str, Any]] = None) -> RateLimiter:
+    """
+    Return the shared limiter for a provider, creating it on first use.
+
+    Limits come from `rate_limiting.providers.<provider>` in blog_config.yaml.
+    If that block is missing, the legacy per-call delays are converted to an
+    equivalent requests-per-minute budget (60 / delay).
+
+    Args:
+        provider: Provider key, e.g. 'groq' or 'serper'
+        rate_config: The `rate_limiting` config section
+        limits: Explicit {requests_per_minute, tokens_per_minute} for this
+            key (e.g. one LLM backend), instead of the providers block
+
+    Returns:
+        RateLimiter shared by all callers for this provider
+    """
+    with _registry_lock:
+        if provider in _limiters:
+            return _limiters[provider]
+
+        provider_config = limits if limits is not None else (rate_config.get('providers') or {}).get(provider)
+        if provider_config is not None:
+            limiter = RateLimiter(
+                provider,
+                requests_per_minute=provider_config.get('requests_per_minute'),
+                tokens_per_minute=provider_config.get('tokens_per_minute')
+            )
+        else:
+            legacy_key = 'search_delay_seconds' if provider == 'serper' else 'llm_delay_seconds'
+            delay = rate_config.get(legacy_key, 0)
+            limiter = RateLimiter(provider, requests_per_minute=60.0 / delay if delay else None)
+
+        _limiters[provider] = limiter
+        return limiter
+
+
+def reset_rate_limiters():
+    """Forget all shared limiters (used when configuration is reloaded)."""
+    with _registry_lock:
+        _limiters.clear()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Research Result Index
+
+The research queries overlap ("{topic}", "{topic} trends", "future of
+{topic}"), so the same page is often returned several times. This index
+sits between the searches and the prompts:
+- Deduplicates by canonical URL (scheme, "www.", tracking parameters,
+  fragments and trailing slashes ignored)
+- Drops near-duplicate snippets (syndicated copies, mirrors) using
+  MinHash signatures over word shingles
+- Ranks the remaining sources against the topic, and later the strategy's
+  content angles, with TF-IDF cosine similarity (vectorized with NumPy)
+
+Downstream agents then see the top-k distinct sources per category
+instead of whatever happened to come back first.
+
+AdaptiveResearch decides which queries are worth sending at all: it runs
+them in waves and stops a category once its results stop bringing new
+domains and snippets, optionally under a cap on search calls per blog.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import hashlib
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+from context_budget import STOPWORDS
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = (1 << 31) - 1  # a * x stays well inside uint64
+TRACKING_PARAMS = ('utm_', 'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src')
+
+# Research categories (a page found by several queries stays in the first one)
+CATEGORIES = ('trends', 'competitors', 'data', 'news')
+
+
+# ============================================================================
+# NORMALIZATION
+# ============================================================================
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so different spellings of the same page compare equal.
+
+    Example:
+        "https://www.Example.com/a/?utm_source=x#top" -> "example.com/a"
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/')
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query)
+                             if not key.lower().startswith(TRACKING_PARAMS)))
+    return urlunsplit(('', host, path, query, '')).lstrip('/')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase content words (stopwords and single characters removed)."""
+    return [word for word in _WORD.findall((text or '').lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """Overlapping word n-grams; short texts become a single shingle."""
+    words = _WORD.findall((text or '').lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+# ============================================================================
+# NEAR-DUPLICATE DETECTION
+# ============================================================================
+class MinHasher:
+    """
+    MinHash signatures: the share of equal positions in two signatures
+    estimates the Jaccard similarity of the underlying shingle sets.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 7):
+        """
+        Args:
+            num_perm: Signature length (more = more accurate, slower)
+            seed: Seed for the hash permutations (fixed so runs are repeatable)
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: Iterable[str]) -> Optional[np.ndarray]:
+        """Signature of a shingle set, or None for an empty set."""
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') % _MERSENNE_PRIME
+             for s in shingle_set),
+            dtype=np.uint64
+        )
+        if hashes.size == 0:
+            return None
+        # Row per shingle, column per permutation: (a * x + b) mod p, then the minimum per column
+        return ((np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME).min(axis=0)
+
+
+# ============================================================================
+# RELEVANCE SCORING
+# ============================================================================
+def tfidf_scores(documents: List[str], query: str) -> np.ndarray:
+    """
+    Cosine similarity between every document and the query in TF-IDF space.
+
+    Term frequencies are log-scaled and IDF is smoothed, so a term that
+    appears in every result still counts a little.
+
+    Returns:
+        One score per document (0 when the query has no content words)
+    """
+    if not documents:
+        return np.zeros(0)
+    doc_tokens = [tokenize(doc) for doc in documents]
+    query_tokens = tokenize(query)
+    vocabulary = {term: i for i, term in enumerate(sorted({t for tokens in doc_tokens + [query_tokens]
+                                                           for t in tokens}))}
+    if not vocabulary or not query_tokens:
+        return np.zeros(len(documents))
+
+    counts = np.zeros((len(documents), len(vocabulary)))
+    for row, tokens in enumerate(doc_tokens):
+        for term in tokens:
+            counts[row, vocabulary[term]] += 1
+    query_counts = np.zeros(len(vocabulary))
+    for term in query_tokens:
+        query_counts[vocabulary[term]] += 1
+
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    matrix = np.log1p(counts) * idf
+    query_vector = np.log1p(query_counts) * idf
+
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+    return np.divide(matrix @ query_vector, norms, out=np.zeros(len(documents)), where=norms > 0)
+
+
+def rank_items(items: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """
+    Sort search results by relevance to the query (best first).
+
+    Each item's 'relevance' is its TF-IDF similarity (title + snippet),
+    plus a small bonus when several queries returned it. Ties keep the
+    original search order.
+    """
+    if not items:
+        return []
+    scores = tfidf_scores([f"{item.get('title', '')} {item.get('snippet', '')}" for item in items], query)
+    ranked = []
+    for position, (item, score) in enumerate(zip(items, scores)):
+        bonus = 0.05 * math.log(item.get('times_found', 1))
+        ranked.append((-(float(score) + bonus), position, {**item, 'relevance': round(float(score) + bonus, 4)}))
+    ranked.sort(key=lambda entry: entry[:2])
+    return [item for _, _, item in ranked]
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+class ResearchIndex:
+    """
+    Deduplicated, ranked collection of search results for one topic.
+
+    Results are added in search order; the first copy of a page wins and
+    later copies only bump its `times_found` count.
+    """
+
+    def __init__(self, topic: str, similarity: float = 0.8, num_perm: int = 64):
+        """
+        Args:
+            topic: The blog topic (the default ranking query)
+            similarity: Estimated Jaccard similarity at which two snippets
+                count as the same source
+            num_perm: MinHash signature length
+        """
+        self.topic = topic
+        self.similarity = similarity
+        self._hasher = MinHasher(num_perm)
+        self._items: Dict[str, List[Dict[str, Any]]] = {category: [] for category in CATEGORIES}
+        self._by_url: Dict[str, Dict[str, Any]] = {}
+        self._signatures: List[np.ndarray] = []
+        self._signature_items: List[Dict[str, Any]] = []
+        self.added = 0
+        self.duplicate_urls = 0
+        self.near_duplicates = 0
+
+    def add(self, category: str, item: Dict[str, Any]) -> bool:
+        """
+        Add one search result.
+
+        Returns:
+            True if it was kept, False if it duplicates an indexed source
+        """
+        self.added += 1
+        url = canonical_url(item.get('link', ''))
+        if url and url in self._by_url:
+            self._by_url[url]['times_found'] += 1
+            self.duplicate_urls += 1
+            return False
+
+        # Snippets only: syndicated copies usually carry a different title
+        signature = self._hasher.signature(shingles(item.get('snippet') or item.get('title', '')))
+        if signature is not None and self._signatures:
+            matches = (np.vstack(self._signatures) == signature).mean(axis=1)
+            best = int(matches.argmax())
+            if matches[best] >= self.similarity:
+                self._signature_items[best]['times_found'] += 1
+                self.near_duplicates += 1
+                return False
+
+        entry = {**item, 'times_found': 1}
+        self._items.setdefault(category, []).append(entry)
+        if url:
+            self._by_url[url] = entry
+        if signature is not None:
+            self._signatures.append(signature)
+            self._signature_items.append(entry)
+        return True
+
+    def add_all(self, category: str, items: Iterable[Dict[str, Any]]):
+        """Add several search results to one category."""
+        for item in items:
+            self.add(category, item)
+
+    def top(self, category: str, k: Optional[int] = None, focus: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Best k distinct sources of a category.
+
+        Args:
+            category: Research category
+            k: How many to return (None = all)
+            focus: Extra ranking text (e.g. strategy content angles) added to the topic
+        """
+        query = " ".join([self.topic, *(focus or [])])
+        ranked = rank_items(self._items.get(category, []), query)
+        return ranked if k is None else ranked[:k]
+
+    def stats(self) -> Dict[str, int]:
+        """Deduplication counters for the research report."""
+        return {
+            'results_seen': self.added,
+            'distinct_sources': sum(len(items) for items in self._items.values()),
+            'duplicate_urls': self.duplicate_urls,
+            'near_duplicates': self.near_duplicates,
+        }
+
+
+def rerank_research(research_data: Dict[str, Any], focus: Iterable[str]) -> Dict[str, Any]:
+    """
+    Copy of assembled research with every category re-ranked against the
+    topic plus focus text (used once the strategy's angles are known).
+    """
+    focus = [text for text in focus if text]
+    if not focus:
+        return research_data
+    query = " ".join([research_data.get('topic', ''), *focus])
+    reranked = dict(research_data)
+    for category in CATEGORIES:
+        if research_data.get(category):
+            reranked[category] = rank_items(research_data[category], query)
+    return reranked
+
+
+# ============================================================================
+# ADAPTIVE QUERY BUDGET
+# ============================================================================
+class AdaptiveResearch:
+    """
+    Research queries sent in waves, stopping categories that run dry.
+
+    Every wave holds the next query of each category still active. Once a
+    wave's results are recorded (in query order, so the outcome does not
+    depend on which request finished first), a category whose latest
+    query scored below `min_novelty` is stopped. A result scores 0.5 for
+    a domain not seen before and 0.5 for a snippet that is not a
+    near-duplicate of one seen before; a query's novelty is the mean over
+    its results (0 for no results). A failed search (recorded as None)
+    is not scored, so a transient error never stops a category.
+    """
+
+    def __init__(self, groups: List[Tuple[str, List[str]]], min_novelty: float = 0.35,
+                 max_search_calls: Optional[int] = None, reserved_calls: int = 1,
+                 similarity: float = 0.8, num_perm: int = 64):
+        """
+        Args:
+            groups: (category, queries) in plan order; the flattened
+                queries keep their indices in the results
+            min_novelty: A category stops once a query scores below this
+            max_search_calls: Hard cap on searches per blog, news included
+                (default: every planned query plus the reserved calls)
+            reserved_calls: Calls kept for searches outside the plan (news)
+            similarity: Snippet similarity that counts as already seen
+            num_perm: MinHash signature length
+        """
+        self.min_novelty = min_novelty
+        self.similarity = similarity
+        self._hasher = MinHasher(num_perm)
+        self._queries: List[Tuple[int, str]] = []  # (group, query) by flattened index
+        self._pending: List[List[int]] = []        # Unsent query indices per group
+        self.categories = [category for category, _ in groups]
+        for group, (_, queries) in enumerate(groups):
+            self._pending.append(list(range(len(self._queries), len(self._queries) + len(queries))))
+            self._queries.extend((group, query) for query in queries)
+        self.max_search_calls = max_search_calls or len(self._queries) + reserved_calls
+        self._results: Dict[int, List[Dict[str, Any]]] = {}
+        self.failed_searches = 0
+        self._novelty: Dict[int, float] = {}
+        self._stopped: Dict[str, str] = {}
+        self._domains: set = set()
+        self._signatures: List[np.ndarray] = []
+        self.calls = reserved_calls
+
+    @property
+    def queries(self) -> List[str]:
+        """Every planned query in plan order."""
+        return [query for _, query in self._queries]
+
+    def next_wave(self) -> List[Tuple[int, str]]:
+        """
+        The next query of every active category, within the call cap.
+
+        Returns:
+            (query index, query) pairs; empty when research is done
+        """
+        wave = []
+        for group, pending in enumerate(self._pending):
+            if not pending or self.categories[group] in self._stopped:
+                continue
+            if self.calls >= self.max_search_calls:
+                self._stopped.setdefault(self.categories[group], 'budget')
+                continue
+            index = pending.pop(0)
+            wave.append((index, self._queries[index][1]))
+            self.calls += 1
+        return wave
+
+    def novelty(self, results: List[Dict[str, Any]]) -> float:
+        """Score results against everything seen so far and remember them."""
+        if not results:
+            return 0.0
+        score = 0.0
+        for item in results:
+            domain = canonical_url(item.get('link', '')).split('/')[0]
+            if domain and domain not in self._domains:
+                self._domains.add(domain)
+                score += 0.5
+            signature = self._hasher.signature(shingles(item.get('snippet') or item.get('title', '')))
+            if signature is None:
+                continue
+            if not self._signatures or (np.vstack(self._signatures) == signature).mean(axis=1).max() < self.similarity:
+                score += 0.5
+            self._signatures.append(signature)
+        return score / len(results)
+
+    def record(self, wave_results: List[Tuple[int, Optional[List[Dict[str, Any]]]]]):
+        """Store a wave's results (None for a failed search) and stop the categories that ran dry."""
+        for index, results in sorted(wave_results, key=lambda pair: pair[0]):
+            if results is None:
+                self._results[index] = []
+                self.failed_searches += 1
+                continue
+            self._results[index] = results
+            novelty = self._novelty[index] = round(self.novelty(results), 3)
+            category = self.categories[self._queries[index][0]]
+            if novelty < self.min_novelty and self._pending[self._queries[index][0]]:
+                self._stopped.setdefault(category, 'saturated')
+
+    def results(self) -> List[List[Dict[str, Any]]]:
+        """One result list per planned query (empty for queries not sent)."""
+        return [self._results.get(index, []) for index in range(len(self._queries))]
+
+    def stats(self) -> Dict[str, Any]:
+        """Search calls made and saved, for the run report."""
+        return {
+            'search_calls': self.calls,
+            'failed_searches': self.failed_searches,
+            'queries_skipped': len(self._queries) - len(self._results),
+            'stopped_categories': dict(self._stopped),
+            'query_novelty': {self._queries[index][1]: score for index, score in sorted(self._novelty.items())},
+        }
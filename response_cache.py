@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Persistent Response Caches
+
+Stores API responses on disk so repeated work is served locally:
+- SqliteCache: small key/value store with per-entry TTL and LRU eviction
+- SearchCache: Serper responses keyed on endpoint + normalized payload
+- LLMResponseCache: LLM completions keyed on model settings + prompt hash
+
+Regenerating the same (or an overlapping) topic then finishes research
+in milliseconds without spending search quota, and unchanged prompts
+are answered without an LLM round trip.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# ============================================================================
+# GENERIC SQLITE STORE
+# ============================================================================
+class SqliteCache:
+    """
+    JSON values in a single SQLite table with expiry and LRU eviction.
+
+    Every read refreshes the entry's last-access time; when the table grows
+    past `max_entries`, the least recently used entries are deleted.
+    One connection is shared behind a lock, so it is safe to use from the
+    research thread pool and from batch workers.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        """
+        Args:
+            path: SQLite database file (parent directories are created)
+            max_entries: Maximum entries kept before LRU eviction
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """(value, expires_at or None) for a fresh entry, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a JSON-serializable value, optionally expiring after ttl_seconds."""
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries (caller holds the lock)."""
+        self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+# ============================================================================
+# SERPER SEARCH CACHE
+# ============================================================================
+class SearchCache:
+    """
+    Content-addressed cache for Serper responses.
+
+    The key is a hash of the endpoint plus the normalized request payload
+    (`q`, `num`, `gl`, `hl`), so "AI Tools " and "ai tools" share an entry.
+    News results expire quickly; organic results are kept much longer.
+    """
+
+    def __init__(self, path: str, organic_ttl_hours: float = 168, news_ttl_hours: float = 6,
+                 max_entries: int = 5000):
+        """
+        Args:
+            path: SQLite database file
+            organic_ttl_hours: Lifetime of /search responses
+            news_ttl_hours: Lifetime of /news responses
+            max_entries: Maximum cached responses before LRU eviction
+        """
+        self.store = SqliteCache(path, max_entries=max_entries)
+        self.ttl_seconds = {
+            'search': organic_ttl_hours * 3600,
+            'news': news_ttl_hours * 3600,
+        }
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # Research threads share the counters
+
+    @staticmethod
+    def make_key(endpoint: str, payload: Dict[str, Any]) -> str:
+        """Hash the endpoint and the normalized payload fields."""
+        normalized = {
+            'endpoint': endpoint,
+            'q': " ".join(str(payload.get('q', '')).lower().split()),
+            'num': int(payload.get('num') or 0),
+            'gl': str(payload.get('gl', '')).lower(),
+            'hl': str(payload.get('hl', '')).lower(),
+        }
+        encoded = json.dumps(normalized, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached Serper response for this request, if fresh."""
+        value = self.store.get(self.make_key(endpoint, payload))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, endpoint: str, payload: Dict[str, Any], data: Dict[str, Any]):
+        """Cache a successful Serper response."""
+        self.store.set(self.make_key(endpoint, payload), data, self.ttl_seconds.get(endpoint))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 3) if total else 0.0,
+            'entries': len(self.store),
+        }
+
+
+def create_search_cache(config: Dict[str, Any]) -> Optional[SearchCache]:
+    """Build the search cache from the `search_cache` config section (None if disabled)."""
+    cache_config = config.get('search_cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+    return SearchCache(
+        cache_config.get('path', ".cache/search_cache.sqlite3"),
+        organic_ttl_hours=cache_config.get('organic_ttl_hours', 168),
+        news_ttl_hours=cache_config.get('news_ttl_hours', 6),
+        max_entries=cache_config.get('max_entries', 5000)
+    )
+
+
+# ============================================================================
+# LLM RESPONSE CACHE
+# ============================================================================
+class LLMResponseCache:
+    """
+    Two-level cache for LLM completions.
+
+    A bounded in-memory LRU holds the hottest responses; every response is
+    also written through to SQLite so later runs (e.g. re-running a blog
+    after tweaking only the editor settings) reuse all unchanged stages.
+    The key covers everything that changes the output: model, temperature,
+    max_tokens and the exact prompt text.
+    """
+
+    def __init__(self, max_memory_entries: int = 256, path: Optional[str] = None,
+                 max_disk_entries: int = 2000, ttl_hours: float = 0,
+                 skip_nonzero_temperature: bool = True):
+        """
+        Args:
+            max_memory_entries: Responses kept in memory
+            path: SQLite file for the on-disk layer (None = memory only)
+            max_disk_entries: Responses kept on disk before LRU eviction
+            ttl_hours: Lifetime of cached responses (0 = no expiry)
+            skip_nonzero_temperature: Never cache sampled (temperature > 0) calls,
+                so regenerating a post gives a new sample
+        """
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.ttl_seconds = ttl_hours * 3600 if ttl_hours else None
+        self.skip_nonzero_temperature = skip_nonzero_temperature
+        self.disk = SqliteCache(path, max_entries=max_disk_entries) if path else None
+
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()  # key -> (response, expires_at)
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    @staticmethod
+    def make_key(model: str, temperature: float, max_tokens: Optional[int], prompt: str) -> str:
+        """Hash the generation settings together with the prompt."""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        settings = json.dumps({'model': model, 'temperature': temperature,
+                               'max_tokens': max_tokens, 'prompt': prompt_hash}, sort_keys=True)
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Whether calls at this temperature may be cached."""
+        return not (self.skip_nonzero_temperature and temperature and temperature > 0)
+
+    def _expires_at(self) -> Optional[float]:
+        """Expiry time for an entry stored now (None = never expires)."""
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]):
+        """Insert into the memory LRU (caller holds the lock)."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, model: str, temperature: float, max_tokens: Optional[int], prompt: str) -> Optional[str]:
+        """Return a cached completion, checking memory first and then disk."""
+        if not self.is_cacheable(temperature):
+            with self._lock:
+                self.skipped += 1
+            return None
+
+        key = self.make_key(model, temperature, max_tokens, prompt)
+        with self._lock:
+            if key in self._memory:
+                value, expires_at = self._memory[key]
+                if expires_at is None or expires_at >= time.time():
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]  # Expired (the disk copy is expired too)
+
+        entry = self.disk.get_entry(key) if self.disk is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, *entry)  # Keeps the disk entry's expiry
+        return entry[0]
+
+    def set(self, model: str, temperature: float, max_tokens: Optional[int], prompt: str, response: str):
+        """Cache a successful completion in memory and on disk."""
+        if not self.is_cacheable(temperature):
+            return
+        key = self.make_key(model, temperature, max_tokens, prompt)
+        with self._lock:
+            self._remember(key, response, self._expires_at())
+        if self.disk is not None:
+            self.disk.set(key, response, self.ttl_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'skipped': self.skipped,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+            }
+
+
+def create_llm_cache(config: Dict[str, Any]) -> Optional[LLMResponseCache]:
+    """Build the LLM cache from the `llm_cache` config section (None if disabled)."""
+    cache_config = config.get('llm_cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+    return LLMResponseCache(
+        max_memory_entries=cache_config.get('max_memory_entries', 256),
+        path=cache_config.get('path', ".cache/llm_cache.sqlite3"),
+        max_disk_entries=cache_config.get('max_disk_entries', 2000),
+        ttl_hours=cache_config.get('ttl_hours', 0),
+        skip_nonzero_temperature=cache_config.get('skip_when_temperature_above_zero', True)
+    )
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Retry Policy for AI and Search Calls
+
+Replaces the fixed "sleep 30s on anything that mentions 429" rule with
+a policy that:
+- Classifies errors as retryable (429, 5xx, timeouts, dropped connections)
+  or fatal (bad request, auth, not found) from status codes and exception types
+- Waits exactly as long as the provider asks, via `Retry-After`,
+  `retry-after-ms` or `x-ratelimit-reset-*` headers (Groq durations like "2m59.56s")
+- Otherwise backs off with decorrelated jitter, so concurrent callers
+  do not retry in lockstep
+- Records per-call telemetry (attempts, waits, failure reasons)
+
+The same policy drives blocking (threads) and awaitable (asyncio) calls
+for both the LLM and the Serper paths.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import asyncio
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import requests
+
+
+# Status codes worth another attempt, and ones that will never succeed
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 520, 522, 524}
+FATAL_STATUS = {400, 401, 402, 403, 404, 405, 413, 422}
+
+# Transport-level failures from libraries we do not import directly (groq, httpx)
+RETRYABLE_EXCEPTION_NAMES = {
+    'APIConnectionError', 'APITimeoutError', 'TransportError', 'TimeoutException',
+    'ConnectError', 'ReadError', 'ReadTimeout', 'WriteError', 'PoolTimeout', 'RemoteProtocolError',
+}
+
+# Programming errors: retrying cannot fix these
+FATAL_EXCEPTION_TYPES = (TypeError, AttributeError, KeyError, NotImplementedError)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+# ============================================================================
+# HEADER PARSING
+# ============================================================================
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit wait into seconds.
+
+    Accepts plain seconds ("2", "1.5"), Go-style durations as sent by Groq
+    and OpenAI ("2m59.56s", "250ms", "1h2m") and HTTP dates (Retry-After).
+
+    Returns:
+        Seconds to wait (never negative), or None if the value is unreadable
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        scale = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+        return sum(float(number) * scale[unit] for number, unit in parts)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def retry_after_from_headers(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Seconds the provider asked us to wait, from response headers.
+
+    `retry-after-ms` and `Retry-After` win. Otherwise the reset time of
+    whichever `x-ratelimit-*` budget is exhausted is used (the longest if
+    several are), or the shortest reset if none reports 0 remaining.
+    """
+    if not headers:
+        return None
+    lowered = {str(key).lower(): value for key, value in headers.items()}
+
+    if 'retry-after-ms' in lowered:
+        millis = parse_duration(lowered['retry-after-ms'])
+        if millis is not None:
+            return millis / 1000.0
+    hinted = parse_duration(lowered.get('retry-after'))
+    if hinted is not None:
+        return hinted
+
+    resets, exhausted = [], []
+    for key, value in lowered.items():
+        if not key.startswith('x-ratelimit-reset-'):
+            continue
+        seconds = parse_duration(value)
+        if seconds is None:
+            continue
+        resets.append(seconds)
+        remaining = lowered.get('x-ratelimit-remaining-' + key[len('x-ratelimit-reset-'):])
+        if remaining is not None and str(remaining).strip() in ('0', '0.0'):
+            exhausted.append(seconds)
+    if exhausted:
+        return max(exhausted)
+    return min(resets) if resets else None
+
+
+# ============================================================================
+# ERROR CLASSIFICATION
+# ============================================================================
+class RetryDecision:
+    """Whether an error is worth retrying, and what the provider told us."""
+
+    def __init__(self, retryable: bool, reason: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        """
+        Args:
+            retryable: Another attempt may succeed
+            reason: Short label for logs and telemetry (e.g. 'rate_limit', 'http_503')
+            status: HTTP status code, if the error carried one
+            retry_after: Server-requested wait in seconds, if any
+        """
+        self.retryable = retryable
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+    def __repr__(self):
+        return (f"RetryDecision(retryable={self.retryable}, reason={self.reason!r}, "
+                f"status={self.status}, retry_after={self.retry_after})")
+
+
+def _error_response(error: Exception) -> Any:
+    """The HTTP response attached to an exception (requests, httpx and groq all use .response)."""
+    return getattr(error, 'response', None)
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(_error_response(error), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error: Exception) -> RetryDecision:
+    """
+    Decide whether an exception from an LLM or search call is retryable.
+
+    Args:
+        error: The exception raised by the call
+
+    Returns:
+        RetryDecision with the reason and any server-requested wait
+    """
+    status = _error_status(error)
+    headers = getattr(_error_response(error), 'headers', None)
+    retry_after = retry_after_from_headers(headers) if headers is not None else None
+
+    if status is not None:
+        if status == 429:
+            return RetryDecision(True, 'rate_limit', status, retry_after)
+        if status in RETRYABLE_STATUS or status >= 500:
+            return RetryDecision(True, f'http_{status}', status, retry_after)
+        if status in FATAL_STATUS or 400 <= status < 500:
+            return RetryDecision(False, f'http_{status}', status)
+
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError,
+                          asyncio.TimeoutError)):
+        return RetryDecision(True, 'connection')
+    if any(cls.__name__ in RETRYABLE_EXCEPTION_NAMES for cls in type(error).__mro__):
+        return RetryDecision(True, 'connection')
+    if isinstance(error, FATAL_EXCEPTION_TYPES):
+        return RetryDecision(False, type(error).__name__)
+
+    # Wrappers that only carry a message (other LLM libraries)
+    message = str(error).lower()
+    if '429' in message or 'rate limit' in message:
+        return RetryDecision(True, 'rate_limit', 429)
+    return RetryDecision(True, 'error')
+
+
+# ============================================================================
+# RETRY POLICY
+# ============================================================================
+class RetryExhausted(Exception):
+    """Raised when a call failed with a fatal error or ran out of attempts."""
+
+    def __init__(self, last_error: Exception, attempts: int, decision: RetryDecision):
+        super().__init__(f"{last_error} (after {attempts} attempt{'s' if attempts != 1 else ''}, "
+                         f"{decision.reason})")
+        self.last_error = last_error
+        self.attempts = attempts
+        self.decision = decision
+
+
+class RetryPolicy:
+    """
+    Retry loop with header-aware waits and decorrelated jitter.
+
+    Backoff follows the "decorrelated jitter" scheme: each wait is drawn
+    uniformly from [base_delay, previous_wait * multiplier], capped at
+    max_delay. A server-provided wait is honoured as is (plus a little
+    jitter); if it is longer than max_retry_after the call gives up rather
+    than stall a blog for a daily quota reset.
+    """
+
+    def __init__(self, name: str, max_attempts: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 60.0, multiplier: float = 3.0,
+                 max_retry_after: float = 120.0, hint_jitter: float = 0.1,
+                 verbose: bool = True, rng: Optional[random.Random] = None):
+        """
+        Args:
+            name: Label used in log messages, e.g. 'LLM call' or 'Search'
+            max_attempts: Total attempts including the first one
+            base_delay: Smallest backoff wait in seconds
+            max_delay: Largest backoff wait in seconds
+            multiplier: Growth factor of the decorrelated jitter window
+            max_retry_after: Longest server-requested wait we are willing to honour
+            hint_jitter: Extra random fraction added to server-requested waits
+            verbose: Print a line for every retry
+            rng: Random source (seed it for reproducible waits)
+        """
+        self.name = name
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+        self.multiplier = max(1.0, multiplier)
+        self.max_retry_after = max_retry_after
+        self.hint_jitter = max(0.0, hint_jitter)
+        self.verbose = verbose
+        self._rng = rng or random.Random()
+
+    @classmethod
+    def from_config(cls, name: str, kind: str, rate_config: Dict[str, Any], verbose: bool = True) -> 'RetryPolicy':
+        """
+        Build the policy for `kind` ('llm' or 'search') from `rate_limiting`.
+
+        Reads `rate_limiting.retry.<kind>`; without it, the legacy
+        max_retries / llm_delay_seconds / backoff_multiplier keys are used.
+        """
+        retry_config = rate_config.get('retry', {}) or {}
+        settings = retry_config.get(kind, {}) or {}
+        legacy_delay = rate_config.get('llm_delay_seconds', 2) if kind == 'llm' else 0.5
+        return cls(
+            name,
+            max_attempts=settings.get('max_attempts', rate_config.get('max_retries', 3)),
+            base_delay=settings.get('base_delay_seconds', legacy_delay),
+            max_delay=settings.get('max_delay_seconds', 60 if kind == 'llm' else 10),
+            multiplier=settings.get('multiplier', rate_config.get('backoff_multiplier', 3)),
+            max_retry_after=retry_config.get('max_retry_after_seconds', 120),
+            verbose=verbose
+        )
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+    def next_delay(self, previous_delay: float, decision: RetryDecision) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt (None means give up).
+
+        Args:
+            previous_delay: The last backoff wait (0 before the first retry)
+            decision: Classification of the error that just happened
+        """
+        if decision.retry_after is not None:
+            if decision.retry_after > self.max_retry_after:
+                return None
+            return decision.retry_after * (1 + self._rng.uniform(0, self.hint_jitter))
+        upper = max(self.base_delay, previous_delay * self.multiplier)
+        return min(self.max_delay, self._rng.uniform(self.base_delay, upper))
+
+    @staticmethod
+    def new_telemetry() -> Dict[str, Any]:
+        """Empty per-call retry record (merged into the run report's call entry)."""
+        return {'attempts': 0, 'retries': 0, 'retry_wait_seconds': 0.0, 'retry_reasons': [],
+                'server_hinted_waits': 0, 'fatal': False}
+
+    def _plan_retry(self, error: Exception, attempt: int, limit: int, previous_delay: float,
+                    telemetry: Dict[str, Any]) -> float:
+        """Classify a failure and return the wait, or raise RetryExhausted."""
+        decision = classify_error(error)
+        telemetry['retry_reasons'].append(decision.reason)
+        if not decision.retryable:
+            telemetry['fatal'] = True
+            raise RetryExhausted(error, attempt, decision) from error
+        delay = self.next_delay(previous_delay, decision) if attempt < limit else None
+        if delay is None:
+            if decision.retry_after is not None and decision.retry_after > self.max_retry_after:
+                telemetry['fatal'] = True
+            raise RetryExhausted(error, attempt, decision) from error
+
+        if decision.retry_after is not None:
+            telemetry['server_hinted_waits'] += 1
+        telemetry['retries'] += 1
+        telemetry['retry_wait_seconds'] = round(telemetry['retry_wait_seconds'] + delay, 3)
+        if self.verbose:
+            if decision.reason == 'rate_limit':
+                source = "server hint" if decision.retry_after is not None else "backoff"
+                print(f"⚠️ {self.name}: rate limit hit. Retrying in {delay:.1f}s ({source})...")
+            else:
+                print(f"⏳ {self.name} failed ({decision.reason}: {error}). "
+                      f"Retry {attempt + 1}/{limit} in {delay:.1f}s...")
+        return delay
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def call(self, func: Callable[[], Any], telemetry: Optional[Dict[str, Any]] = None,
+             max_attempts: Optional[int] = None) -> Any:
+        """
+        Run func() until it succeeds, sleeping between attempts.
+
+        Args:
+            func: Zero-argument callable making one attempt
+            telemetry: Dict from new_telemetry() to fill in (optional)
+            max_attempts: Override the policy's attempt limit for this call
+
+        Returns:
+            func's return value
+
+        Raises:
+            RetryExhausted: On a fatal error or when attempts run out
+        """
+        telemetry = telemetry if telemetry is not None else self.new_telemetry()
+        limit = max_attempts or self.max_attempts
+        delay = 0.0
+        attempt = 0
+        while True:
+            attempt += 1
+            telemetry['attempts'] = attempt
+            try:
+                return func()
+            except Exception as e:
+                delay = self._plan_retry(e, attempt, limit, delay, telemetry)
+            time.sleep(delay)
+
+    async def call_async(self, func: Callable[[], Any], telemetry: Optional[Dict[str, Any]] = None,
+                         max_attempts: Optional[int] = None) -> Any:
+        """
+        Async version of call(): func() returns an awaitable, waits use asyncio.sleep.
+        """
+        telemetry = telemetry if telemetry is not None else self.new_telemetry()
+        limit = max_attempts or self.max_attempts
+        delay = 0.0
+        attempt = 0
+        while True:
+            attempt += 1
+            telemetry['attempts'] = attempt
+            try:
+                return await func()
+            except Exception as e:
+                delay = self._plan_retry(e, attempt, limit, delay, telemetry)
+            await asyncio.sleep(delay)
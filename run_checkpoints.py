@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Stage Checkpoints for Resumable Runs
+
+Each pipeline stage's output is written to a run directory as soon as the
+stage completes. A resumed run loads every stage whose checkpoint is still
+valid and only re-runs the rest, so a failure four minutes into a blog
+costs a short retry instead of a full regeneration.
+
+A checkpoint is valid when its fingerprint matches. The fingerprint covers
+the topic, the config sections the stage reads and the fingerprints of
+its upstream stages, so changing e.g. the editor settings invalidates only
+the polish stage, while changing the LLM model invalidates everything.
+
+Run directories are keyed by topic so a later run (or --resume) always
+finds them. A run holds a lock file in the directory while it uses it;
+another run of the same topic, in this or any other process (batch,
+service or async jobs), waits for the lock instead of overwriting its
+checkpoints. A lock left behind by a killed process is taken over.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import hashlib
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def config_section(config: Dict[str, Any], dotted_key: str) -> Any:
+    """Look up a nested config value such as 'agents.editor' (None if missing)."""
+    value: Any = config
+    for part in dotted_key.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this id is still running (assumed so where it can't be checked)."""
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+
+# ============================================================================
+# CHECKPOINT STORE
+# ============================================================================
+class RunCheckpointStore:
+    """
+    One JSON file per completed stage inside a run directory.
+
+    File layout:
+        <run_dir>/<stage>.json  →  {"stage", "fingerprint", "completed_at", "output"}
+        <run_dir>/.lock         →  {"pid", "token", "locked_at"} while a run owns the directory
+    """
+
+    LOCK_FILE = ".lock"
+
+    def __init__(self, run_dir: str):
+        """
+        Args:
+            run_dir: Directory for this topic's checkpoints (created if needed)
+        """
+        self.run_dir = run_dir
+        self._lock_token: Optional[str] = None
+        os.makedirs(run_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Run lock
+    # ------------------------------------------------------------------
+    @property
+    def lock_path(self) -> str:
+        return os.path.join(self.run_dir, self.LOCK_FILE)
+
+    def _read_lock(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.lock_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None  # Gone, or still being written by its owner
+
+    def _lock_is_stale(self) -> bool:
+        """A lock whose owning process has exited (e.g. was killed mid-run)."""
+        owner = self._read_lock()
+        if not owner or not isinstance(owner.get('pid'), int):
+            return False
+        return owner['pid'] != os.getpid() and not _process_alive(owner['pid'])
+
+    def acquire(self, timeout: Optional[float] = None, poll_seconds: float = 0.5) -> bool:
+        """
+        Take the run directory's lock, waiting while another run holds it.
+
+        Args:
+            timeout: Seconds to wait for the lock (None waits indefinitely)
+            poll_seconds: Interval between attempts
+
+        Returns:
+            True once the lock is held, False if the timeout passed first
+        """
+        if self._lock_token:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        token = uuid.uuid4().hex
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._lock_is_stale():
+                    try:
+                        os.remove(self.lock_path)
+                    except FileNotFoundError:
+                        pass  # Another waiter removed it first
+                    continue
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(poll_seconds)
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'pid': os.getpid(), 'token': token,
+                           'locked_at': datetime.now().isoformat(timespec='seconds')}, f)
+            self._lock_token = token
+            return True
+
+    def release(self):
+        """Give up the lock (only if this store still owns it)."""
+        if not self._lock_token:
+            return
+        owner = self._read_lock()
+        if owner and owner.get('token') == self._lock_token:
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+        self._lock_token = None
+
+    @staticmethod
+    def fingerprint(topic: str, stage: str, config: Dict[str, Any], config_keys: Iterable[str],
+                    upstream_fingerprints: Iterable[str]) -> str:
+        """
+        Hash everything that determines a stage's output.
+
+        Args:
+            topic: Blog topic
+            stage: Stage name
+            config: Full configuration
+            config_keys: Dotted config sections the stage depends on
+            upstream_fingerprints: Fingerprints of the stages it consumes
+
+        Returns:
+            Hex digest identifying this stage's inputs
+        """
+        material = {
+            'topic': topic,
+            'stage': stage,
+            'config': {key: config_section(config, key) for key in sorted(config_keys)},
+            'upstream': sorted(upstream_fingerprints),
+        }
+        encoded = json.dumps(material, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, stage: str) -> str:
+        return os.path.join(self.run_dir, f"{stage}.json")
+
+    def load(self, stage: str, fingerprint: str) -> Optional[Any]:
+        """Return the stage's saved output if it exists and is still valid."""
+        try:
+            with open(self._path(stage), 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if checkpoint.get('fingerprint') != fingerprint:
+            return None
+        return checkpoint.get('output')
+
+    def save(self, stage: str, fingerprint: str, output: Any):
+        """Write the stage output atomically (a killed process never leaves half a file)."""
+        checkpoint = {
+            'stage': stage,
+            'fingerprint': fingerprint,
+            'completed_at': datetime.now().isoformat(timespec='seconds'),
+            'output': output,
+        }
+        temp_path = self._path(stage) + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self._path(stage))
+
+    def completed_stages(self) -> List[str]:
+        """Names of stages that have a checkpoint file (valid or not)."""
+        return sorted(name[:-5] for name in os.listdir(self.run_dir) if name.endswith('.json'))
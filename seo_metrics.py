@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Local Content Checks
+
+Deterministic, millisecond-fast measurements of generated markdown, used
+to decide which parts of a post actually need another AI pass:
+- Splitting a post into its heading sections (and joining them back
+  unchanged)
+- Flesch reading ease and average sentence length
+- Keyword density (share of words taken up by a keyword phrase)
+- Heading structure, meta description length and word count
+- Fixing heading structure without an AI call (fix_heading_structure)
+
+analyze_post() combines them into a pass/fail report against the
+`blog` and `agents.editor` targets, so the Editor Agent's AI pass only
+runs for what actually fails.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_WORD = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?")
+_VOWEL_GROUPS = re.compile(r'[aeiouy]+')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+
+# ============================================================================
+# MARKDOWN STRUCTURE
+# ============================================================================
+class MarkdownSection:
+    """One heading and the text below it, up to the next heading of the split level."""
+
+    def __init__(self, heading: str, text: str):
+        """
+        Args:
+            heading: Heading line without '#' markers ("" for text before the first heading)
+            text: Full section text, heading line included, exactly as in the post
+        """
+        self.heading = heading
+        self.text = text
+
+    @property
+    def body(self) -> str:
+        """Section text without its heading line."""
+        if not self.heading:
+            return self.text
+        return self.text.split('\n', 1)[1] if '\n' in self.text else ''
+
+
+def split_sections(markdown: str, max_level: int = 2) -> List[MarkdownSection]:
+    """
+    Split a post at every heading of level 1..max_level (# and ## by default).
+
+    Deeper headings (###) stay inside their section. Joining the sections'
+    text gives back the original post exactly.
+    """
+    sections: List[MarkdownSection] = []
+    heading, lines = "", []
+    in_code = False
+    for line in markdown.splitlines(keepends=True):
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line.rstrip('\n'))
+        if match and len(match.group(1)) <= max_level:
+            if lines:
+                sections.append(MarkdownSection(heading, ''.join(lines)))
+            heading, lines = match.group(2), [line]
+        else:
+            lines.append(line)
+    if lines:
+        sections.append(MarkdownSection(heading, ''.join(lines)))
+    return sections
+
+
+def join_sections(sections: Iterable[MarkdownSection]) -> str:
+    """Reassemble a post from its sections."""
+    return ''.join(section.text for section in sections)
+
+
+def plain_text(markdown: str) -> str:
+    """
+    Markdown reduced to its prose: headings, code blocks, link targets,
+    images, emphasis markers and list/table syntax removed.
+    """
+    text = re.sub(r'```.*?```', ' ', markdown, flags=re.DOTALL)
+    text = re.sub(r'!\[[^\]]*\]\([^)]*\)', ' ', text)
+    text = re.sub(r'\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    lines = []
+    for line in text.splitlines():
+        if _HEADING.match(line) or re.match(r'^\s*\|?\s*:?-{3,}', line):
+            continue
+        line = re.sub(r'^\s*(?:[-*+]|\d+[.)])\s+', '', line)  # List markers
+        line = re.sub(r'^\s*>\s?', '', line)                  # Quotes
+        lines.append(line.replace('|', ' '))
+    text = "\n".join(lines)
+    return re.sub(r'[*_`~]+', '', text)
+
+
+# ============================================================================
+# READABILITY
+# ============================================================================
+def words(text: str) -> List[str]:
+    """Words in plain text."""
+    return _WORD.findall(text)
+
+
+def sentences(text: str) -> List[str]:
+    """
+    Sentences in plain text. Every line (a list item, a short paragraph)
+    ends a sentence even without punctuation.
+    """
+    found = []
+    for line in text.splitlines():
+        found.extend(part for part in _SENTENCE_BREAK.split(line.strip()) if words(part))
+    return found
+
+
+def count_syllables(word: str) -> int:
+    """English syllable estimate (vowel groups, silent final 'e')."""
+    word = word.lower()
+    if word.isdigit():
+        return max(1, len(word) // 2)
+    count = len(_VOWEL_GROUPS.findall(word))
+    if word.endswith('e') and not word.endswith(('le', 'ee', 'ye')) and count > 1:
+        count -= 1
+    return max(1, count)
+
+
+def flesch_reading_ease(text: str) -> Optional[float]:
+    """
+    Flesch reading ease of plain text (higher = easier; 60-70 is plain
+    English, below 30 is very hard to read).
+
+    Returns:
+        The score, or None when there is no prose to measure
+    """
+    word_list = words(text)
+    sentence_count = len(sentences(text))
+    if not word_list or not sentence_count:
+        return None
+    syllables = sum(count_syllables(word) for word in word_list)
+    return round(206.835 - 1.015 * (len(word_list) / sentence_count) - 84.6 * (syllables / len(word_list)), 1)
+
+
+def average_sentence_words(text: str) -> float:
+    """Mean words per sentence (0 for empty text)."""
+    found = sentences(text)
+    return round(len(words(text)) / len(found), 1) if found else 0.0
+
+
+# ============================================================================
+# KEYWORDS
+# ============================================================================
+def keyword_occurrences(text: str, keyword: str) -> int:
+    """Case-insensitive whole-phrase matches of a keyword."""
+    phrase = [re.escape(part) for part in words(keyword)]
+    if not phrase:
+        return 0
+    return len(re.findall(r'\b' + r'\W+'.join(phrase) + r'\b', text, re.IGNORECASE))
+
+
+def keyword_density(text: str, keyword: str) -> float:
+    """Percentage of the text's words taken up by a keyword phrase."""
+    total = len(words(text))
+    if not total:
+        return 0.0
+    return round(100.0 * keyword_occurrences(text, keyword) * len(words(keyword)) / total, 2)
+
+
+# ============================================================================
+# SECTION CHECKS
+# ============================================================================
+def section_issues(section: MarkdownSection, keywords: List[str], thresholds: Dict[str, Any]) -> List[str]:
+    """
+    Problems in one section that are worth an editing pass.
+
+    Args:
+        section: The section to check
+        keywords: SEO keywords of the post
+        thresholds: `min_reading_ease`, `max_sentence_words`,
+            `max_keyword_density` (percent) and `min_check_words`
+            (shorter sections are too small to measure and always pass)
+
+    Returns:
+        Human-readable issues (empty when the section passes)
+    """
+    text = plain_text(section.body)
+    if len(words(text)) < thresholds.get('min_check_words', 40):
+        return []
+
+    issues = []
+    reading_ease = flesch_reading_ease(text)
+    min_reading_ease = thresholds.get('min_reading_ease', 50)
+    if reading_ease is not None and reading_ease < min_reading_ease:
+        issues.append(f"Readability score {reading_ease} is below {min_reading_ease}: "
+                      f"use shorter sentences and simpler words")
+    sentence_words = average_sentence_words(text)
+    max_sentence_words = thresholds.get('max_sentence_words', 25)
+    if sentence_words > max_sentence_words:
+        issues.append(f"Sentences average {sentence_words} words (limit {max_sentence_words}): split long sentences")
+
+    max_density = thresholds.get('max_keyword_density', 3.0)
+    for keyword in keywords:
+        density = keyword_density(text, keyword)
+        if density > max_density:
+            issues.append(f"Keyword \"{keyword}\" is {density}% of the words (limit {max_density}%): "
+                          f"reduce repetition")
+    return issues
+
+
+# ============================================================================
+# HEADINGS AND META DESCRIPTION
+# ============================================================================
+def headings(markdown: str) -> List[Tuple[int, str]]:
+    """(level, text) of every heading outside code blocks."""
+    found, in_code = [], False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+            continue
+        match = None if in_code else _HEADING.match(line)
+        if match:
+            found.append((len(match.group(1)), match.group(2)))
+    return found
+
+
+def heading_problems(markdown: str, min_h2: int = 2) -> List[str]:
+    """Structural heading problems (H1 count, too few H2s, skipped levels, empty headings)."""
+    found = headings(markdown)
+    problems = []
+    h1_count = sum(1 for level, _ in found if level == 1)
+    if h1_count != 1:
+        problems.append(f"{h1_count} H1 headings (expected exactly 1)")
+    h2_count = sum(1 for level, _ in found if level == 2)
+    if h2_count < min_h2:
+        problems.append(f"{h2_count} H2 sections (expected at least {min_h2})")
+    previous = 0
+    for level, text in found:
+        if previous and level > previous + 1:
+            problems.append(f"Heading \"{text}\" skips from H{previous} to H{level}")
+        if not text.strip():
+            problems.append(f"Empty H{level} heading")
+        previous = level
+    return problems
+
+
+def fix_heading_structure(markdown: str, title: str) -> str:
+    """
+    Repair the heading problems that need no rewriting.
+
+    Keeps an H1 only as the first heading (adding `title` as the H1 when
+    there is none), turns any other H1 into an H2, raises headings that
+    skip a level to one below the previous heading and drops empty
+    headings. Text and code blocks are unchanged.
+    """
+    lines, in_code, previous, seen_h1 = [], False, 0, False
+    for line in markdown.splitlines(keepends=True):
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line.rstrip('\n'))
+        if not match:
+            lines.append(line)
+            continue
+        text = match.group(2)
+        if not text.strip():
+            continue
+        level = len(match.group(1))
+        if level == 1 and not previous:
+            seen_h1 = True
+        elif level == 1:
+            level = 2
+        elif previous and level > previous + 1:
+            level = previous + 1
+        previous = level
+        lines.append(f"{'#' * level} {text}\n")
+    fixed = "".join(lines)
+    if not seen_h1:
+        fixed = f"# {title}\n\n{fixed.lstrip()}"
+    return fixed
+
+
+_META_LINE = re.compile(r'^[>*_ \t]*meta[ -]description[*_ \t]*:[*_ \t]*(.+?)[ \t]*$', re.IGNORECASE | re.MULTILINE)
+
+
+def meta_description(markdown: str) -> Optional[str]:
+    """Text of a 'Meta description:' line in the post, if there is one."""
+    match = _META_LINE.search(markdown)
+    return match.group(1).strip(' *_"') if match else None
+
+
+def split_meta_description(markdown: str) -> Tuple[str, Optional[str]]:
+    """
+    Separate a post from its 'Meta description:' line.
+
+    Returns:
+        (post without the line, description or None)
+    """
+    description = meta_description(markdown)
+    if description is None:
+        return markdown, None
+    return _META_LINE.sub('', markdown, count=1).rstrip() + "\n", description
+
+
+# ============================================================================
+# WHOLE-POST REPORT
+# ============================================================================
+def analyze_post(markdown: str, primary_keywords: List[str], secondary_keywords: List[str],
+                 settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Measure a finished post and check it against the editing targets.
+
+    Args:
+        markdown: The post
+        primary_keywords: Keywords that must appear (density also capped)
+        secondary_keywords: Keywords whose density is capped
+        settings: Targets: `min_word_count`, `max_word_count`,
+            `min_reading_ease`, `max_keyword_density`, `min_h2_sections`,
+            `meta_description_min_chars`, `meta_description_max_chars`, and
+            the switches `readability_check`, `keyword_density_check` and
+            `meta_description_check` (all on unless set to false)
+
+    Returns:
+        Dictionary with the measured 'metrics', per-check results under
+        'checks' ({'passed': bool, 'detail': str}; the keyword check also
+        lists 'missing' primary keywords), and 'passed'
+    """
+    text = plain_text(markdown)
+    word_count = len(words(text))
+    reading_ease = flesch_reading_ease(text)
+    keywords = [k for k in primary_keywords if k] + [k for k in secondary_keywords if k]
+    densities = {keyword: keyword_density(text, keyword) for keyword in keywords}
+    description = meta_description(markdown)
+    checks: Dict[str, Dict[str, Any]] = {}
+
+    def check(name: str, passed: bool, detail: str, **extra):
+        checks[name] = {'passed': passed, 'detail': detail, **extra}
+
+    min_words = settings.get('min_word_count', 0)
+    max_words = settings.get('max_word_count') or float('inf')
+    check('word_count', min_words <= word_count <= max_words,
+          f"{word_count} words (target {min_words}-{settings.get('max_word_count', 'any')})")
+
+    if settings.get('readability_check', True) and reading_ease is not None:
+        min_reading_ease = settings.get('min_reading_ease', 50)
+        check('readability', reading_ease >= min_reading_ease,
+              f"Flesch reading ease {reading_ease} (target {min_reading_ease}+)")
+
+    if settings.get('keyword_density_check', True) and keywords:
+        max_density = settings.get('max_keyword_density', 3.0)
+        missing = [k for k in primary_keywords if k and keyword_occurrences(text, k) == 0]
+        stuffed = [f"\"{k}\" {d}%" for k, d in densities.items() if d > max_density]
+        detail = "; ".join(filter(None, [
+            f"primary keywords missing: {', '.join(missing)}" if missing else "",
+            f"above {max_density}%: {', '.join(stuffed)}" if stuffed else "",
+        ])) or "All primary keywords present, none overused"
+        check('keyword_density', not missing and not stuffed, detail, missing=missing)
+
+    problems = heading_problems(markdown, settings.get('min_h2_sections', 2))
+    check('headings', not problems, "; ".join(problems) or "One H1, H2 sections, no skipped levels")
+
+    if settings.get('meta_description_check', True):
+        low = settings.get('meta_description_min_chars', 120)
+        high = settings.get('meta_description_max_chars', 160)
+        length = len(description) if description else 0
+        check('meta_description', bool(description) and low <= length <= high,
+              f"{length} characters (target {low}-{high})" if description else "No meta description")
+
+    return {
+        'metrics': {
+            'word_count': word_count,
+            'reading_ease': reading_ease,
+            'average_sentence_words': average_sentence_words(text),
+            'keyword_density': densities,
+            'headings': len(headings(markdown)),
+            'meta_description_chars': len(description) if description else 0,
+        },
+        'checks': checks,
+        'passed': all(result['passed'] for result in checks.values()),
+    }
+
+
+def failed_checks(report: Dict[str, Any]) -> List[str]:
+    """'name: detail' for every failed check of an analyze_post report."""
+    return [f"{name.replace('_', ' ').capitalize()}: {result['detail']}"
+            for name, result in report['checks'].items() if not result['passed']]
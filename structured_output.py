@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Structured Output for the Strategy and SEO Agents
+
+The agents ask for JSON but models do not always return valid JSON: the
+object is wrapped in prose or code fences, has trailing commas, single
+quotes or Python literals, or is cut off at the token limit. Instead of
+discarding such a reply for a canned fallback, this module:
+- Finds JSON objects with a string-aware brace scanner (not a greedy regex)
+  and closes objects that were cut off mid-stream
+- Repairs the common syntax slips before parsing
+- Validates the result against a small schema, coercing near-misses
+  (a string where a list was expected and vice versa)
+- Lists the required fields still missing, so only those are re-asked
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Schemas map field names to str, [str] (list of strings) or a nested schema
+STRATEGY_SCHEMA = {
+    'target_audience': {'primary': str, 'pain_points': [str], 'preferences': str},
+    'competitive_landscape': {'gaps': [str], 'opportunities': [str]},
+    'content_angles': [str],
+    'market_opportunities': [str],
+    'strategic_positioning': {'unique_value': str, 'key_messages': [str], 'tone': str},
+}
+STRATEGY_REQUIRED = ['target_audience.primary', 'content_angles', 'strategic_positioning.unique_value']
+
+SEO_SCHEMA = {
+    'primary_keywords': [str],
+    'secondary_keywords': [str],
+    'search_intent': str,
+    'content_structure': {'h1': str, 'h2_sections': [str]},
+    'meta_optimization': {'title': str, 'description': str, 'focus_keyword': str},
+    'seo_recommendations': [str],
+}
+SEO_REQUIRED = ['primary_keywords', 'secondary_keywords', 'search_intent', 'content_structure.h2_sections',
+                'meta_optimization.title', 'meta_optimization.description']
+
+_CLOSERS = {'{': '}', '[': ']'}
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '‘': "'", '’': "'"})
+
+
+# ============================================================================
+# RESULT
+# ============================================================================
+class StructuredResult:
+    """Parsed fields, the required fields still missing, and the repairs applied."""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, missing: Optional[List[str]] = None,
+                 repairs: Optional[List[str]] = None):
+        self.data = data or {}
+        self.missing = list(missing or [])
+        self.repairs = list(repairs or [])
+        self.defaulted: List[str] = []  # Filled from defaults by fill_defaults
+
+    def merge(self, other: 'StructuredResult', required: List[str]) -> 'StructuredResult':
+        """
+        Fill this result's missing fields from another (e.g. a re-ask reply).
+
+        Fields already present are never overwritten.
+        """
+        for path in self.missing:
+            value = get_path(other.data, path)
+            if not _is_empty(value):
+                set_path(self.data, path, value)
+        self.missing = [path for path in required if _is_empty(get_path(self.data, path))]
+        self.repairs.extend(other.repairs)
+        return self
+
+
+# ============================================================================
+# DOTTED PATHS
+# ============================================================================
+def get_path(data: Dict[str, Any], path: str) -> Any:
+    """Value at a dotted path ('a.b'), or None."""
+    value: Any = data
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def set_path(data: Dict[str, Any], path: str, value: Any):
+    """Set the value at a dotted path, creating (or replacing non-dict) parents."""
+    keys = path.split('.')
+    for key in keys[:-1]:
+        if not isinstance(data.get(key), dict):
+            data[key] = {}
+        data = data[key]
+    data[keys[-1]] = value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+# ============================================================================
+# TOLERANT JSON EXTRACTION
+# ============================================================================
+def _map_outside_strings(text: str, func) -> str:
+    """Apply func to the parts of text outside double-quoted JSON strings."""
+    parts, start, i, in_string = [], 0, 0, False
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if char == '\\':
+                i += 1
+            elif char == '"':
+                parts.append(text[start:i + 1])
+                start, in_string = i + 1, False
+        elif char == '"':
+            parts.append(func(text[start:i]))
+            start, in_string = i, True
+        i += 1
+    parts.append(text[start:] if in_string else func(text[start:]))
+    return ''.join(parts)
+
+
+def _single_to_double_quotes(text: str) -> str:
+    """Turn 'single-quoted' strings (outside double-quoted ones) into JSON strings."""
+    def convert(segment: str) -> str:
+        return re.sub(r"'((?:[^'\\\n]|\\.)*)'", lambda m: json.dumps(m.group(1).replace("\\'", "'")), segment)
+    return _map_outside_strings(text, convert)
+
+
+def _scan_objects(text: str) -> List[Tuple[str, bool]]:
+    """
+    Top-level {...} spans in text, found with a string-aware bracket scanner.
+
+    Returns:
+        (span, complete) pairs; an object cut off by the end of the text is
+        returned with its open strings and brackets closed, and complete=False
+    """
+    found = []
+    i = 0
+    while True:
+        start = text.find('{', i)
+        if start < 0:
+            return found
+        stack, in_string, escaped = [], False, False
+        for position in range(start, len(text)):
+            char = text[position]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in _CLOSERS:
+                stack.append(char)
+            elif char in '}]' and stack:
+                stack.pop()
+                if not stack:
+                    found.append((text[start:position + 1], True))
+                    i = position + 1
+                    break
+        else:
+            found.append((_close_truncated(text[start:], stack, in_string), False))
+            return found
+
+
+def _close_truncated(fragment: str, stack: List[str], in_string: bool) -> str:
+    """Close a JSON object that stopped mid-stream, dropping a dangling key or comma."""
+    if in_string:
+        fragment += '"'
+    fragment = fragment.rstrip()
+    # A key without a value, or a trailing separator, cannot be completed
+    fragment = re.sub(r',?\s*"[^"\\]*"\s*:\s*$', '', fragment)
+    if stack and stack[-1] == '{':
+        fragment = re.sub(r'([{,])\s*"[^"\\]*"$', r'\1', fragment)
+    fragment = re.sub(r'[,:]\s*$', '', fragment)
+    return fragment + ''.join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def _repair(candidate: str) -> Tuple[str, List[str]]:
+    """Fix common syntax slips; returns (text, names of the repairs applied)."""
+    repairs = []
+
+    def apply(name: str, func):
+        nonlocal candidate
+        fixed = func(candidate)
+        if fixed != candidate:
+            candidate = fixed
+            repairs.append(name)
+
+    apply('smart quotes', lambda t: t.translate(_SMART_QUOTES))
+    apply('comments', lambda t: _map_outside_strings(t, lambda s: re.sub(r'//[^\n]*|/\*.*?\*/', '', s, flags=re.DOTALL)))
+    apply('single quotes', _single_to_double_quotes)
+    apply('python literals', lambda t: _map_outside_strings(
+        t, lambda s: re.sub(r'\b(True|False|None)\b', lambda m: {'True': 'true', 'False': 'false', 'None': 'null'}[m.group(1)], s)))
+    apply('unquoted keys', lambda t: _map_outside_strings(
+        t, lambda s: re.sub(r'([{,]\s*)([A-Za-z_][\w-]*)(\s*:)', r'\1"\2"\3', s)))
+    apply('missing commas', lambda t: re.sub(r'("|\}|\]|\btrue|\bfalse|\bnull|\d)(\s*\n\s*)(["{\[])', r'\1,\2\3', t))
+    apply('trailing commas', lambda t: _map_outside_strings(t, lambda s: re.sub(r',(\s*[}\]])', r'\1', s)))
+    return candidate, repairs
+
+
+def extract_json(text: Optional[str], schema: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Best JSON object in a model reply.
+
+    Every top-level object is parsed (repaired if necessary); with a
+    schema, the object sharing the most top-level keys with it wins,
+    otherwise the first one that parses.
+
+    Returns:
+        (object or None, repairs applied to it)
+    """
+    if not text:
+        return None, []
+    text = re.sub(r'```(?:json)?', '', text, flags=re.IGNORECASE)
+
+    best, best_repairs, best_score = None, [], -1
+    for candidate, complete in _scan_objects(text):
+        repairs = [] if complete else ['truncated']
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            fixed, applied = _repair(candidate)
+            try:
+                data = json.loads(fixed)
+            except json.JSONDecodeError:
+                continue
+            repairs += applied
+        if not isinstance(data, dict):
+            continue
+        score = len(set(data) & set(schema)) if schema else 0
+        if score > best_score:
+            best, best_repairs, best_score = data, repairs, score
+        if not schema:
+            break
+    return best, best_repairs
+
+
+# ============================================================================
+# SCHEMA VALIDATION
+# ============================================================================
+def _coerce(value: Any, spec: Any) -> Any:
+    """Value shaped like spec, or None if it cannot be."""
+    if isinstance(spec, dict):
+        if not isinstance(value, dict):
+            return None
+        return {key: coerced for key, coerced in ((key, _coerce(value.get(key), sub)) for key, sub in spec.items())
+                if coerced is not None} | {key: item for key, item in value.items() if key not in spec}
+    if isinstance(spec, list):
+        if isinstance(value, str):
+            value = [part.strip(' -•*') for part in re.split(r'[\n;]|,(?![^()]*\))', value) if part.strip(' -•*')]
+        if not isinstance(value, list):
+            return None
+        return [str(item).strip() for item in value if isinstance(item, (str, int, float)) and str(item).strip()]
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value if isinstance(item, (str, int, float))) or None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def validate(data: Optional[Dict[str, Any]], schema: Dict[str, Any], required: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Coerce parsed JSON to the schema.
+
+    Returns:
+        (coerced data (unknown keys kept), required dotted paths that are missing or empty)
+    """
+    coerced = _coerce(data or {}, schema) or {}
+    return coerced, [path for path in required if _is_empty(get_path(coerced, path))]
+
+
+def parse_structured(text: Optional[str], schema: Dict[str, Any], required: List[str]) -> StructuredResult:
+    """Extract, repair and validate a JSON reply in one step."""
+    data, repairs = extract_json(text, schema)
+    coerced, missing = validate(data, schema, required)
+    return StructuredResult(coerced, missing, repairs)
+
+
+def fill_defaults(result: StructuredResult, defaults: Dict[str, Any]) -> List[str]:
+    """
+    Fill the still-missing required fields from defaults (all of defaults
+    when nothing was parsed).
+
+    Returns:
+        The dotted paths that were filled
+    """
+    if not result.data:
+        # Nothing usable: take the whole default (optional fields included)
+        result.data = json.loads(json.dumps(defaults))
+        filled, result.missing = list(result.missing), []
+        result.defaulted += filled
+        return filled
+    filled = []
+    for path in result.missing:
+        value = get_path(defaults, path)
+        if not _is_empty(value):
+            set_path(result.data, path, value)
+            filled.append(path)
+    result.missing = [path for path in result.missing if path not in filled]
+    result.defaulted += filled
+    return filled
+
+
+# ============================================================================
+# RE-ASK PROMPT
+# ============================================================================
+def _shape(spec: Any) -> Any:
+    """Example value for a schema entry (shown to the model)."""
+    if isinstance(spec, dict):
+        return {key: _shape(sub) for key, sub in spec.items()}
+    return ["...", "..."] if isinstance(spec, list) else "..."
+
+
+def build_reask_prompt(agent: str, topic: str, result: StructuredResult, schema: Dict[str, Any]) -> str:
+    """
+    Prompt asking only for the missing fields, with the known fields as context.
+
+    Args:
+        agent: Agent name for the instructions (e.g. "Strategy")
+        topic: The blog topic
+        result: Parsed reply with its missing fields
+        schema: Schema of the full reply
+    """
+    wanted: Dict[str, Any] = {}
+    for path in result.missing:
+        spec: Any = schema
+        for key in path.split('.'):
+            spec = spec.get(key, str) if isinstance(spec, dict) else str
+        set_path(wanted, path, _shape(spec))
+    known = json.dumps(result.data, ensure_ascii=False)
+    return f"""Your {agent} analysis for "{topic}" is missing some fields.
+
+Already provided:
+{known}
+
+Reply with ONLY a JSON object containing the missing fields, in this shape:
+{json.dumps(wanted, indent=2)}"""
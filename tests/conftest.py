@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: the generator modules live in the repository root.
+
+Run from the repository root with:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
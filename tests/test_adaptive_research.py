@@ -0,0 +1,105 @@
+"""Tests for research_index.AdaptiveResearch: waves, novelty stops, failed searches and the call cap."""
+
+from research_index import AdaptiveResearch
+
+
+GROUPS = [
+    ('base', ["ai agents"]),
+    ('trends', ["ai agents trends", "future of ai agents", "ai agents outlook"]),
+    ('competitors', ["ai agents vendors", "ai agents pricing"]),
+]
+
+
+def fresh(tag, count=3):
+    """Results from domains and snippets never seen before."""
+    return [{'link': f"https://{tag}{i}.com/page", 'title': f"{tag} {i}",
+             'snippet': f"unique finding {tag} number {i} about adoption in sector {tag}{i}"}
+            for i in range(count)]
+
+
+def repeat(count=3):
+    """Results that repeat what the first wave already returned."""
+    return fresh('base', count)
+
+
+def run(plan, respond):
+    """Send every wave; respond(query) returns the results (None for a failed search)."""
+    sent = []
+    wave = plan.next_wave()
+    while wave:
+        sent.append([query for _, query in wave])
+        plan.record([(index, respond(query)) for index, query in wave])
+        wave = plan.next_wave()
+    return sent
+
+
+def test_waves_take_one_query_per_category():
+    plan = AdaptiveResearch(GROUPS)
+    sent = run(plan, lambda query: fresh(query.replace(' ', '')))
+    assert sent[0] == ["ai agents", "ai agents trends", "ai agents vendors"]
+    assert sent[1] == ["future of ai agents", "ai agents pricing"]
+    assert sent[2] == ["ai agents outlook"]
+    assert plan.stats()['queries_skipped'] == 0
+
+
+def test_default_cap_allows_every_planned_query():
+    plan = AdaptiveResearch(GROUPS)
+    assert plan.max_search_calls == 6 + 1  # Planned queries plus the news search
+    run(plan, lambda query: fresh(query.replace(' ', '')))
+    assert plan.stats()['search_calls'] == 7
+    assert plan.stats()['stopped_categories'] == {}
+
+
+def test_category_stops_when_results_repeat():
+    plan = AdaptiveResearch(GROUPS, min_novelty=0.35)
+
+    def respond(query):
+        if query == "ai agents":
+            return repeat()
+        if query == "future of ai agents":
+            return repeat()  # Nothing new: trends runs dry
+        return fresh(query.replace(' ', ''))
+
+    sent = run(plan, respond)
+    flat = [query for wave in sent for query in wave]
+    assert "ai agents outlook" not in flat
+    assert plan.stats()['stopped_categories']['trends'] == 'saturated'
+    assert plan.stats()['queries_skipped'] == 1
+    assert len(plan.results()) == 6 and plan.results()[3] == []
+
+
+def test_failed_search_does_not_stop_its_category():
+    plan = AdaptiveResearch(GROUPS)
+    sent = run(plan, lambda query: None if query == "ai agents trends" else fresh(query.replace(' ', '')))
+
+    assert "future of ai agents" in sent[1]
+    stats = plan.stats()
+    assert stats['failed_searches'] == 1
+    assert stats['stopped_categories'] == {}
+    assert "ai agents trends" not in stats['query_novelty']  # Not scored
+    assert plan.results()[1] == []
+
+
+def test_explicit_cap_stops_remaining_categories():
+    plan = AdaptiveResearch(GROUPS, max_search_calls=4)
+    sent = run(plan, lambda query: fresh(query.replace(' ', '')))
+    assert sum(len(wave) for wave in sent) == 3  # One call reserved for news
+    assert plan.stats()['stopped_categories'] == {'trends': 'budget', 'competitors': 'budget'}
+
+
+def test_record_order_does_not_change_the_outcome():
+    def outcome(reverse):
+        plan = AdaptiveResearch(GROUPS)
+        wave = plan.next_wave()
+        results = [(index, repeat()) for index, _ in wave]
+        plan.record(list(reversed(results)) if reverse else results)
+        return plan.stats()
+
+    assert outcome(False) == outcome(True)
+
+
+def test_novelty_scores():
+    plan = AdaptiveResearch(GROUPS)
+    assert plan.novelty([]) == 0.0
+    assert plan.novelty(fresh('a', 2)) == 1.0
+    assert plan.novelty(fresh('a', 2)) == 0.0
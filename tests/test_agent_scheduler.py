@@ -0,0 +1,148 @@
+"""Tests for agent_scheduler: graph validation, ordering and failure propagation."""
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from agent_scheduler import PipelineStage, StageScheduler
+
+
+def pipeline(func_for=None):
+    """The blog pipeline's shape: strategy/research in parallel, then seo/analysis, write, polish."""
+    func_for = func_for or {}
+    graph = [
+        ('strategy', []), ('research', []),
+        ('seo', ['strategy']), ('analysis', ['research']),
+        ('write', ['strategy', 'research', 'seo', 'analysis']), ('polish', ['write']),
+    ]
+    return [PipelineStage(name, func_for.get(name, lambda results, name=name: name), deps)
+            for name, deps in graph]
+
+
+def test_rejects_cycles():
+    stages = [PipelineStage('a', lambda r: 1, ['c']), PipelineStage('b', lambda r: 1, ['a']),
+              PipelineStage('c', lambda r: 1, ['b']), PipelineStage('d', lambda r: 1)]
+    with pytest.raises(ValueError, match="cycle") as error:
+        StageScheduler(stages)
+    assert "'d'" not in str(error.value)
+
+
+def test_rejects_self_dependency():
+    with pytest.raises(ValueError, match="cycle"):
+        StageScheduler([PipelineStage('a', lambda r: 1, ['a'])])
+
+
+def test_rejects_unknown_dependency_and_duplicate_names():
+    with pytest.raises(ValueError, match="unknown stage 'missing'"):
+        StageScheduler([PipelineStage('a', lambda r: 1, ['missing'])])
+    with pytest.raises(ValueError, match="unique"):
+        StageScheduler([PipelineStage('a', lambda r: 1), PipelineStage('a', lambda r: 2)])
+
+
+def test_topological_order_keeps_declared_order_where_possible():
+    scheduler = StageScheduler(list(reversed(pipeline())))
+    order = scheduler.topological_order()
+    for stage in scheduler.stages.values():
+        assert all(order.index(dep) < order.index(stage.name) for dep in stage.depends_on)
+    assert order[0] == 'research'  # First declared stage without dependencies
+
+
+@pytest.mark.parametrize('parallel', [True, False])
+def test_stages_see_their_inputs(parallel):
+    seen = {}
+
+    def write(results):
+        seen['write'] = sorted(results)
+        return "draft"
+
+    scheduler = StageScheduler(pipeline({'write': write}), parallel=parallel)
+    results = scheduler.run()
+    assert results['polish'] == 'polish'
+    assert seen['write'] == ['analysis', 'research', 'seo', 'strategy']
+    assert scheduler.failed == []
+
+
+@pytest.mark.parametrize('parallel', [True, False])
+def test_none_output_stops_dependents(parallel):
+    calls = []
+
+    def record(name, output):
+        def func(results):
+            calls.append(name)
+            return output
+        return func
+
+    funcs = {name: record(name, name) for name in ('strategy', 'research', 'seo', 'analysis', 'write', 'polish')}
+    funcs['seo'] = record('seo', None)
+    scheduler = StageScheduler(pipeline(funcs), parallel=parallel)
+    results = scheduler.run()
+
+    assert scheduler.failed == ['seo']
+    assert 'seo' not in results
+    assert 'write' not in calls and 'polish' not in calls
+
+
+@pytest.mark.parametrize('parallel', [True, False])
+def test_exception_is_recorded_and_stops_the_run(parallel):
+    def analysis(results):
+        raise RuntimeError("boom")
+
+    scheduler = StageScheduler(pipeline({'analysis': analysis}), parallel=parallel)
+    results = scheduler.run()
+
+    assert scheduler.failed == ['analysis']
+    assert isinstance(scheduler.errors['analysis'], RuntimeError)
+    assert 'write' not in results and 'polish' not in results
+
+
+def test_independent_stages_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(name):
+        def func(results):
+            barrier.wait()  # Deadlocks (and times out) unless both run at once
+            return name
+        return func
+
+    scheduler = StageScheduler(pipeline({'strategy': meet('strategy'), 'research': meet('research')}),
+                               max_workers=2)
+    assert scheduler.run()['polish'] == 'polish'
+
+
+def test_stages_run_in_the_callers_context():
+    marker = contextvars.ContextVar('marker', default=None)
+    marker.set('run-1')
+    scheduler = StageScheduler([PipelineStage('a', lambda results: marker.get())])
+    assert scheduler.run() == {'a': 'run-1'}
+
+
+def test_run_async_propagates_failures():
+    async def ok(results):
+        return 'ok'
+
+    async def fail(results):
+        return None
+
+    stages = [PipelineStage('a', ok), PipelineStage('b', fail, ['a']), PipelineStage('c', ok, ['b'])]
+    scheduler = StageScheduler(stages)
+    results = asyncio.run(scheduler.run_async())
+    assert results == {'a': 'ok'}
+    assert scheduler.failed == ['b']
+
+
+def test_run_async_limits_concurrency():
+    running = []
+    peak = []
+
+    async def stage(results):
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        return True
+
+    scheduler = StageScheduler([PipelineStage(f"s{i}", stage) for i in range(6)], max_workers=2)
+    asyncio.run(scheduler.run_async())
+    assert max(peak) == 2
@@ -0,0 +1,122 @@
+"""Tests for context_budget: token counting, truncation, section budgets and research compression."""
+
+import pytest
+
+from context_budget import (ContextBudget, compress_research, count_tokens, dedupe_items, split_sentences,
+                            truncate_to_tokens)
+
+
+LONG_TEXT = "\n".join(
+    f"- Point {i}: AI agents cut support costs by {i * 3}% in the first year. Teams report faster replies."
+    for i in range(1, 41)
+)
+
+
+def test_count_tokens_basics():
+    assert count_tokens("") == 0
+    assert count_tokens("word") >= 1
+    assert count_tokens(LONG_TEXT) > count_tokens(LONG_TEXT[:200])
+
+
+def test_split_sentences():
+    assert split_sentences("First one.  Second one!\nThird? yes") == ["First one.", "Second one!", "Third? yes"]
+
+
+def test_fit_keeps_text_within_budget():
+    budget = ContextBudget()
+    fitted = budget.fit(LONG_TEXT, 100)
+    assert count_tokens(fitted) <= 100
+    assert fitted.endswith(" ...")
+    assert LONG_TEXT.startswith(fitted[:-len(" ...")].rstrip())
+
+
+def test_fit_cuts_at_line_boundaries():
+    fitted = ContextBudget().fit(LONG_TEXT, 120)
+    for line in fitted[:-len(" ...")].splitlines():
+        assert line in LONG_TEXT.splitlines()
+
+
+def test_fit_returns_short_text_unchanged():
+    assert ContextBudget().fit("Short note.", 50) == "Short note."
+
+
+def test_fit_with_no_budget_is_empty():
+    assert ContextBudget().fit(LONG_TEXT, 0) == ""
+
+
+def test_fit_splits_a_single_long_sentence_by_words():
+    sentence = " ".join(["keyword"] * 500)
+    fitted = truncate_to_tokens(sentence, 30)
+    assert 0 < count_tokens(fitted) <= 30
+    assert set(fitted[:-len(" ...")].split()) == {"keyword"}
+
+
+@pytest.mark.parametrize('budget', [5, 20, 57, 300])
+def test_fit_never_exceeds_budget(budget):
+    assert count_tokens(ContextBudget().fit(LONG_TEXT, budget)) <= budget
+
+
+def test_allocate_uses_section_budgets():
+    budget = ContextBudget({'research': 600})
+    assert budget.allocate(['strategy', 'research', 'unknown']) == {'strategy': 250, 'research': 600, 'unknown': 0}
+
+
+def test_allocate_scales_down_to_prompt_ceiling():
+    budget = ContextBudget(max_prompt_tokens=1000)
+    budgets = budget.allocate(['strategy', 'seo', 'analysis', 'research'], fixed_tokens=400)
+    assert sum(budgets.values()) <= 600
+    assert budgets['research'] > budgets['analysis'] > budgets['strategy'] == budgets['seo']
+
+
+def test_from_config():
+    assert ContextBudget.from_config({'context_budget': {'enabled': False}}) is None
+    budget = ContextBudget.from_config({'context_budget': {'section_tokens': {'seo': 80}, 'max_prompt_tokens': 3000}})
+    assert budget.section_tokens['seo'] == 80 and budget.max_prompt_tokens == 3000
+
+
+SUBJECTS = {
+    'trends': "adoption across hospitals and clinics",
+    'competitors': "vendor pricing for enterprise platforms",
+    'data': "survey responses from support managers",
+    'news': "funding rounds announced by startups",
+}
+
+
+def research(count=8):
+    def results(category):
+        return [{'title': f"{category} report {i}", 'link': f"https://{category}{i}.example.com/post",
+                 'snippet': f"AI agents {SUBJECTS[category]} grew {i * 7}% last year. "
+                            f"Unrelated filler sentence number {i}. More filler about the weather {i}.",
+                 'date': "2 days ago"}
+                for i in range(count)]
+    return {'topic': "AI agents", **{key: results(key) for key in SUBJECTS}}
+
+
+@pytest.mark.parametrize('max_tokens', [150, 400, 1200])
+def test_compress_research_respects_budget(max_tokens):
+    block = compress_research(research(), max_tokens)
+    assert count_tokens(block) <= max_tokens
+    assert block.startswith("RESEARCH DATA: AI agents")
+
+
+def test_compress_research_shares_budget_between_categories():
+    block = compress_research(research(), 400)
+    for heading in ("MARKET TRENDS:", "COMPETITIVE LANDSCAPE:", "DATA & STATISTICS:", "LATEST NEWS:"):
+        assert heading in block
+    assert "(2 days ago)" in block  # News keeps its date
+
+
+def test_compress_research_keeps_relevant_sentences():
+    block = compress_research(research(count=1), 2000, sentences_per_source=1)
+    assert "grew" in block and "weather" not in block
+
+
+def test_dedupe_items_drops_repeated_urls_and_near_copies():
+    items = [
+        ('trends', 0, {'link': "https://www.example.com/a/", 'snippet': "Agents grow fast in retail banking"}),
+        ('data', 0, {'link': "http://example.com/a", 'snippet': "Totally different words here"}),
+        ('news', 0, {'link': "https://other.com/b", 'snippet': "Agents grow fast in retail banking"}),
+        ('news', 1, {'link': "https://third.com/c", 'snippet': "A new survey of support teams"}),
+    ]
+    kept = dedupe_items(items)
+    assert [(category, rank) for category, rank, _ in kept] == [('trends', 0), ('news', 1)]
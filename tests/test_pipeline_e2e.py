@@ -0,0 +1,110 @@
+"""End-to-end runs of the sync and async pipelines against the local mock APIs."""
+
+import asyncio
+import os
+
+import pytest
+import yaml
+
+from benchmark_pipeline import build_benchmark_config
+from instrumentation import RunMetrics
+from mock_servers import MockAPIServer, MockBackendConfig
+from rate_limiter import reset_rate_limiters
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOPIC = "How to prevent bartholin cyst"
+LLM_ROUTE = "/openai/v1/chat/completions"
+
+
+@pytest.fixture
+def mock_server():
+    with MockAPIServer(MockBackendConfig(llm_latency_ms=5, search_latency_ms=5,
+                                         jitter_ms=0, seed=7)) as server:
+        yield server
+
+
+@pytest.fixture
+def write_config(tmp_path, monkeypatch, mock_server):
+    """Return a factory writing a mock-backed config whose outputs land in tmp_path."""
+    monkeypatch.setenv('GROQ_API_KEY', 'mock-groq-key')
+    monkeypatch.setenv('SERPER_API_KEY', 'mock-serper-key')
+    monkeypatch.chdir(ROOT)
+    reset_rate_limiters()
+
+    def write(streaming=False, checkpoints=False):
+        config = build_benchmark_config(os.path.join(ROOT, 'blog_config.yaml'),
+                                        mock_server.base_url, streaming=streaming)
+        config['streaming']['output_dir'] = str(tmp_path / "streaming")
+        if streaming:
+            # The one-pass draft is the one that gets streamed
+            config['agents'].setdefault('writer', {})['sectioned_writing'] = False
+        config['checkpoints'] = {'enabled': checkpoints, 'runs_dir': str(tmp_path / "runs"),
+                                 'lock_wait_seconds': 5}
+        path = tmp_path / "config.yaml"
+        path.write_text(yaml.safe_dump(config))
+        return str(path)
+
+    yield write
+    reset_rate_limiters()
+
+
+def assert_completed(content, metrics, server, tmp_path, streaming):
+    assert content and content.strip()
+    assert metrics.status == 'succeeded'
+    stages = metrics.stage_records()
+    assert stages
+    assert all(record['status'] == 'completed' for record in stages.values()), stages
+    assert metrics.llm_calls
+    for route in ('/search', '/news', LLM_ROUTE):
+        assert server.request_counts.get(route, 0) > 0, server.request_counts
+    streamed = [call for call in metrics.llm_calls if call.get('streaming')]
+    assert bool(streamed) == streaming
+    if streaming:
+        assert all(call['success'] for call in streamed)
+        assert list((tmp_path / "streaming").glob("*.md"))
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_sync_pipeline(write_config, mock_server, tmp_path, streaming):
+    from competitive_blog_fixed_commented import CompetitiveBlogFixed
+
+    generator = CompetitiveBlogFixed(write_config(streaming=streaming))
+    metrics = RunMetrics(TOPIC)
+    content = generator.generate_competitive_blog(TOPIC, run_metrics=metrics)
+
+    assert_completed(content, metrics, mock_server, tmp_path, streaming)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_async_pipeline(write_config, mock_server, tmp_path, streaming):
+    from async_competitive_blog import AsyncCompetitiveBlog
+
+    async def run():
+        generator = AsyncCompetitiveBlog(write_config(streaming=streaming))
+        try:
+            metrics = RunMetrics(TOPIC)
+            content = await generator.generate_competitive_blog(TOPIC, run_metrics=metrics)
+            return content, metrics
+        finally:
+            await generator.aclose()
+
+    content, metrics = asyncio.run(run())
+
+    assert_completed(content, metrics, mock_server, tmp_path, streaming)
+
+
+def test_resume_skips_checkpointed_stages(write_config, mock_server, tmp_path):
+    from competitive_blog_fixed_commented import CompetitiveBlogFixed
+
+    generator = CompetitiveBlogFixed(write_config(checkpoints=True))
+    first = generator.generate_competitive_blog(TOPIC, run_metrics=RunMetrics(TOPIC))
+    assert first
+    llm_requests = mock_server.request_counts[LLM_ROUTE]
+
+    metrics = RunMetrics(TOPIC)
+    second = generator.generate_competitive_blog(TOPIC, resume=True, run_metrics=metrics)
+
+    assert second == first
+    assert mock_server.request_counts[LLM_ROUTE] == llm_requests
+    assert not metrics.llm_calls
+    assert not list((tmp_path / "runs").glob("*/.lock"))
@@ -0,0 +1,103 @@
+"""Tests for rate_limiter.TokenBucket, driven by a fake clock."""
+
+import asyncio
+import threading
+
+import pytest
+
+import rate_limiter
+from rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', fake)
+
+    async def fake_sleep(seconds):
+        fake.sleep(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, 'sleep', fake_sleep)
+    return fake
+
+
+def test_starts_full_and_reports_wait_when_empty(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=2)
+    assert bucket.try_acquire(10) == 0.0
+    assert bucket.try_acquire(4) == pytest.approx(2.0)  # 4 units at 2/s
+
+
+def test_refills_over_time_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=2)
+    bucket.try_acquire(10)
+    clock.now += 3
+    assert bucket.try_acquire(6) == 0.0
+    assert bucket.try_acquire(1) == pytest.approx(0.5)
+
+    clock.now += 3600
+    assert bucket.utilization() == pytest.approx(0.0)  # Never above capacity
+
+
+def test_failed_try_acquire_takes_nothing(clock):
+    bucket = TokenBucket(capacity=5, refill_per_second=1)
+    bucket.try_acquire(4)
+    assert bucket.try_acquire(3) > 0
+    assert bucket.try_acquire(1) == 0.0
+
+
+def test_request_larger_than_capacity_is_capped(clock):
+    bucket = TokenBucket(capacity=5, refill_per_second=1)
+    assert bucket.try_acquire(50) == 0.0
+    assert bucket.utilization() == pytest.approx(1.0)
+
+
+def test_acquire_sleeps_until_available(clock):
+    bucket = TokenBucket(capacity=4, refill_per_second=2)
+    bucket.try_acquire(4)
+    assert bucket.acquire(3) == pytest.approx(1.5)
+    assert clock.slept == [pytest.approx(1.5)]
+
+
+def test_acquire_async_waits_without_blocking(clock):
+    bucket = TokenBucket(capacity=4, refill_per_second=4)
+    bucket.try_acquire(4)
+    assert asyncio.run(bucket.acquire_async(2)) == pytest.approx(0.5)
+
+
+def test_consume_can_overdraw_and_delays_callers(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    bucket.consume(15)
+    assert bucket.utilization() == pytest.approx(1.5)
+    assert bucket.try_acquire(1) == pytest.approx(6.0)  # Pay back 5, then 1 more
+
+
+def test_concurrent_acquires_never_oversubscribe():
+    bucket = TokenBucket(capacity=100, refill_per_second=0.001)
+    granted = []
+
+    def worker():
+        for _ in range(50):
+            if bucket.try_acquire(1) == 0.0:
+                granted.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(granted) == 100
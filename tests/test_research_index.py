@@ -0,0 +1,87 @@
+"""Tests for research_index: URL normalization, deduplication and ranking."""
+
+import pytest
+
+from research_index import ResearchIndex, canonical_url, rank_items, rerank_research, shingles
+
+
+def result(link, snippet, title="A page"):
+    return {'link': link, 'title': title, 'snippet': snippet}
+
+
+@pytest.mark.parametrize('url, canonical', [
+    ("https://www.Example.com/a/?utm_source=x#top", "example.com/a"),
+    ("http://example.com/a", "example.com/a"),
+    ("https://example.com/a?b=2&a=1&gclid=zz", "example.com/a?a=1&b=2"),
+    ("https://example.com/a?ref=feed", "example.com/a"),
+    ("", ""),
+])
+def test_canonical_url(url, canonical):
+    assert canonical_url(url) == canonical
+
+
+def test_shingles():
+    assert shingles("one two") == {"one two"}
+    assert shingles("One two three four") == {"one two three", "two three four"}
+    assert shingles("") == set()
+
+
+def test_same_page_under_another_url_spelling_is_counted_once():
+    index = ResearchIndex("AI agents")
+    assert index.add('trends', result("https://www.example.com/report/", "AI agents adoption doubled in 2025"))
+    assert not index.add('data', result("http://example.com/report?utm_campaign=x", "Different snippet text"))
+
+    assert index.top('data') == []
+    assert index.top('trends')[0]['times_found'] == 2
+    assert index.stats() == {'results_seen': 2, 'distinct_sources': 1, 'duplicate_urls': 1, 'near_duplicates': 0}
+
+
+def test_syndicated_copy_is_a_near_duplicate():
+    snippet = ("Enterprise teams deploying AI agents for customer support reported a forty percent drop "
+               "in average handling time according to the annual industry survey published this spring")
+    index = ResearchIndex("AI agents")
+    assert index.add('trends', result("https://origin.com/story", snippet))
+    assert not index.add('news', result("https://mirror.net/copy", snippet + " today", title="Copy"))
+    assert index.stats()['near_duplicates'] == 1
+
+
+def test_distinct_snippets_are_kept():
+    index = ResearchIndex("AI agents")
+    index.add_all('trends', [
+        result("https://a.com/1", "AI agents are moving from pilots into production at large banks"),
+        result("https://b.com/2", "Hospitals use scheduling assistants to reduce missed appointments"),
+    ])
+    assert index.stats()['distinct_sources'] == 2
+
+
+def test_top_ranks_by_relevance_and_limits():
+    index = ResearchIndex("AI agents customer support")
+    index.add_all('trends', [
+        result("https://a.com", "Gardening tips for spring tomatoes and peppers"),
+        result("https://b.com", "AI agents now handle customer support tickets end to end"),
+        result("https://c.com", "Support teams adopt AI tools"),
+    ])
+    top = index.top('trends', k=2)
+    assert [item['link'] for item in top] == ["https://b.com", "https://c.com"]
+    assert top[0]['relevance'] > top[1]['relevance'] > 0
+
+
+def test_top_with_focus_changes_ranking():
+    index = ResearchIndex("AI agents")
+    index.add_all('trends', [
+        result("https://a.com", "AI agents in healthcare triage"),
+        result("https://b.com", "AI agents in retail pricing"),
+    ])
+    assert index.top('trends', focus=["retail pricing"])[0]['link'] == "https://b.com"
+    assert index.top('trends', focus=["healthcare triage"])[0]['link'] == "https://a.com"
+
+
+def test_rank_items_keeps_search_order_on_ties():
+    items = [result(f"https://{name}.com", "unrelated words") for name in "abc"]
+    assert [item['link'] for item in rank_items(items, "AI agents")] == [item['link'] for item in items]
+
+
+def test_rerank_research_without_focus_is_a_no_op():
+    research = {'topic': "AI agents", 'trends': [result("https://a.com", "x")]}
+    assert rerank_research(research, []) is research
+    assert rerank_research(research, ["angle"])['trends'][0]['relevance'] == 0.0
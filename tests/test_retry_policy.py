@@ -0,0 +1,246 @@
+"""Tests for retry_policy: header parsing, error classification and the retry loop."""
+
+import asyncio
+import random
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from retry_policy import (RetryDecision, RetryExhausted, RetryPolicy, classify_error, parse_duration,
+                          retry_after_from_headers)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HTTPError(Exception):
+    """Shaped like the groq / httpx errors: the response hangs off .response."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+class APIConnectionError(Exception):
+    """Same name as the groq SDK's transport error."""
+
+
+# ----------------------------------------------------------------------------
+# parse_duration
+# ----------------------------------------------------------------------------
+@pytest.mark.parametrize('value, seconds', [
+    ("2", 2.0),
+    ("1.5", 1.5),
+    (" 7 ", 7.0),
+    ("-3", 0.0),
+    ("250ms", 0.25),
+    ("2m59.56s", 179.56),
+    ("1h2m", 3720.0),
+    ("1h0m0.5s", 3600.5),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize('value', [None, "", "soon", "2x", "5s later"])
+def test_parse_duration_unreadable(value):
+    assert parse_duration(value) is None
+
+
+def test_parse_duration_http_date():
+    assert parse_duration(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_duration(formatdate(time.time() - 30, usegmt=True)) == 0.0
+
+
+# ----------------------------------------------------------------------------
+# retry_after_from_headers
+# ----------------------------------------------------------------------------
+def test_retry_after_ms_wins():
+    assert retry_after_from_headers({'Retry-After': '10', 'retry-after-ms': '1500'}) == pytest.approx(1.5)
+
+
+def test_retry_after_is_case_insensitive():
+    assert retry_after_from_headers({'RETRY-AFTER': '4'}) == 4.0
+
+
+def test_exhausted_budget_reset_is_used():
+    headers = {
+        'x-ratelimit-remaining-requests': '12', 'x-ratelimit-reset-requests': '2s',
+        'x-ratelimit-remaining-tokens': '0', 'x-ratelimit-reset-tokens': '7.66s',
+    }
+    assert retry_after_from_headers(headers) == pytest.approx(7.66)
+
+
+def test_longest_exhausted_reset_wins():
+    headers = {
+        'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '2m59.56s',
+        'x-ratelimit-remaining-tokens': '0', 'x-ratelimit-reset-tokens': '7.66s',
+    }
+    assert retry_after_from_headers(headers) == pytest.approx(179.56)
+
+
+def test_shortest_reset_without_exhausted_budget():
+    headers = {'x-ratelimit-reset-requests': '3s', 'x-ratelimit-reset-tokens': '500ms'}
+    assert retry_after_from_headers(headers) == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize('headers', [None, {}, {'content-type': 'application/json'}])
+def test_no_hint(headers):
+    assert retry_after_from_headers(headers) is None
+
+
+# ----------------------------------------------------------------------------
+# classify_error
+# ----------------------------------------------------------------------------
+def test_rate_limit_carries_server_wait():
+    decision = classify_error(HTTPError(429, {'retry-after': '12'}))
+    assert (decision.retryable, decision.reason, decision.status, decision.retry_after) == \
+        (True, 'rate_limit', 429, 12.0)
+
+
+@pytest.mark.parametrize('status', [500, 502, 503, 504, 599, 408])
+def test_server_errors_are_retryable(status):
+    decision = classify_error(HTTPError(status))
+    assert decision.retryable and decision.reason == f'http_{status}'
+
+
+@pytest.mark.parametrize('status', [400, 401, 403, 404, 422, 418])
+def test_client_errors_are_fatal(status):
+    assert not classify_error(HTTPError(status)).retryable
+
+
+def test_status_code_on_the_error_itself():
+    error = Exception("bad key")
+    error.status_code = 401
+    assert classify_error(error).status == 401
+
+
+@pytest.mark.parametrize('error', [
+    requests.ConnectionError("reset"), requests.Timeout("slow"), TimeoutError(), ConnectionError(),
+    asyncio.TimeoutError(), APIConnectionError("dropped"),
+])
+def test_transport_errors_are_retryable(error):
+    assert classify_error(error).reason == 'connection'
+
+
+@pytest.mark.parametrize('error', [TypeError("x"), KeyError("x"), AttributeError("x")])
+def test_programming_errors_are_fatal(error):
+    assert not classify_error(error).retryable
+
+
+def test_message_only_rate_limit():
+    decision = classify_error(RuntimeError("Error code: 429 - Rate limit reached"))
+    assert decision.reason == 'rate_limit' and decision.retryable
+
+
+def test_unknown_errors_are_retried():
+    assert classify_error(RuntimeError("something odd")).reason == 'error'
+
+
+# ----------------------------------------------------------------------------
+# RetryPolicy
+# ----------------------------------------------------------------------------
+def policy(**kwargs):
+    settings = dict(max_attempts=3, base_delay=1.0, max_delay=10.0, verbose=False, rng=random.Random(7))
+    settings.update(kwargs)
+    return RetryPolicy("Test", **settings)
+
+
+def test_backoff_stays_within_window():
+    retry = policy()
+    previous = 0.0
+    for _ in range(50):
+        delay = retry.next_delay(previous, RetryDecision(True, 'error'))
+        assert 1.0 <= delay <= min(10.0, max(1.0, previous * 3))
+        previous = delay
+
+
+def test_server_hint_is_honoured_with_jitter():
+    delay = policy(hint_jitter=0.1).next_delay(0.0, RetryDecision(True, 'rate_limit', 429, 5.0))
+    assert 5.0 <= delay <= 5.5
+
+
+def test_too_long_server_hint_gives_up():
+    assert policy(max_retry_after=60).next_delay(0.0, RetryDecision(True, 'rate_limit', 429, 3600)) is None
+
+
+def test_call_retries_then_succeeds(monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    outcomes = [HTTPError(503), HTTPError(429, {'retry-after': '2'}), 'ok']
+
+    def attempt():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    telemetry = RetryPolicy.new_telemetry()
+    assert policy().call(attempt, telemetry=telemetry) == 'ok'
+    assert telemetry['attempts'] == 3
+    assert telemetry['retries'] == 2
+    assert telemetry['retry_reasons'] == ['http_503', 'rate_limit']
+    assert telemetry['server_hinted_waits'] == 1
+    assert not telemetry['fatal']
+
+
+def test_call_stops_on_fatal_error():
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        raise HTTPError(401)
+
+    telemetry = RetryPolicy.new_telemetry()
+    with pytest.raises(RetryExhausted) as error:
+        policy().call(attempt, telemetry=telemetry)
+    assert len(calls) == 1
+    assert error.value.attempts == 1 and telemetry['fatal']
+    assert isinstance(error.value.last_error, HTTPError)
+
+
+def test_call_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+
+    def attempt():
+        raise ConnectionError("down")
+
+    with pytest.raises(RetryExhausted) as error:
+        policy(max_attempts=4).call(attempt)
+    assert error.value.attempts == 4
+    assert error.value.decision.reason == 'connection'
+
+
+def test_call_async_retries(monkeypatch):
+    async def no_sleep(seconds):
+        return None
+
+    monkeypatch.setattr(asyncio, 'sleep', no_sleep)
+    outcomes = [ConnectionError("down"), 'ok']
+
+    async def attempt():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    telemetry = RetryPolicy.new_telemetry()
+    assert asyncio.run(policy().call_async(attempt, telemetry=telemetry)) == 'ok'
+    assert telemetry['retries'] == 1
+
+
+def test_from_config_reads_retry_section():
+    retry = RetryPolicy.from_config("LLM call", 'llm', {
+        'max_retries': 9,
+        'retry': {'llm': {'max_attempts': 5, 'base_delay_seconds': 0.5}, 'max_retry_after_seconds': 30},
+    }, verbose=False)
+    assert (retry.max_attempts, retry.base_delay, retry.max_retry_after) == (5, 0.5, 30)
+
+
+def test_from_config_falls_back_to_legacy_keys():
+    retry = RetryPolicy.from_config("Search", 'search', {'max_retries': 2}, verbose=False)
+    assert retry.max_attempts == 2 and retry.base_delay == 0.5
@@ -0,0 +1,143 @@
+"""Tests for run_checkpoints: fingerprint chaining, saved outputs and the run lock."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from run_checkpoints import RunCheckpointStore, config_section
+
+
+CONFIG = {
+    'llm': {'model': 'llama-3.3-70b-versatile', 'temperature': 0.6},
+    'agents': {'writer': {'target_word_count': 2500}, 'editor': {'readability_target': 60}},
+}
+
+# (stage, config sections it reads, upstream stages) in dependency order
+GRAPH = [
+    ('strategy', ['llm'], []),
+    ('seo', ['llm'], ['strategy']),
+    ('write', ['llm', 'agents.writer'], ['strategy', 'seo']),
+    ('polish', ['llm', 'agents.editor'], ['write']),
+]
+
+
+def chain(config, topic="AI agents"):
+    """Fingerprints for GRAPH, chained the way the generator chains them."""
+    fingerprints = {}
+    for stage, keys, upstream in GRAPH:
+        fingerprints[stage] = RunCheckpointStore.fingerprint(
+            topic, stage, config, keys, [fingerprints[name] for name in upstream])
+    return fingerprints
+
+
+def with_value(config, dotted_key, value):
+    updated = json.loads(json.dumps(config))
+    section = updated
+    *parents, last = dotted_key.split('.')
+    for part in parents:
+        section = section[part]
+    section[last] = value
+    return updated
+
+
+def test_config_section_lookup():
+    assert config_section(CONFIG, 'agents.editor') == {'readability_target': 60}
+    assert config_section(CONFIG, 'agents.missing.deeper') is None
+    assert config_section(CONFIG, 'llm.model.deeper') is None
+
+
+def test_fingerprints_are_stable_and_topic_specific():
+    assert chain(CONFIG) == chain(json.loads(json.dumps(CONFIG)))
+    assert chain(CONFIG)['strategy'] != chain(CONFIG, topic="Other topic")['strategy']
+
+
+def test_editor_change_invalidates_only_polish():
+    before, after = chain(CONFIG), chain(with_value(CONFIG, 'agents.editor.readability_target', 70))
+    assert [stage for stage in before if before[stage] != after[stage]] == ['polish']
+
+
+def test_writer_change_invalidates_write_and_downstream():
+    before, after = chain(CONFIG), chain(with_value(CONFIG, 'agents.writer.target_word_count', 1500))
+    assert [stage for stage in before if before[stage] != after[stage]] == ['write', 'polish']
+
+
+def test_model_change_invalidates_everything():
+    before, after = chain(CONFIG), chain(with_value(CONFIG, 'llm.model', 'llama-3.1-8b-instant'))
+    assert all(before[stage] != after[stage] for stage in before)
+
+
+def test_fingerprint_ignores_key_and_upstream_order():
+    forward = RunCheckpointStore.fingerprint("t", "write", CONFIG, ['llm', 'agents.writer'], ['a', 'b'])
+    backward = RunCheckpointStore.fingerprint("t", "write", CONFIG, ['agents.writer', 'llm'], ['b', 'a'])
+    assert forward == backward
+
+
+def test_save_and_load(tmp_path):
+    store = RunCheckpointStore(str(tmp_path / "run"))
+    output = {'primary_keyword': 'ai agents', 'keywords': ['a', 'b']}
+    store.save('seo', 'fp1', output)
+
+    assert store.load('seo', 'fp1') == output
+    assert store.load('seo', 'fp2') is None  # Stale fingerprint
+    assert store.load('write', 'fp1') is None
+    assert store.completed_stages() == ['seo']
+    assert not any(name.endswith('.tmp') for name in os.listdir(store.run_dir))
+
+
+def test_corrupt_checkpoint_is_ignored(tmp_path):
+    store = RunCheckpointStore(str(tmp_path))
+    (tmp_path / "write.json").write_text("{not json", encoding='utf-8')
+    assert store.load('write', 'fp') is None
+
+
+def test_lock_is_exclusive_until_released(tmp_path):
+    first, second = RunCheckpointStore(str(tmp_path)), RunCheckpointStore(str(tmp_path))
+    assert first.acquire(timeout=0)
+    assert not second.acquire(timeout=0.2, poll_seconds=0.05)
+
+    first.release()
+    assert not os.path.exists(first.lock_path)
+    assert second.acquire(timeout=0)
+    second.release()
+
+
+def test_lock_files_are_not_listed_as_stages(tmp_path):
+    store = RunCheckpointStore(str(tmp_path))
+    store.acquire(timeout=0)
+    assert store.completed_stages() == []
+    store.release()
+
+
+def test_release_leaves_another_owners_lock(tmp_path):
+    store = RunCheckpointStore(str(tmp_path))
+    store.acquire(timeout=0)
+    with open(store.lock_path, 'w', encoding='utf-8') as f:
+        json.dump({'pid': os.getpid(), 'token': 'someone-else'}, f)  # Taken over meanwhile
+    store.release()
+    assert os.path.exists(store.lock_path)
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="process liveness is not checked on Windows")
+def test_lock_of_dead_process_is_taken_over(tmp_path):
+    finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+    finished.wait()
+    store = RunCheckpointStore(str(tmp_path))
+    with open(store.lock_path, 'w', encoding='utf-8') as f:
+        json.dump({'pid': finished.pid, 'token': 'stale'}, f)
+
+    assert store.acquire(timeout=0)
+    store.release()
+
+
+def test_lock_holds_across_processes(tmp_path):
+    store = RunCheckpointStore(str(tmp_path))
+    assert store.acquire(timeout=0)
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = ("import sys; sys.path.insert(0, sys.argv[1]); from run_checkpoints import RunCheckpointStore; "
+             "print(RunCheckpointStore(sys.argv[2]).acquire(timeout=0.2, poll_seconds=0.05))")
+    result = subprocess.run([sys.executable, '-c', probe, repo, str(tmp_path)], capture_output=True, text=True)
+    assert result.stdout.strip() == 'False'
+    store.release()
@@ -0,0 +1,165 @@
+"""Tests for seo_metrics: section splitting, heading repair and the whole-post report."""
+
+import pytest
+
+from seo_metrics import (MarkdownSection, analyze_post, failed_checks, fix_heading_structure, flesch_reading_ease,
+                         heading_problems, headings, join_sections, keyword_density, keyword_occurrences,
+                         plain_text, section_issues, split_meta_description, split_sections)
+
+
+POST = """Intro line before any heading.
+
+# AI Agents for Customer Support
+
+Short opening paragraph.
+
+## Why Teams Adopt Them
+
+Agents answer simple tickets fast.
+
+### A Deeper Heading
+
+Stays inside its H2 section.
+
+```python
+# not a heading
+print("## also not a heading")
+```
+
+## Getting Started   ##
+
+Pick one queue and measure it.
+No trailing newline here"""
+
+
+def test_split_sections_round_trip():
+    sections = split_sections(POST)
+    assert join_sections(sections) == POST
+    assert [section.heading for section in sections] == [
+        "", "AI Agents for Customer Support", "Why Teams Adopt Them", "Getting Started"]
+
+
+def test_split_sections_keeps_deeper_headings_and_code_inside():
+    why = split_sections(POST)[2]
+    assert "### A Deeper Heading" in why.text
+    assert "# not a heading" in why.text
+
+
+def test_split_sections_at_deeper_level():
+    sections = split_sections(POST, max_level=3)
+    assert "A Deeper Heading" in [section.heading for section in sections]
+    assert join_sections(sections) == POST
+
+
+@pytest.mark.parametrize('markdown', ["", "No headings at all.\n", "## Only\n", "\n\n## A\n\n\n## B\n\n"])
+def test_split_sections_round_trip_edge_cases(markdown):
+    assert join_sections(split_sections(markdown)) == markdown
+
+
+def test_section_body():
+    assert MarkdownSection("Title", "## Title\nBody text\n").body == "Body text\n"
+    assert MarkdownSection("Title", "## Title").body == ""
+    assert MarkdownSection("", "Preamble\n").body == "Preamble\n"
+
+
+def test_plain_text_strips_markup():
+    text = plain_text("## Heading\n- **Bold** [link](https://x.com) `code`\n![img](a.png)\n```\nblock\n```\n")
+    assert "Heading" not in text and "https" not in text and "block" not in text
+    assert "Bold link code" in " ".join(text.split())
+
+
+def test_keyword_matching_is_whole_phrase_and_case_insensitive():
+    text = "AI agents help. Ai-Agents scale. Agentsmith is unrelated."
+    assert keyword_occurrences(text, "AI agents") == 2
+    assert keyword_density("ai agents ai agents", "ai agents") == 100.0
+
+
+def test_flesch_reading_ease_orders_texts():
+    easy = "The cat sat. It was warm. We had fun."
+    hard = ("Organizational implementations of conversational automation necessitate comprehensive "
+            "infrastructural modernization initiatives.")
+    assert flesch_reading_ease(easy) > 80 > flesch_reading_ease(hard)
+    assert flesch_reading_ease("") is None
+
+
+def test_section_issues():
+    thresholds = {'min_reading_ease': 50, 'max_sentence_words': 25, 'max_keyword_density': 3.0,
+                  'min_check_words': 10}
+    stuffed = MarkdownSection("S", "## S\n" + "AI agents are great. " * 20)
+    assert any("AI agents" in issue for issue in section_issues(stuffed, ["AI agents"], thresholds))
+    short = MarkdownSection("S", "## S\nToo short to judge.\n")
+    assert section_issues(short, ["AI agents"], thresholds) == []
+
+
+def test_heading_problems():
+    assert heading_problems("# T\n## A\n## B\n") == []
+    problems = heading_problems("## A\n#### Deep\n# One\n# Two\n")
+    assert any("H1 headings" in problem for problem in problems)
+    assert any("skips from H2 to H4" in problem for problem in problems)
+    assert any("H2 sections" in problem for problem in problems)
+
+
+def test_split_meta_description():
+    post, description = split_meta_description("# T\n\nBody.\n\n**Meta description:** A short summary.\n")
+    assert description == "A short summary."
+    assert "Meta description" not in post
+    assert split_meta_description("# T\n") == ("# T\n", None)
+
+
+SETTINGS = {
+    'min_word_count': 20, 'max_word_count': 400, 'min_reading_ease': 40, 'max_keyword_density': 5.0,
+    'min_h2_sections': 2, 'meta_description_min_chars': 40, 'meta_description_max_chars': 160,
+}
+
+
+def good_post():
+    filler = ("Most tickets ask the same few things. A clear answer saves time for the customer. "
+              "People can then spend more time on the rare, hard problems. ") * 3
+    return (f"# AI Agents in Support\n\nSupport teams use AI agents to answer simple questions. {filler}\n\n"
+            f"## How It Works\n\n{filler}\n\n## Where to Start\n\n{filler}\n\n"
+            "Meta description: How support teams use AI agents to answer simple questions faster.\n")
+
+
+def test_analyze_post_passes_a_good_post():
+    report = analyze_post(good_post(), ["AI agents"], ["support teams"], SETTINGS)
+    assert report['passed'], failed_checks(report)
+    assert set(report['checks']) == {'word_count', 'readability', 'keyword_density', 'headings', 'meta_description'}
+    assert report['metrics']['headings'] == 3
+    assert failed_checks(report) == []
+
+
+def test_analyze_post_reports_each_failure():
+    post = good_post().replace("# AI Agents in Support", "## Not A Title").replace("Meta description:", "Note:")
+    report = analyze_post(post, ["AI agents", "chatbots"], [], {**SETTINGS, 'max_word_count': 30})
+    failed = {name for name, result in report['checks'].items() if not result['passed']}
+    assert failed == {'word_count', 'keyword_density', 'headings', 'meta_description'}
+    assert report['checks']['keyword_density']['missing'] == ["chatbots"]
+    assert not report['passed']
+    assert len(failed_checks(report)) == 4
+
+
+def test_analyze_post_switches():
+    report = analyze_post(good_post(), ["AI agents"], [], {
+        **SETTINGS, 'readability_check': False, 'keyword_density_check': False, 'meta_description_check': False})
+    assert set(report['checks']) == {'word_count', 'headings'}
+
+
+def test_fix_heading_structure_repairs_without_rewriting():
+    post = ("Intro text.\n\n## Overview\n\nBody one.\n\n#### Too Deep\n\nBody two.\n\n"
+            "# Second Title\n\nBody three.\n\n##   \n\n```\n# code comment\n```\n")
+    fixed = fix_heading_structure(post, "AI Agents Guide")
+
+    assert headings(fixed) == [(1, "AI Agents Guide"), (2, "Overview"), (3, "Too Deep"), (2, "Second Title")]
+    assert heading_problems(fixed) == []
+    for text in ("Intro text.", "Body one.", "Body two.", "Body three.", "# code comment"):
+        assert text in fixed
+
+
+def test_fix_heading_structure_keeps_a_leading_h1():
+    post = "# Real Title\n\n## A\n\nText.\n\n## B\n\nText.\n"
+    assert fix_heading_structure(post, "Unused") == post
+
+
+def test_fix_heading_structure_demotes_a_late_h1():
+    fixed = fix_heading_structure("## A\n\nText.\n\n# Late Title\n\nText.\n", "Guide")
+    assert headings(fixed) == [(1, "Guide"), (2, "A"), (2, "Late Title")]
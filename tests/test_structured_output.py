@@ -0,0 +1,112 @@
+"""Tests for structured_output: tolerant JSON extraction, repairs and schema validation."""
+
+import json
+
+import pytest
+
+from structured_output import (SEO_REQUIRED, SEO_SCHEMA, STRATEGY_REQUIRED, STRATEGY_SCHEMA, StructuredResult,
+                               _repair, build_reask_prompt, extract_json, fill_defaults, parse_structured)
+
+
+def test_plain_json():
+    assert extract_json('{"a": 1}') == ({'a': 1}, [])
+
+
+def test_json_inside_prose_and_code_fence():
+    reply = 'Here is the analysis:\n```json\n{"search_intent": "informational"}\n```\nHope it helps!'
+    assert extract_json(reply) == ({'search_intent': 'informational'}, [])
+
+
+@pytest.mark.parametrize('broken, repair', [
+    ("{'a': 'b'}", 'single quotes'),
+    ('{"a": "b",}', 'trailing commas'),
+    ('{a: "b"}', 'unquoted keys'),
+    ('{"a": True, "b": None}', 'python literals'),
+    ('{"a": "b" // note\n}', 'comments'),
+    ('{“a”: “b”}', 'smart quotes'),
+    ('{"a": "b"\n"c": "d"}', 'missing commas'),
+])
+def test_repair_fixes_common_slips(broken, repair):
+    fixed, applied = _repair(broken)
+    assert repair in applied
+    assert isinstance(json.loads(fixed), dict)
+
+
+def test_repair_leaves_string_contents_alone():
+    fixed, applied = _repair('{"note": "it\'s // not a comment, True",}')
+    assert json.loads(fixed) == {'note': "it's // not a comment, True"}
+    assert applied == ['trailing commas']
+
+
+def test_repair_of_valid_json_is_a_no_op():
+    assert _repair('{"a": [1, 2], "b": {"c": null}}') == ('{"a": [1, 2], "b": {"c": null}}', [])
+
+
+def test_truncated_reply_is_closed():
+    data, repairs = extract_json('{"primary_keywords": ["ai agents", "automation"], "search_intent": "inform')
+    assert data == {'primary_keywords': ['ai agents', 'automation'], 'search_intent': 'inform'}
+    assert repairs == ['truncated']
+
+
+def test_truncated_reply_drops_dangling_key():
+    data, _ = extract_json('{"a": "done", "b": {"c": ["x"], "d":')
+    assert data == {'a': 'done', 'b': {'c': ['x']}}
+
+
+def test_schema_picks_the_best_matching_object():
+    reply = '{"example": true}\nActual answer: {"primary_keywords": ["x"], "search_intent": "commercial"}'
+    data, _ = extract_json(reply, SEO_SCHEMA)
+    assert data['search_intent'] == 'commercial'
+    assert extract_json(reply)[0] == {'example': True}  # Without a schema the first object wins
+
+
+@pytest.mark.parametrize('reply', [None, "", "no json here", "[1, 2, 3]", "{not: fixable: at all"])
+def test_unusable_replies(reply):
+    assert extract_json(reply)[0] is None
+
+
+def test_parse_structured_coerces_to_schema():
+    reply = json.dumps({
+        'primary_keywords': "ai agents, customer support; automation",
+        'secondary_keywords': ["chatbots", 42, None, ""],
+        'search_intent': ["informational", "commercial"],
+        'content_structure': {'h1': 7, 'h2_sections': "- Why\n- How"},
+        'meta_optimization': {'title': "  Title  ", 'description': ""},
+        'extra_field': "kept",
+    })
+    result = parse_structured(reply, SEO_SCHEMA, SEO_REQUIRED)
+    assert result.data['primary_keywords'] == ["ai agents", "customer support", "automation"]
+    assert result.data['secondary_keywords'] == ["chatbots", "42"]
+    assert result.data['search_intent'] == "informational, commercial"
+    assert result.data['content_structure'] == {'h1': "7", 'h2_sections': ["Why", "How"]}
+    assert result.data['meta_optimization'] == {'title': "Title"}
+    assert result.data['extra_field'] == "kept"
+    assert result.missing == ['meta_optimization.description']
+
+
+def test_reask_merge_never_overwrites():
+    first = parse_structured('{"content_angles": ["A"], "target_audience": {"primary": "CTOs"}}',
+                             STRATEGY_SCHEMA, STRATEGY_REQUIRED)
+    assert first.missing == ['strategic_positioning.unique_value']
+
+    prompt = build_reask_prompt("Strategy", "AI agents", first, STRATEGY_SCHEMA)
+    assert '"unique_value": "..."' in prompt and "CTOs" in prompt
+
+    reply = parse_structured('{"strategic_positioning": {"unique_value": "Hands-on"}, '
+                             '"target_audience": {"primary": "Everyone"}}', STRATEGY_SCHEMA, STRATEGY_REQUIRED)
+    first.merge(reply, STRATEGY_REQUIRED)
+    assert first.missing == []
+    assert first.data['target_audience']['primary'] == "CTOs"
+    assert first.data['strategic_positioning']['unique_value'] == "Hands-on"
+
+
+def test_fill_defaults():
+    defaults = {'target_audience': {'primary': "Readers"}, 'content_angles': ["Guide"],
+                'strategic_positioning': {'unique_value': "Practical"}}
+    partial = parse_structured('{"content_angles": ["Own angle"]}', STRATEGY_SCHEMA, STRATEGY_REQUIRED)
+    assert fill_defaults(partial, defaults) == ['target_audience.primary', 'strategic_positioning.unique_value']
+    assert partial.data['content_angles'] == ["Own angle"] and partial.missing == []
+
+    empty = StructuredResult(missing=list(STRATEGY_REQUIRED))
+    fill_defaults(empty, defaults)
+    assert empty.data == defaults and empty.defaulted == STRATEGY_REQUIRED
@@ -0,0 +1,107 @@
+"""Tests for topic_index: nearest-topic reuse and the guards against false matches."""
+
+import json
+
+import pytest
+
+from topic_index import (TopicIndex, adapt_result, leftover_source_words, topic_similarity, topic_words,
+                         unmatched_words)
+
+
+STRATEGY = {
+    'target_audience': {'primary': "Women researching how to prevent bartholin cyst"},
+    'content_angles': ["Daily habits that help prevent bartholin cyst"],
+}
+SEO = {
+    'primary_keywords': ["how to prevent bartholin cyst", "bartholin cyst"],
+    'secondary_keywords': ["bartholin gland", "bartholin cyst prevention tips"],
+    'meta_optimization': {'title': "How to Prevent Bartholin Cyst", 'focus_keyword': "how to prevent bartholin cyst"},
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TopicIndex(str(tmp_path / "topics.json"))
+    index.remember("How to prevent bartholin cyst", 'strategy', STRATEGY)
+    index.remember("How to prevent bartholin cyst", 'seo', SEO)
+    return index
+
+
+def test_topic_words_drop_question_words():
+    assert topic_words("What is the best guide to AI agents?") == ['ai', 'agents']
+
+
+def test_similarity_ignores_word_order_and_plurals():
+    assert topic_similarity("bartholin cyst prevention", "prevention bartholin cysts") > 0.8
+    assert topic_similarity("bartholin cyst", "kubernetes autoscaling") < 0.2
+
+
+def test_unmatched_words():
+    assert unmatched_words("ovarian cyst", "how to prevent bartholin cyst") == ['ovarian']
+    assert unmatched_words("preventing bartholin cysts", "how to prevent bartholin cyst") == []
+
+
+def test_reworded_topic_is_reused(index):
+    reused = index.lookup("how to prevent bartholin cysts", 'strategy')
+    assert reused is not None
+    assert reused['source_topic'] == "How to prevent bartholin cyst"
+    assert reused['similarity'] >= index.similarity_threshold
+    assert index.stats()['hits']['strategy'] == 1
+
+
+def test_seo_reuse_refocuses_keywords(index):
+    reused = index.lookup("how to prevent bartholin cysts", 'seo')['data']
+    assert reused['primary_keywords'][0] == "how to prevent bartholin cysts"
+    assert reused['meta_optimization']['focus_keyword'] == "how to prevent bartholin cysts"
+    assert SEO['primary_keywords'][0] == "how to prevent bartholin cyst"  # Stored entry untouched
+
+
+@pytest.mark.parametrize('topic', [
+    "how to prevent ovarian cyst",       # Shares most words, different subject
+    "bartholin cyst treatment options",  # Same subject, a word the stored topic lacks
+    "kubernetes autoscaling",            # Unrelated
+])
+def test_different_subjects_are_not_reused(index, topic):
+    assert index.lookup(topic, 'strategy') is None
+    assert index.stats()['hits']['strategy'] == 0
+
+
+def test_narrower_topic_with_old_subject_left_in_result_is_a_miss(index):
+    # "bartholin cyst" is covered by the stored topic, but the adapted SEO
+    # result would still be about preventing it
+    assert index.lookup("bartholin cyst", 'seo') is None
+
+
+def test_leftover_source_words():
+    adapted = adapt_result('seo', SEO, "How to prevent bartholin cyst", "bartholin cyst")
+    assert leftover_source_words(adapted, "How to prevent bartholin cyst", "bartholin cyst") == ['prevent']
+    assert leftover_source_words(SEO, "bartholin cyst", "bartholin cysts") == []
+
+
+def test_lookup_needs_a_result_for_the_stage(tmp_path):
+    index = TopicIndex(str(tmp_path / "topics.json"))
+    index.remember("AI agents", 'strategy', {'content_angles': ["x"]})
+    assert index.lookup("AI agents", 'seo') is None
+    assert index.lookup("ai agents", 'strategy') is not None
+
+
+def test_entries_and_counters_persist(index):
+    index.lookup("how to prevent bartholin cysts", 'strategy')
+    reopened = TopicIndex(index.path)
+    assert reopened.stats()['topics'] == 1
+    assert reopened.stats()['lifetime_hit_rate'] == 1.0
+    with open(index.path, encoding='utf-8') as f:
+        assert json.load(f)['entries'][0]['reused'] == 1
+
+
+def test_least_recently_used_topics_are_dropped(tmp_path):
+    index = TopicIndex(str(tmp_path / "topics.json"), max_entries=2)
+    for topic in ("alpha topic", "beta topic", "gamma topic"):
+        index.remember(topic, 'strategy', {'content_angles': [topic]})
+    assert index.stats()['topics'] == 2
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "topics.json"
+    path.write_text("{broken", encoding='utf-8')
+    assert TopicIndex(str(path)).stats()['topics'] == 0
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Topic-Family Reuse of Strategy and SEO Results
+
+Topics often come back reworded ("how to prevent bartholin cyst",
+"preventing bartholin cysts", "bartholin cyst prevention"), and their
+strategy and keyword research barely differ. This index remembers the Strategy and
+SEO Agents' JSON for every topic it has seen and, for a new topic:
+- Finds the most similar stored topic (cosine similarity of the topics'
+  content words, each word an equally weighted character n-gram vector,
+  computed with NumPy) whose words cover every content word of the new
+  topic, so "ovarian cyst" never matches "bartholin cyst"
+- Above `similarity_threshold`, reuses that topic's results, lightly
+  adapted (the old topic's wording replaced and the new topic made the
+  focus keyword) instead of making two full AI calls, unless the
+  adapted result still mentions words of the old subject
+- Counts lookups and reuses, in this process and across runs, for the
+  hit-rate report (`python topic_index.py`)
+
+Entries live in a small JSON file, so they can be inspected or deleted by hand.
+"""
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import argparse
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from context_budget import STOPWORDS
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_DIMENSIONS = 2048  # Hashed n-gram buckets (collisions are rare for short topics)
+STAGES = ('strategy', 'seo')
+
+# Words that shape the question but not the subject ("how to ...", "best ...")
+TOPIC_STOPWORDS = STOPWORDS | {'best', 'do', 'does', 'guide', 'can', 'should', 'why', 'when', 'which', 'who'}
+
+
+# ============================================================================
+# TOPIC VECTORS
+# ============================================================================
+def topic_words(topic: str) -> List[str]:
+    """Content words of a topic, lowercased."""
+    return [word for word in _WORD.findall((topic or '').lower()) if word not in TOPIC_STOPWORDS]
+
+
+def word_vector(word: str, sizes: Tuple[int, ...] = (3, 4)) -> np.ndarray:
+    """
+    Unit-length vector of a word's character n-grams.
+
+    The word is padded with spaces, so "cyst" and "cysts" share most n-grams.
+    """
+    vector = np.zeros(_DIMENSIONS)
+    padded = f" {word} "
+    for size in sizes:
+        for i in range(max(1, len(padded) - size + 1)):
+            digest = hashlib.blake2b(padded[i:i + size].encode('utf-8'), digest_size=4).digest()
+            vector[int.from_bytes(digest, 'little') % _DIMENSIONS] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def topic_vector(topic: str) -> np.ndarray:
+    """
+    Unit-length sum of the topic's word vectors.
+
+    Every content word carries the same weight, so a long shared word
+    ("productivity", "bartholin") cannot outweigh a short differing one.
+    Word order does not matter.
+    """
+    vector = np.zeros(_DIMENSIONS)
+    for word in dict.fromkeys(topic_words(topic)):
+        vector += word_vector(word)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def topic_similarity(first: str, second: str) -> float:
+    """Cosine similarity of two topics (0-1)."""
+    return float(topic_vector(first) @ topic_vector(second))
+
+
+def unmatched_words(topic: str, other: str, word_similarity: float = 0.6) -> List[str]:
+    """
+    Content words of `topic` with no close counterpart in `other`.
+
+    "ovarian" has none in "how to prevent bartholin cyst"; "cysts" has
+    "cyst".
+    """
+    other_vectors = [word_vector(word) for word in dict.fromkeys(topic_words(other))]
+    unmatched = []
+    for word in dict.fromkeys(topic_words(topic)):
+        vector = word_vector(word)
+        if not other_vectors or max(float(vector @ candidate) for candidate in other_vectors) < word_similarity:
+            unmatched.append(word)
+    return unmatched
+
+
+# ============================================================================
+# LIGHT ADAPTATION
+# ============================================================================
+def _replace_topic(value: Any, pattern: re.Pattern, topic: str) -> Any:
+    """Replace the old topic's wording in every string of a JSON value."""
+    if isinstance(value, str):
+        return pattern.sub(topic, value)
+    if isinstance(value, list):
+        return [_replace_topic(item, pattern, topic) for item in value]
+    if isinstance(value, dict):
+        return {key: _replace_topic(item, pattern, topic) for key, item in value.items()}
+    return value
+
+
+def _strings(value: Any) -> List[str]:
+    """Every string inside a JSON value."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [text for item in value for text in _strings(item)]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _strings(item)]
+    return []
+
+
+def adapt_result(stage: str, data: Dict[str, Any], source_topic: str, topic: str) -> Dict[str, Any]:
+    """
+    A stored strategy/SEO result adapted to a related topic.
+
+    Mentions of the source topic become the new topic; SEO results also
+    get the new topic as their first primary keyword and focus keyword.
+    """
+    adapted = copy.deepcopy(data)
+    if source_topic.strip().lower() != topic.strip().lower():
+        pattern = re.compile(re.escape(source_topic.strip()), re.IGNORECASE)
+        adapted = _replace_topic(adapted, pattern, topic.strip())
+    if stage == 'seo':
+        keywords = adapted.get('primary_keywords') or []
+        others = [keyword for keyword in keywords if keyword.lower() != topic.lower()]
+        adapted['primary_keywords'] = ([topic] + others)[:max(1, len(keywords))]
+        if isinstance(adapted.get('meta_optimization'), dict):
+            adapted['meta_optimization']['focus_keyword'] = topic
+    return adapted
+
+
+def leftover_source_words(data: Dict[str, Any], source_topic: str, topic: str) -> List[str]:
+    """
+    Source-topic words the new topic lacks that still appear in an adapted result.
+
+    Keywords, headings and meta text usually mention the subject in their
+    own wording ("Causes of Bartholin Cysts"), which the phrase
+    replacement in adapt_result cannot catch; any such leftover means the
+    result is not safe to reuse.
+    """
+    source_only = unmatched_words(source_topic, topic)
+    if not source_only:
+        return []
+    stems = {word.rstrip('s') for word in source_only}
+    found = {word for text in _strings(data) for word in _WORD.findall(text.lower())}
+    # Prefix match: "prevent" also catches "prevention" and "preventing"
+    return sorted(stem for stem in stems if any(word.startswith(stem) for word in found))
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+class TopicIndex:
+    """
+    Stored strategy/SEO results per topic with nearest-topic lookup.
+
+    Thread-safe (batch workers share one index); every change is written
+    to the JSON file atomically.
+    """
+
+    def __init__(self, path: str, similarity_threshold: float = 0.75, word_similarity: float = 0.6,
+                 max_entries: int = 2000):
+        """
+        Args:
+            path: JSON file holding the entries and lifetime counters
+            similarity_threshold: Minimum topic similarity for reuse
+            word_similarity: How close each word of a new topic must be to
+                a word of the stored topic
+            max_entries: Least recently used topics are dropped beyond this
+        """
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.word_similarity = word_similarity
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.lookups = {stage: 0 for stage in STAGES}
+        self.hits = {stage: 0 for stage in STAGES}
+
+        self._entries: List[Dict[str, Any]] = []
+        self._totals = {'lookups': 0, 'hits': 0}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                self._entries = stored.get('entries', [])
+                self._totals.update(stored.get('totals', {}))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Topic index unreadable ({e}); starting a new one")
+        self._vectors = [topic_vector(entry['topic']) for entry in self._entries]
+
+    def _save(self):
+        """Write entries and counters atomically (caller holds the lock)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'totals': self._totals, 'entries': self._entries}, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def nearest(self, topic: str, stage: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Most similar stored topic that has a result for the stage and
+        covers every content word of the topic.
+
+        Returns:
+            (entry or None, its similarity)
+        """
+        with self._lock:
+            candidates = [i for i, entry in enumerate(self._entries) if entry.get(stage)]
+            if not candidates:
+                return None, 0.0
+            scores = np.vstack([self._vectors[i] for i in candidates]) @ topic_vector(topic)
+            ranked = [(float(scores[j]), self._entries[i]) for j, i in enumerate(candidates)
+                      if scores[j] >= self.similarity_threshold]
+        for score, entry in sorted(ranked, key=lambda pair: pair[0], reverse=True):
+            if not unmatched_words(topic, entry['topic'], self.word_similarity):
+                return entry, score
+        return None, 0.0
+
+    def lookup(self, topic: str, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        Reusable result for a stage, adapted to the topic, or None.
+
+        A close stored topic is still a miss when its adapted result keeps
+        words of the old subject that the new topic lacks.
+
+        Returns:
+            {'data', 'source_topic', 'similarity'} when a stored topic is
+            similar enough
+        """
+        entry, similarity = self.nearest(topic, stage)
+        data = adapt_result(stage, entry[stage], entry['topic'], topic) if entry else None
+        hit = data is not None and not leftover_source_words(data, entry['topic'], topic)
+        with self._lock:
+            self.lookups[stage] += 1
+            self._totals['lookups'] += 1
+            if hit:
+                self.hits[stage] += 1
+                self._totals['hits'] += 1
+                entry['reused'] = entry.get('reused', 0) + 1
+                entry['last_used'] = datetime.now().isoformat(timespec='seconds')
+                self._save()  # Misses are saved with the fresh result that follows them
+        if not hit:
+            return None
+        return {
+            'data': data,
+            'source_topic': entry['topic'],
+            'similarity': round(similarity, 3),
+        }
+
+    def remember(self, topic: str, stage: str, data: Dict[str, Any]):
+        """Store a freshly generated stage result for the topic."""
+        key = " ".join(topic.lower().split())
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            for entry in self._entries:
+                if entry['key'] == key:
+                    entry[stage] = data
+                    entry['last_used'] = now
+                    break
+            else:
+                self._entries.append({'key': key, 'topic': topic.strip(), stage: data, 'reused': 0,
+                                      'created_at': now, 'last_used': now})
+                self._vectors.append(topic_vector(topic))
+            if len(self._entries) > self.max_entries:
+                order = sorted(range(len(self._entries)), key=lambda i: self._entries[i]['last_used'])
+                drop = set(order[:len(self._entries) - self.max_entries])
+                self._entries = [entry for i, entry in enumerate(self._entries) if i not in drop]
+                self._vectors = [vector for i, vector in enumerate(self._vectors) if i not in drop]
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate counters for this process and across runs."""
+        with self._lock:
+            lookups = sum(self.lookups.values())
+            hits = sum(self.hits.values())
+            return {
+                'lookups': dict(self.lookups),
+                'hits': dict(self.hits),
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'lifetime_hit_rate': (round(self._totals['hits'] / self._totals['lookups'], 3)
+                                      if self._totals['lookups'] else 0.0),
+                'topics': len(self._entries),
+            }
+
+    def report(self, limit: int = 10) -> str:
+        """Text hit-rate report with the most reused topics."""
+        stats = self.stats()
+        with self._lock:
+            totals = dict(self._totals)
+            top = sorted(self._entries, key=lambda entry: entry.get('reused', 0), reverse=True)[:limit]
+        lines = [
+            f"♻️ Topic reuse: {totals['hits']}/{totals['lookups']} lookups reused "
+            f"({stats['lifetime_hit_rate']:.0%}) across {stats['topics']} stored topics",
+            f"   Similarity threshold: {self.similarity_threshold}",
+        ]
+        for entry in top:
+            if entry.get('reused'):
+                lines.append(f"   {entry['reused']:>4}x  {entry['topic']}")
+        return "\n".join(lines)
+
+
+# One index per file, shared by every generator in the process (their saves would overwrite each other)
+_indexes: Dict[str, TopicIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def create_topic_index(config: Dict[str, Any]) -> Optional[TopicIndex]:
+    """Return the topic index for the `topic_reuse` config section (None if disabled)."""
+    reuse_config = config.get('topic_reuse', {})
+    if not reuse_config.get('enabled', False):
+        return None
+    path = os.path.abspath(reuse_config.get('path', ".cache/topic_index.json"))
+    with _registry_lock:
+        if path not in _indexes:
+            _indexes[path] = TopicIndex(path, max_entries=reuse_config.get('max_entries', 2000))
+        index = _indexes[path]
+    index.similarity_threshold = reuse_config.get('similarity_threshold', 0.75)
+    index.word_similarity = reuse_config.get('word_similarity', 0.6)
+    return index
+
+
+# ============================================================================
+# COMMAND LINE: hit-rate report and similarity checks
+# ============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Topic reuse report")
+    parser.add_argument('--path', default=".cache/topic_index.json", help="Topic index file")
+    parser.add_argument('--similar', metavar='TOPIC', help="Show the stored topics closest to TOPIC")
+    args = parser.parse_args()
+
+    index = TopicIndex(args.path)
+    print(index.report())
+    if args.similar:
+        vector = topic_vector(args.similar)
+        scored = sorted(((float(topic_vector(entry['topic']) @ vector), entry['topic'])
+                         for entry in index._entries), reverse=True)[:5]
+        print(f"\nClosest to \"{args.similar}\":")
+        for score, topic in scored:
+            print(f"   {score:.3f}  {topic}")
+
+
+if __name__ == "__main__":
+    main()